@@ -0,0 +1,176 @@
+"""
+公开 GET 接口的响应缓存
+以路由 + 规范化后的查询参数为键，支持 TTL 过期和 LRU 淘汰。
+每个缓存项带有标签：列表接口为 "<集合>:list"，详情接口为 "<集合>:*" 和 "<集合>:<文档ID>"，
+写接口通过 versioning.mark_changed() 调用 invalidate()，只清除受影响的缓存项：
+修改单个文档清除该集合的列表和该文档的详情，整个集合的修改（不指定文档）清除该集合的所有缓存项。
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from .config import settings
+from .request_context import UNMATCHED_ROUTE, route_resolver
+
+# 带缓存和版本号的公开接口所属的集合（/api/<集合>/...）
+VERSIONED_COLLECTIONS = {"blogs", "services", "events", "settings", "about"}
+
+
+@dataclass
+class CachedResponse:
+    """缓存的完整响应"""
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    tags: Tuple[str, ...]
+    expires_at: float
+    # 按编码保存的压缩结果，每种编码只压缩一次
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+
+class ResponseCache:
+    """带标签失效的 LRU + TTL 缓存（单个 worker 内有效，事件循环内访问无需加锁）"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: str, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, tags: Iterable[str]) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+        tags = tuple(tags)
+        self._entries[key] = CachedResponse(
+            status=status,
+            headers=headers,
+            body=body,
+            tags=tags,
+            expires_at=time.monotonic() + self.ttl_seconds
+        )
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def add_variant(self, key: str, encoding: str, body: bytes) -> None:
+        """保存缓存项的压缩结果"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.variants[encoding] = body
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """清除带有任一标签的缓存项，返回清除数量"""
+        removed = 0
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+# 全局响应缓存
+response_cache = ResponseCache(settings.cache_max_entries, settings.cache_ttl_seconds)
+
+
+def cache_key(path: str, query_string: bytes) -> str:
+    """路由 + 规范化的查询参数（排序、去掉空值）"""
+    params = sorted(parse_qsl(query_string.decode("latin-1")))
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def list_tag(collection: str) -> str:
+    return f"{collection}:list"
+
+
+def doc_tag(collection: str, doc_id: str) -> str:
+    return f"{collection}:{doc_id}"
+
+
+def collection_tag(collection: str) -> str:
+    """整个集合的修改（如批量写入、迁移）影响所有详情"""
+    return f"{collection}:*"
+
+
+def changed_tags(collection: str, doc_id: Optional[str] = None) -> List[str]:
+    """一次写入影响的标签：总是影响列表；指定文档时只影响该文档的详情，否则影响所有详情"""
+    if doc_id is not None:
+        return [list_tag(collection), doc_tag(collection, doc_id)]
+    return [list_tag(collection), collection_tag(collection)]
+
+
+def request_tags(scope) -> Tuple[Optional[str], List[str]]:
+    """在路由匹配之前，按路由模板确定请求依赖的 (集合, 标签)，不是带版本号的公开接口时集合为 None
+
+    /api/blogs/{blog_id} -> ("blogs", ["blogs:*", "blogs:<blog_id>"])
+    /api/blogs、/api/about/team 等没有路径参数的路由 -> ("blogs", ["blogs:list"])
+    """
+    template = route_resolver.resolve(scope)
+    if template == UNMATCHED_ROUTE:
+        return None, []
+    template_parts = template.split("/")
+    if len(template_parts) < 3 or template_parts[2] not in VERSIONED_COLLECTIONS:
+        return None, []
+
+    collection = template_parts[2]
+    path_parts = scope["path"].split("/")
+    doc_ids = [
+        value for part, value in zip(template_parts, path_parts)
+        if part.startswith("{") and part.endswith("}")
+    ]
+    if doc_ids:
+        return collection, [collection_tag(collection)] + [doc_tag(collection, doc_id) for doc_id in doc_ids]
+    return collection, [list_tag(collection)]
+
+
+def invalidate(collection: str, doc_id: Optional[str] = None) -> int:
+    """文档被创建、修改或删除后清除相关缓存（见 changed_tags）"""
+    return response_cache.invalidate_tags(changed_tags(collection, doc_id))
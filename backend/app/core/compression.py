@@ -0,0 +1,158 @@
+"""
+响应压缩
+按 Accept-Encoding 协商 Brotli / gzip，小于阈值或不可压缩类型的响应保持原样。
+缓存中的响应只压缩一次，压缩结果随缓存项保存并重复使用。
+"""
+
+import zlib
+from typing import List, Optional, Tuple
+
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # Brotli 为可选依赖，未安装时只使用 gzip
+    brotli = None
+
+# 按优先级排列的支持的编码
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# 可以压缩的内容类型
+COMPRESSIBLE_TYPES = (
+    b"application/json",
+    b"application/x-ndjson",
+    b"application/javascript",
+    b"application/xml",
+    b"text/",
+    b"image/svg+xml",
+)
+
+# ETag 中表示编码的后缀
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gzip"}
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """根据 Accept-Encoding 选择编码，q 值相同时 Brotli 优先"""
+    if not accept_encoding or not settings.compression_enabled:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best = None
+    best_q = 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def request_encoding(scope) -> Optional[str]:
+    """从 ASGI scope 中读取 Accept-Encoding 并协商编码"""
+    for key, value in scope["headers"]:
+        if key == b"accept-encoding":
+            return choose_encoding(value.decode("latin-1"))
+    return None
+
+
+def get_header(headers: Headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key == name:
+            return value
+    return None
+
+
+def is_compressible(headers: Headers, size: Optional[int] = None) -> bool:
+    """响应是否值得压缩：类型可压缩、尚未编码、且不小于阈值"""
+    if get_header(headers, b"content-encoding") is not None:
+        return False
+    content_type = get_header(headers, b"content-type") or b""
+    if not content_type.startswith(COMPRESSIBLE_TYPES):
+        return False
+    return size is None or size >= settings.compression_min_size
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """一次性压缩；缓存中的响应只压缩一次，使用更高的压缩级别"""
+    if encoding == "br":
+        quality = settings.brotli_cached_quality if cached else settings.brotli_quality
+        return brotli.compress(body, quality=quality)
+    compressor = zlib.compressobj(settings.gzip_level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class StreamCompressor:
+    """流式压缩，用于分块发送的响应"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(settings.gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            # 立即刷新，保证每个分块都能尽快到达客户端
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def etag_with_encoding(etag: bytes, encoding: str) -> bytes:
+    """强 ETag 需要区分不同编码的表示："abc" -> "abc-br" """
+    suffix = ETAG_SUFFIXES[encoding].encode()
+    if etag.endswith(b'"'):
+        return etag[:-1] + suffix + b'"'
+    return etag + suffix
+
+
+def strip_etag_encoding(etag: str) -> str:
+    """去掉 ETag 中的编码后缀，用于比较 If-None-Match"""
+    for suffix in ETAG_SUFFIXES.values():
+        if etag.endswith(suffix + '"'):
+            return etag[:-len(suffix) - 1] + '"'
+    return etag
+
+
+def encoded_headers(headers: Headers, encoding: str, length: Optional[int]) -> Headers:
+    """生成压缩后响应的头：设置 Content-Encoding / Vary，更新长度和 ETag"""
+    result = []
+    vary = None
+    for key, value in headers:
+        if key == b"content-length":
+            continue
+        if key == b"etag":
+            value = etag_with_encoding(value, encoding)
+        if key == b"vary":
+            vary = value
+            continue
+        result.append((key, value))
+
+    result.append((b"content-encoding", encoding.encode()))
+    if vary is None:
+        result.append((b"vary", b"Accept-Encoding"))
+    elif b"accept-encoding" not in vary.lower():
+        result.append((b"vary", vary + b", Accept-Encoding"))
+    else:
+        result.append((b"vary", vary))
+    if length is not None:
+        result.append((b"content-length", str(length).encode()))
+    return result
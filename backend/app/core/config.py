@@ -7,18 +7,99 @@ class Settings(BaseSettings):
     
     # MongoDB配置
     mongodb_uri: str = "mongodb://localhost:27017/snc-blog"
+    index_drop_extra: bool = False  # 启动时是否删除未声明的索引（默认只报告）
+    
+    # MongoDB 连接池配置（未设置的项使用驱动默认值）
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: Optional[int] = None  # 空闲连接保留的最长时间
+    mongo_wait_queue_timeout_ms: Optional[int] = None  # 等待借出连接的超时时间
+    mongo_server_selection_timeout_ms: int = 30000
+    mongo_compressors: str = ""  # 传输压缩，如 "zstd,snappy,zlib"
+    
+    # 数据迁移配置
+    seed_demo_data: bool = False  # 是否执行填充示例数据的迁移（只填充空集合）
+    migration_lock_ttl_seconds: int = 600  # 迁移锁的租约时长，持有者会定期续约
     
     # JWT配置
     jwt_secret: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 10080  # 7天
+    token_cache_max_entries: int = 1024  # 已验证令牌的缓存条目数，0 表示关闭
+    token_revocation_sync_seconds: float = 5.0  # 各 worker 同步吊销记录的间隔
+    
+    # 密码哈希（bcrypt）执行器配置：计算在独立线程池中进行，不阻塞事件循环
+    password_hash_workers: int = 2  # 同时进行的 bcrypt 计算数
+    password_hash_max_queue: int = 32  # 排队数超过该值时直接拒绝（503）
+    password_hash_queue_timeout: float = 5.0  # 排队超过该秒数时拒绝（503）
     
     # CORS配置
     client_url: str = "http://localhost:3000"
     
     # 服务器配置
+    host: str = "0.0.0.0"
     port: int = 5000
     
+    # 生产模式（python run.py --production）配置
+    workers: int = 0  # worker 进程数，0 表示按 CPU 核数自动计算
+    server_loop: str = "auto"  # auto / uvloop / asyncio
+    server_http: str = "auto"  # auto / httptools / h11
+    preload_app: bool = True  # 在 master 进程中预加载应用后再 fork
+    max_requests: int = 10000  # worker 处理该数量的请求后重启，0 表示不限制
+    max_requests_jitter: int = 1000  # 随机抖动，避免所有 worker 同时重启
+    graceful_timeout: int = 30  # 收到 SIGTERM 后等待处理中请求完成的秒数
+    keepalive: int = 5
+    
+    # 限流配置（令牌桶，格式为 "次数/second|minute|hour|day"，次数同时是允许的突发量）
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"  # memory（进程内）/ shared（共享内存，多 worker）/ redis
+    rate_limit_max_keys: int = 65536  # memory 后端的桶数上限 / shared 后端的槽位数
+    rate_limit_login: str = "10/minute"  # 登录、初始化、修改密码，按 IP
+    rate_limit_search: str = "30/minute"  # 博客搜索，按 IP
+    rate_limit_write: str = "120/minute"  # 其他写接口，按用户或 IP
+    rate_limit_read: str = "1200/minute"  # 其他读接口，按用户或 IP
+    redis_url: str = "redis://localhost:6379/0"  # RATE_LIMIT_BACKEND=redis 时使用
+    trusted_proxies: str = "127.0.0.1"  # 可信的反向代理（IP 或网段，逗号分隔），从其 X-Forwarded-For 中取客户端 IP
+    
+    # 指标配置
+    metrics_enabled: bool = True  # 是否记录指标并开放 /metrics
+    
+    # 按需剖析配置（管理员请求携带 X-Profile 请求头时生效）
+    profiling_enabled: bool = True
+    profile_interval: float = 0.001  # 采样间隔（秒）
+    profile_dir: str = "profiles"  # 剖析结果保存目录，多个 worker 共享
+    profile_keep: int = 50  # 保留最近的剖析结果数
+    
+    # 慢查询日志配置
+    slow_query_ms: float = 100  # 耗时超过该毫秒数的 MongoDB 命令记为慢查询，0 表示关闭
+    slow_query_explain: bool = True  # 每种查询形状第一次变慢时在后台执行 explain
+    slow_query_log_bytes: int = 16 * 1024 * 1024  # 慢查询固定大小集合的容量
+    
+    # 健康检查配置
+    health_ping_interval: float = 2.0  # MongoDB ping 结果的缓存秒数
+    health_ping_timeout: float = 1.0
+    health_max_loop_lag_ms: float = 500  # 事件循环延迟超过该值时视为未就绪
+    
+    # 响应缓存配置（公开 GET 接口）
+    cache_enabled: bool = True
+    cache_ttl_seconds: int = 60
+    cache_max_entries: int = 1000
+    cache_max_entry_bytes: int = 1024 * 1024  # 超过该大小的响应不缓存
+    content_version_ttl: float = 1.0  # 本地缓存内容版本号的秒数
+    http_cache_max_age: int = 0  # Cache-Control max-age，0 表示每次都向服务器校验
+    
+    # 响应压缩配置
+    compression_enabled: bool = True
+    compression_min_size: int = 500  # 小于该字节数的响应不压缩
+    gzip_level: int = 6
+    brotli_quality: int = 4  # 实时压缩使用较低级别
+    brotli_cached_quality: int = 9  # 缓存的响应只压缩一次，可以使用较高级别
+    
+    # 搜索配置
+    search_backend: str = "memory"  # memory（进程内倒排索引）或 mongo（MongoDB 文本索引）
+    search_refresh_seconds: int = 30  # memory 后端与其他 worker 同步的间隔
+    search_max_results: int = 200  # 非分页模式下搜索返回的最大条数
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,6 +1,13 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from .config import settings
-from .init_data import init_demo_data
+from .metrics import command_metrics
+from .profiling import profile_commands
+from .pool import mongo_client_options, pool_stats
+from .slow_queries import slow_query_log
+from .tokens import revocations
+from .indexes import schedule_index_reconcile
+from .migrations import schedule_migrations
+from ..search import init_search
 
 # MongoDB客户端
 client: AsyncIOMotorClient = None
@@ -12,17 +19,34 @@ db = None
 async def connect_to_mongo():
     """连接到MongoDB"""
     global client, db
-    client = AsyncIOMotorClient(settings.mongodb_uri)
+    client = AsyncIOMotorClient(
+        settings.mongodb_uri,
+        event_listeners=[pool_stats, command_metrics, slow_query_log, profile_commands],
+        **mongo_client_options()
+    )
     db = client.get_default_database()
     print("✅ MongoDB 连接成功")
     
-    # 初始化示例数据
-    await init_demo_data(db)
+    # 慢查询日志（后台创建固定大小集合）
+    slow_query_log.start(db)
+    
+    # 令牌吊销记录（后台定期同步）
+    revocations.start()
+    
+    # 后台比对并创建索引
+    schedule_index_reconcile(db)
+    
+    # 建立搜索索引（后台进行）
+    await init_search(db)
+    
+    # 执行待执行的数据迁移（后台进行，多个 worker 中只有一个执行）
+    schedule_migrations(db)
 
 
 async def close_mongo_connection():
     """关闭MongoDB连接"""
     global client
+    revocations.stop()
     if client:
         client.close()
         print("❌ MongoDB 连接已关闭")
@@ -0,0 +1,132 @@
+"""
+密码哈希执行器
+bcrypt 每次计算需要 100–300 ms 的 CPU 时间，直接在异步接口中调用会阻塞整个 worker 的事件循环。
+这里把计算放到独立的有界线程池中（bcrypt 计算期间释放 GIL），同时进行的计算数为 PASSWORD_HASH_WORKERS；
+排队数超过 PASSWORD_HASH_MAX_QUEUE 或排队超过 PASSWORD_HASH_QUEUE_TIMEOUT 秒时立即拒绝，
+大量登录请求只会让登录变慢或被拒绝，不会拖慢公开页面。
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, TypeVar
+
+from .config import settings
+from .metrics import (
+    PASSWORD_HASH_DURATION, PASSWORD_HASH_IN_PROGRESS, PASSWORD_HASH_QUEUE, PASSWORD_HASH_REJECTED, PASSWORD_HASH_WAIT
+)
+from .security import get_password_hash, verify_password
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """排队已满或排队超时"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class PasswordHasher:
+    """有界的 bcrypt 执行器"""
+
+    def __init__(self, workers: int, max_queue: int, queue_timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        # 线程在第一次提交任务时才创建，预加载应用后 fork 的 worker 各自拥有线程
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = asyncio.Semaphore(workers)
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        PASSWORD_HASH_REJECTED.labels(reason).inc()
+        raise PasswordHasherBusy(reason)
+
+    async def _acquire_slot(self) -> bool:
+        """等待空闲的计算槽位，超时返回 False
+
+        不使用 wait_for(semaphore.acquire())：Python 3.12 之前获取与超时同时发生时，
+        信号量已被获取却仍抛出 TimeoutError，槽位就此泄漏
+        """
+        acquire = asyncio.ensure_future(self._slots.acquire())
+        try:
+            done, _ = await asyncio.wait({acquire}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # 请求被取消：等待中的获取由信号量自己撤销，已经获取的归还
+            if not acquire.cancel() and not acquire.cancelled():
+                self._slots.release()
+            raise
+        if done:
+            return True
+
+        acquire.cancel()
+        try:
+            await acquire
+        except asyncio.CancelledError:
+            return False
+        # 取消生效前已经获取到槽位
+        return True
+
+    async def run(self, operation: str, func: Callable[..., T], *args) -> T:
+        # 只在排队时等待信号量，执行器本身的队列始终为空
+        if self.waiting >= self.max_queue:
+            self._reject("queue_full")
+
+        self.waiting += 1
+        PASSWORD_HASH_QUEUE.inc()
+        queued = time.perf_counter()
+        try:
+            acquired = await self._acquire_slot()
+        finally:
+            self.waiting -= 1
+            PASSWORD_HASH_QUEUE.dec()
+        if not acquired:
+            self._reject("timeout")
+        PASSWORD_HASH_WAIT.observe(time.perf_counter() - queued)
+
+        self.running += 1
+        PASSWORD_HASH_IN_PROGRESS.inc()
+        future = asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        # 槽位在线程真正算完时归还：请求被取消（如客户端断开）时线程仍在计算，不能提前放行下一个
+        future.add_done_callback(partial(self._finish, operation, time.perf_counter()))
+        return await asyncio.shield(future)
+
+    def _finish(self, operation: str, started: float, future: asyncio.Future) -> None:
+        PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - started)
+        PASSWORD_HASH_IN_PROGRESS.dec()
+        self.running -= 1
+        self.completed += 1
+        self._slots.release()
+        # 请求已取消时没有人读取结果，避免 "exception was never retrieved" 警告
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+# 全局执行器
+password_hasher = PasswordHasher(
+    settings.password_hash_workers, settings.password_hash_max_queue, settings.password_hash_queue_timeout
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run("verify", verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run("hash", get_password_hash, password)
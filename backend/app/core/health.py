@@ -0,0 +1,114 @@
+"""
+存活与就绪检查
+存活（liveness）只表示进程和事件循环仍在运行；
+就绪（readiness）综合 MongoDB ping、搜索索引预热状态和事件循环延迟。
+ping 结果缓存 HEALTH_PING_INTERVAL 秒，频繁的探针请求不会给数据库带来额外压力。
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from .config import settings
+from . import database
+
+
+class LoopLagMonitor:
+    """周期性休眠并测量实际唤醒时间的偏差，得到事件循环延迟"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag_ms = max(0.0, (loop.time() - start - self.interval) * 1000)
+            self.max_lag_ms = max(self.max_lag_ms, self.lag_ms)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class PingCheck:
+    """缓存的 MongoDB ping 结果；缓存过期瞬间的并发探针共用同一次 ping"""
+
+    def __init__(self, interval: float, timeout: float):
+        self.interval = interval
+        self.timeout = timeout
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._pending: Optional[asyncio.Task] = None
+
+    async def _ping(self) -> dict:
+        db = database.get_database()
+        if db is None:
+            return {"ok": False, "error": "数据库未连接"}
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(db.command("ping"), self.timeout)
+        except Exception as e:
+            return {"ok": False, "error": str(e) or type(e).__name__}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    async def check(self) -> dict:
+        if self._result is not None and time.monotonic() - self._checked_at < self.interval:
+            return self._result
+
+        # ping 在独立的任务中进行，某个探针被取消（如客户端断开）不影响其他等待中的探针
+        if self._pending is None:
+            self._pending = asyncio.ensure_future(self._refresh())
+            self._pending.add_done_callback(self._finish)
+        return await asyncio.shield(self._pending)
+
+    async def _refresh(self) -> dict:
+        self._result = await self._ping()
+        self._checked_at = time.monotonic()
+        return self._result
+
+    def _finish(self, task: asyncio.Task) -> None:
+        if self._pending is task:
+            self._pending = None
+
+
+# 全局检查器
+loop_monitor = LoopLagMonitor()
+mongo_ping = PingCheck(settings.health_ping_interval, settings.health_ping_timeout)
+
+
+def liveness() -> dict:
+    return {
+        "status": "ok",
+        "loop_lag_ms": round(loop_monitor.lag_ms, 2),
+    }
+
+
+async def readiness() -> dict:
+    """返回各项检查结果，ready 为 False 时接口应返回 503"""
+    # 延迟导入：search 依赖 database
+    from ..search import get_search_engine
+
+    engine = get_search_engine()
+    checks = {
+        "mongo": await mongo_ping.check(),
+        "search_index": {"ok": engine is not None and engine.ready.is_set()},
+        "event_loop": {
+            "ok": loop_monitor.lag_ms <= settings.health_max_loop_lag_ms,
+            "lag_ms": round(loop_monitor.lag_ms, 2),
+            "max_lag_ms": round(loop_monitor.max_lag_ms, 2),
+        },
+    }
+    return {
+        "ready": all(check["ok"] for check in checks.values()),
+        "checks": checks,
+    }
@@ -0,0 +1,176 @@
+"""
+索引管理
+在这里声明各集合需要的索引，启动时在后台与数据库中的实际索引进行比对：
+缺失的索引会被创建，多余的索引只报告（INDEX_DROP_EXTRA=true 时删除）。
+复合索引的字段顺序遵循"等值条件 → 排序字段"，与各路由的查询保持一致。
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+from .config import settings
+from ..search.mongo import TEXT_INDEX_KEYS, TEXT_INDEX_NAME, TEXT_INDEX_WEIGHTS
+
+# 声明的索引：集合名 -> 索引列表
+INDEXES: Dict[str, List[IndexModel]] = {
+    "blogs": [
+        # get_blogs: published=true，按 date 倒序（游标分页附加 _id）
+        IndexModel([("published", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)],
+                   name="published_date"),
+        # get_blogs: published=true + category
+        IndexModel([("published", ASCENDING), ("category", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)],
+                   name="published_category_date"),
+        # get_blogs: published=false（管理后台，不过滤）
+        IndexModel([("date", DESCENDING), ("_id", DESCENDING)], name="date"),
+        # 搜索索引同步时查询最近更新的文章
+        IndexModel([("updated_at", DESCENDING)], name="updated_at"),
+    ],
+    "services": [
+        # get_services: active=true，按 (order, created_at) 排序
+        IndexModel([("active", ASCENDING), ("order", ASCENDING), ("created_at", DESCENDING)],
+                   name="active_order"),
+        # get_services: active=true + category
+        IndexModel([("active", ASCENDING), ("category", ASCENDING), ("order", ASCENDING), ("created_at", DESCENDING)],
+                   name="active_category_order"),
+        # get_services: active=false（管理后台，不过滤）
+        IndexModel([("order", ASCENDING), ("created_at", DESCENDING)], name="order"),
+    ],
+    "events": [
+        # get_events: published=true，按 date 倒序
+        IndexModel([("published", ASCENDING), ("date", DESCENDING)], name="published_date"),
+        # get_events: published=true + category
+        IndexModel([("published", ASCENDING), ("category", ASCENDING), ("date", DESCENDING)],
+                   name="published_category_date"),
+        # get_events: published=true + status
+        IndexModel([("published", ASCENDING), ("status", ASCENDING), ("date", DESCENDING)],
+                   name="published_status_date"),
+        # get_events: published=true + status + category（只带 status 时 category 不是等值条件，
+        # 用这个索引需要内存排序，因此由上一个索引负责）
+        IndexModel([("published", ASCENDING), ("status", ASCENDING), ("category", ASCENDING), ("date", DESCENDING)],
+                   name="published_status_category_date"),
+        # get_events: published=false（管理后台，不过滤）
+        IndexModel([("date", DESCENDING)], name="date"),
+    ],
+    "settings": [
+        IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+    ],
+    "token_revocations": [
+        # 令牌过期后吊销记录自动删除；各 worker 同步时按 expires_at 读取未过期的记录
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "admins": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ],
+}
+
+# 最近一次比对的结果，供内部统计接口查看
+last_report: Optional[dict] = None
+
+# 后台比对任务（保留引用，避免被垃圾回收）
+_reconcile_task: Optional[asyncio.Task] = None
+
+
+def declared_indexes() -> Dict[str, List[IndexModel]]:
+    """返回当前配置下应当存在的索引"""
+    declared = {name: list(models) for name, models in INDEXES.items()}
+
+    if settings.search_backend == "mongo":
+        declared["blogs"].append(IndexModel(
+            TEXT_INDEX_KEYS,
+            name=TEXT_INDEX_NAME,
+            weights=TEXT_INDEX_WEIGHTS,
+            default_language="none"
+        ))
+
+    return declared
+
+
+def _key_spec(key) -> list:
+    """统一索引键的表示，便于比较（部分服务器版本把方向存为浮点数）"""
+    return [
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in key
+    ]
+
+
+async def reconcile_indexes(db, drop_extra: bool = False) -> dict:
+    """比对并创建缺失的索引，返回每个集合的 missing / created / extra / conflicts"""
+    report = {}
+
+    for collection_name, models in declared_indexes().items():
+        collection = db[collection_name]
+        result = {"missing": [], "created": [], "extra": [], "conflicts": [], "errors": []}
+        report[collection_name] = result
+
+        try:
+            existing = await collection.index_information()
+        except PyMongoError as e:
+            result["errors"].append(str(e))
+            continue
+
+        declared_names = set()
+        to_create = []
+        for model in models:
+            doc = model.document
+            name = doc["name"]
+            declared_names.add(name)
+
+            if name not in existing:
+                result["missing"].append(name)
+                to_create.append(model)
+                continue
+
+            # 文本索引的键由服务器改写为 _fts/_ftsx，只比较名称
+            is_text = "text" in doc["key"].values()
+            if not is_text and _key_spec(existing[name]["key"]) != _key_spec(doc["key"].items()):
+                result["conflicts"].append(name)
+
+        for model in to_create:
+            try:
+                await collection.create_indexes([model])
+                result["created"].append(model.document["name"])
+            except PyMongoError as e:
+                # 例如已有重复数据导致唯一索引创建失败
+                result["errors"].append(f"{model.document['name']}: {e}")
+
+        for name in existing:
+            if name == "_id_" or name in declared_names:
+                continue
+            result["extra"].append(name)
+            if drop_extra:
+                try:
+                    await collection.drop_index(name)
+                except PyMongoError as e:
+                    result["errors"].append(f"{name}: {e}")
+
+    return report
+
+
+def _print_report(report: dict) -> None:
+    for collection_name, result in report.items():
+        if result["created"]:
+            print(f"✅ {collection_name} 已创建索引: {', '.join(result['created'])}")
+        if result["extra"]:
+            print(f"⚠️ {collection_name} 存在未声明的索引: {', '.join(result['extra'])}")
+        if result["conflicts"]:
+            print(f"⚠️ {collection_name} 索引定义与声明不一致: {', '.join(result['conflicts'])}")
+        for error in result["errors"]:
+            print(f"❌ {collection_name} 索引操作失败: {error}")
+
+
+async def _reconcile_in_background(db) -> None:
+    global last_report
+    try:
+        last_report = await reconcile_indexes(db, drop_extra=settings.index_drop_extra)
+        _print_report(last_report)
+    except Exception as e:
+        print(f"❌ 索引比对失败: {e}")
+
+
+def schedule_index_reconcile(db) -> None:
+    """在后台比对索引，不阻塞启动和首批请求"""
+    global _reconcile_task
+    _reconcile_task = asyncio.create_task(_reconcile_in_background(db))
@@ -1,9 +1,16 @@
 """
 数据库初始化数据
-在数据库为空时自动填充示例数据
+示例数据由可选的迁移 demo_data 写入（SEED_DEMO_DATA=true），只填充空集合；
+站点运行所需的默认设置由迁移 default_settings 补齐（总是执行，只插入缺失的键）
 """
 
+import asyncio
 from datetime import datetime, timedelta
+from typing import Dict, List
+
+from pymongo import UpdateOne
+
+from .rendering import render_blog_async
 
 
 # 示例博客文章
@@ -600,8 +607,8 @@ DEMO_ABOUT = {
 }
 
 
-# 默认设置
-DEMO_SETTINGS = [
+# 默认站点设置（页脚、联系方式等依赖这些键，与示例数据无关）
+DEFAULT_SETTINGS = [
     {"key": "siteName", "value": "学生网络中心", "description": "网站名称"},
     {"key": "siteDescription", "value": "致力于为学校师生提供优质的网络服务和技术支持，推动校园信息化建设。", "description": "网站描述"},
     {"key": "contactEmail", "value": "contact@snc.example.edu", "description": "联系邮箱"},
@@ -614,49 +621,65 @@ DEMO_SETTINGS = [
 ]
 
 
-async def init_demo_data(db):
-    """初始化示例数据"""
-    from datetime import datetime
-    
-    # 检查并初始化博客
-    blog_count = await db.blogs.count_documents({})
-    if blog_count == 0:
-        for blog in DEMO_BLOGS:
-            blog["created_at"] = datetime.now()
-            blog["updated_at"] = datetime.now()
-        await db.blogs.insert_many(DEMO_BLOGS)
-        print(f"✅ 已初始化 {len(DEMO_BLOGS)} 篇示例博客")
-    
-    # 检查并初始化服务
-    service_count = await db.services.count_documents({})
-    if service_count == 0:
-        for service in DEMO_SERVICES:
-            service["created_at"] = datetime.now()
-        await db.services.insert_many(DEMO_SERVICES)
-        print(f"✅ 已初始化 {len(DEMO_SERVICES)} 个示例服务")
-    
-    # 检查并初始化活动
-    event_count = await db.events.count_documents({})
-    if event_count == 0:
-        for event in DEMO_EVENTS:
-            event["created_at"] = datetime.now()
-        await db.events.insert_many(DEMO_EVENTS)
-        print(f"✅ 已初始化 {len(DEMO_EVENTS)} 个示例活动")
-    
-    # 检查并初始化设置
-    settings_count = await db.settings.count_documents({})
-    if settings_count == 0:
-        for setting in DEMO_SETTINGS:
-            setting["updated_at"] = datetime.now()
-        await db.settings.insert_many(DEMO_SETTINGS)
-        print(f"✅ 已初始化 {len(DEMO_SETTINGS)} 个默认设置")
-    
-    # 检查并初始化"关于我们"数据
-    about = await db.about.find_one({})
-    if not about:
-        about_data = {
-            **DEMO_ABOUT,
-            "updated_at": datetime.now()
-        }
-        await db.about.insert_one(about_data)
-        print("✅ 已初始化关于我们页面数据")
+async def _seed_many(collection, demo_docs: List[dict], timestamps: tuple, label: str) -> List[dict]:
+    """集合为空时插入示例文档的副本（不修改模块级的 DEMO_* 列表），返回插入的文档"""
+    if await collection.find_one({}, {"_id": 1}) is not None:
+        return []
+
+    now = datetime.now()
+    docs = [{**doc, **{field: now for field in timestamps}} for doc in demo_docs]
+    await collection.insert_many(docs)
+    print(f"✅ 已初始化 {len(docs)} {label}")
+    return docs
+
+
+async def _seed_blogs(db) -> List[dict]:
+    if await db.blogs.find_one({}, {"_id": 1}) is not None:
+        return []
+
+    # 示例文章同样需要预渲染，和正常创建的文章保持一致
+    rendered = await asyncio.gather(*(render_blog_async(blog["content"]) for blog in DEMO_BLOGS))
+    now = datetime.now()
+    docs = [
+        {**blog, **result, "created_at": now, "updated_at": now}
+        for blog, result in zip(DEMO_BLOGS, rendered)
+    ]
+    await db.blogs.insert_many(docs)
+    print(f"✅ 已初始化 {len(docs)} 篇示例博客")
+    return docs
+
+
+async def _seed_about(db) -> List[dict]:
+    if await db.about.find_one({}, {"_id": 1}) is not None:
+        return []
+
+    about_data = {**DEMO_ABOUT, "updated_at": datetime.now()}
+    await db.about.insert_one(about_data)
+    print("✅ 已初始化关于我们页面数据")
+    return [about_data]
+
+
+async def seed_default_settings(db) -> List[dict]:
+    """按 key 补齐缺失的默认设置，已有的设置（包括管理员修改过的值）保持不变；返回新插入的设置"""
+    now = datetime.now()
+    docs = [{**setting, "updated_at": now} for setting in DEFAULT_SETTINGS]
+    result = await db.settings.bulk_write(
+        [UpdateOne({"key": doc["key"]}, {"$setOnInsert": doc}, upsert=True) for doc in docs],
+        ordered=False
+    )
+    inserted = [docs[index] for index in sorted(result.upserted_ids)]
+    if inserted:
+        print(f"✅ 已补齐 {len(inserted)} 个默认设置")
+    return inserted
+
+
+async def seed_demo_data(db) -> Dict[str, List[dict]]:
+    """在空集合中填充示例数据，各集合并发处理；返回每个集合插入的文档"""
+    collections = ("blogs", "services", "events", "about")
+    results = await asyncio.gather(
+        _seed_blogs(db),
+        _seed_many(db.services, DEMO_SERVICES, ("created_at",), "个示例服务"),
+        _seed_many(db.events, DEMO_EVENTS, ("created_at",), "个示例活动"),
+        _seed_about(db),
+    )
+    return dict(zip(collections, results))
@@ -0,0 +1,150 @@
+"""
+Prometheus 指标
+- HTTP：按路由模板（如 /api/blogs/{blog_id}，由 RequestContextMiddleware 解析）统计请求数、延迟直方图和处理中的请求数
+- MongoDB：通过 pymongo CommandListener 按集合和命令统计耗时与失败数
+- 连接池与响应缓存：抓取时从 pool_stats / response_cache 读取当前值
+- 密码哈希：bcrypt 执行器的排队数、执行中数量、排队耗时和拒绝数
+- 限流：按策略统计被拒绝的请求数
+
+多 worker 部署时设置 PROMETHEUS_MULTIPROC_DIR，各进程的计数器会写入该目录并在抓取时汇总
+（连接池和缓存等即时值只反映处理抓取请求的 worker，带有 pid 标签）。
+"""
+
+import os
+from typing import Dict, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from pymongo import monitoring
+
+from .cache import response_cache
+from .pool import pool_stats
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# 请求延迟的桶（秒）
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP 请求数", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP 请求处理耗时", ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "正在处理的 HTTP 请求数", ["method", "route"],
+    multiprocess_mode="livesum"
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB 命令耗时", ["collection", "command"],
+    buckets=LATENCY_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total", "MongoDB 命令失败数", ["collection", "command"]
+)
+HTTP_RATE_LIMITED = Counter(
+    "http_rate_limited_total", "被限流拒绝的请求数", ["policy"]
+)
+PASSWORD_HASH_QUEUE = Gauge(
+    "password_hash_queue_depth", "等待 bcrypt 执行器的请求数", multiprocess_mode="livesum"
+)
+PASSWORD_HASH_IN_PROGRESS = Gauge(
+    "password_hash_in_progress", "正在执行的 bcrypt 计算数", multiprocess_mode="livesum"
+)
+PASSWORD_HASH_WAIT = Histogram(
+    "password_hash_queue_wait_seconds", "bcrypt 计算的排队耗时", buckets=LATENCY_BUCKETS
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "bcrypt 计算耗时", ["operation"], buckets=LATENCY_BUCKETS
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "因排队已满或排队超时被拒绝的 bcrypt 计算数", ["reason"]
+)
+
+
+def _command_collection(event) -> str:
+    """从命令文档中取出集合名（getMore 的集合在 collection 字段中）"""
+    command = event.command
+    if event.command_name == "getMore":
+        value = command.get("collection")
+    else:
+        value = command.get(event.command_name)
+    return value if isinstance(value, str) else "-"
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """记录每条 MongoDB 命令的耗时
+
+    started 事件中记下集合名，succeeded / failed 事件中取出；
+    回调来自 Motor 的执行线程，单次 dict 操作在 GIL 下是原子的
+    """
+
+    def __init__(self):
+        self._collections: Dict[Tuple[object, int], str] = {}
+
+    def started(self, event):
+        self._collections[(event.connection_id, event.request_id)] = _command_collection(event)
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "-")
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "-")
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+
+class RuntimeCollector:
+    """抓取时读取连接池和响应缓存的当前值"""
+
+    def collect(self):
+        labels = ["pid"]
+        pid = str(os.getpid())
+
+        cache = response_cache.stats()
+        entries = GaugeMetricFamily("response_cache_entries", "响应缓存条目数", labels=labels)
+        entries.add_metric([pid], cache["entries"])
+        hit_ratio = GaugeMetricFamily("response_cache_hit_ratio", "响应缓存命中率", labels=labels)
+        hit_ratio.add_metric([pid], cache["hit_ratio"])
+        lookups = CounterMetricFamily("response_cache_lookups", "响应缓存查询数", labels=labels + ["result"])
+        lookups.add_metric([pid, "hit"], cache["hits"])
+        lookups.add_metric([pid, "miss"], cache["misses"])
+        yield from (entries, hit_ratio, lookups)
+
+        pool_labels = labels + ["server"]
+        gauges = {
+            "open_connections": GaugeMetricFamily("mongodb_pool_open_connections", "连接池中打开的连接数", labels=pool_labels),
+            "checked_out": GaugeMetricFamily("mongodb_pool_checked_out", "已借出的连接数", labels=pool_labels),
+            "waiting": GaugeMetricFamily("mongodb_pool_waiting", "等待借出连接的请求数", labels=pool_labels),
+            "wait_avg_ms": GaugeMetricFamily("mongodb_pool_wait_avg_ms", "平均借出等待时间（毫秒）", labels=pool_labels),
+        }
+        checkouts = CounterMetricFamily("mongodb_pool_checkouts", "连接借出次数", labels=pool_labels)
+        for server, stats in pool_stats.snapshot()["servers"].items():
+            for field, gauge in gauges.items():
+                gauge.add_metric([pid, server], stats[field])
+            checkouts.add_metric([pid, server], stats["checkouts"])
+        yield from gauges.values()
+        yield checkouts
+
+
+# 全局命令监听器，创建 MongoDB 客户端时注册
+command_metrics = MongoCommandMetrics()
+
+if MULTIPROC_DIR is None:
+    REGISTRY.register(RuntimeCollector())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """生成文本格式的指标"""
+    if MULTIPROC_DIR is None:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    registry.register(RuntimeCollector())
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,226 @@
+"""
+数据迁移
+已执行的迁移记录在 migrations 集合中；启动时只需一次查询即可确认没有待执行的迁移。
+有待执行的迁移时先获取 migration_locks 中的租约锁，保证多个 worker 中只有一个执行，
+相互独立的迁移并发执行，依赖其他迁移的在依赖完成后执行。
+
+可选迁移（如示例数据）默认不执行，需在配置中显式开启；开启后才会执行并记录。
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+from .config import settings
+from .init_data import seed_default_settings, seed_demo_data
+from .rendering import RENDER_VERSION, backfill_rendered_blogs
+
+# 迁移锁文档的 _id
+LOCK_ID = "migrations"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """一个迁移步骤；apply 返回简短的执行结果说明"""
+    id: str
+    description: str
+    apply: Callable[..., Awaitable[Optional[str]]]
+    depends_on: Tuple[str, ...] = ()
+    # 可选迁移：返回 True 时才执行
+    enabled: Optional[Callable[[], bool]] = None
+
+    def is_enabled(self) -> bool:
+        return self.enabled is None or self.enabled()
+
+
+async def _seed_demo_data(db) -> str:
+    # 延迟导入：versioning 和 search 都依赖 database，而 database 在启动时调度迁移
+    from ..search import get_search_engine
+    from .versioning import mark_changed
+
+    inserted = await seed_demo_data(db)
+    engine = get_search_engine()
+    if engine is not None:
+        for blog in inserted["blogs"]:
+            await engine.index(blog)
+
+    changed = [collection for collection, docs in inserted.items() if docs]
+    await asyncio.gather(*(mark_changed(collection) for collection in changed))
+    return ", ".join(f"{collection}: {len(inserted[collection])}" for collection in changed) or "无需填充"
+
+
+async def _seed_default_settings(db) -> str:
+    from .versioning import mark_changed
+
+    inserted = await seed_default_settings(db)
+    if inserted:
+        await mark_changed("settings")
+    return f"补齐 {len(inserted)} 个默认设置"
+
+
+async def _render_blogs(db) -> str:
+    from .versioning import mark_changed
+
+    count = await backfill_rendered_blogs(db)
+    if count:
+        await mark_changed("blogs")
+    return f"已预渲染 {count} 篇文章"
+
+
+# 迁移注册表（按声明顺序执行，依赖关系决定可以并发的批次）
+MIGRATIONS: List[Migration] = [
+    Migration(
+        id="default_settings",
+        description="补齐缺失的默认站点设置",
+        apply=_seed_default_settings,
+    ),
+    Migration(
+        id="demo_data",
+        description="填充示例数据（SEED_DEMO_DATA=true 时执行）",
+        apply=_seed_demo_data,
+        enabled=lambda: settings.seed_demo_data,
+    ),
+    # 渲染规则变化（RENDER_VERSION 递增）时会生成新的迁移
+    Migration(
+        id=f"render_blogs_v{RENDER_VERSION}",
+        description="预渲染旧文章的 Markdown",
+        apply=_render_blogs,
+    ),
+]
+
+# 最近一次执行的结果，供内部统计接口查看
+last_run: Optional[dict] = None
+
+# 后台迁移任务（保留引用，避免被垃圾回收）
+_migration_task: Optional[asyncio.Task] = None
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def _acquire_lock(db, owner: str) -> bool:
+    """获取迁移锁；锁已被其他进程持有且未过期时返回 False"""
+    now = datetime.utcnow()
+    try:
+        await db.migration_locks.find_one_and_update(
+            {"_id": LOCK_ID, "$or": [{"expires_at": {"$lt": now}}, {"owner": owner}]},
+            {"$set": {
+                "owner": owner,
+                "acquired_at": now,
+                "expires_at": now + timedelta(seconds=settings.migration_lock_ttl_seconds),
+            }},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # 过滤条件不匹配时 upsert 会插入同 _id 的文档，说明锁被其他进程持有
+        return False
+
+
+async def _renew_lock(db, owner: str) -> None:
+    """长时间运行的迁移定期续约，避免锁过期被其他进程抢占"""
+    interval = max(1, settings.migration_lock_ttl_seconds // 3)
+    while True:
+        await asyncio.sleep(interval)
+        await db.migration_locks.update_one(
+            {"_id": LOCK_ID, "owner": owner},
+            {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=settings.migration_lock_ttl_seconds)}}
+        )
+
+
+async def _release_lock(db, owner: str) -> None:
+    await db.migration_locks.delete_one({"_id": LOCK_ID, "owner": owner})
+
+
+async def applied_migrations(db) -> Dict[str, dict]:
+    """已执行的迁移记录"""
+    return {doc["_id"]: doc async for doc in db.migrations.find({})}
+
+
+def pending_migrations(applied: Dict[str, dict]) -> List[Migration]:
+    """尚未执行且已启用的迁移"""
+    return [m for m in MIGRATIONS if m.id not in applied and m.is_enabled()]
+
+
+async def _apply(db, migration: Migration) -> dict:
+    started = time.perf_counter()
+    try:
+        result = await migration.apply(db)
+    except Exception as e:
+        print(f"❌ 迁移 {migration.id} 失败: {e}")
+        return {"id": migration.id, "status": "failed", "error": str(e)}
+
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    await db.migrations.insert_one({
+        "_id": migration.id,
+        "description": migration.description,
+        "result": result,
+        "duration_ms": duration_ms,
+        "applied_at": datetime.now(),
+    })
+    print(f"✅ 迁移 {migration.id} 完成（{duration_ms} ms）: {result}")
+    return {"id": migration.id, "status": "applied", "result": result, "duration_ms": duration_ms}
+
+
+async def run_migrations(db) -> dict:
+    """执行待执行的迁移，返回执行结果"""
+    pending = pending_migrations(await applied_migrations(db))
+    if not pending:
+        return {"status": "up_to_date", "migrations": []}
+
+    owner = _owner()
+    if not await _acquire_lock(db, owner):
+        return {"status": "locked", "migrations": []}
+
+    renew_task = asyncio.create_task(_renew_lock(db, owner))
+    results = []
+    try:
+        # 获取锁后重新读取，其他进程可能刚刚执行完
+        applied = await applied_migrations(db)
+        pending = pending_migrations(applied)
+        done = set(applied)
+        # 未启用的可选迁移不阻塞依赖它的迁移
+        done.update(m.id for m in MIGRATIONS if not m.is_enabled())
+
+        while pending:
+            # 依赖已满足的迁移并发执行
+            ready = [m for m in pending if all(dep in done for dep in m.depends_on)]
+            if not ready:
+                # 剩余的迁移依赖失败的迁移，留到下次启动
+                results.extend({"id": m.id, "status": "skipped"} for m in pending)
+                break
+
+            for result in await asyncio.gather(*(_apply(db, m) for m in ready)):
+                results.append(result)
+                if result["status"] == "applied":
+                    done.add(result["id"])
+            pending = [m for m in pending if m not in ready]
+    finally:
+        renew_task.cancel()
+        await _release_lock(db, owner)
+
+    return {"status": "applied", "migrations": results}
+
+
+async def _migrate_in_background(db) -> None:
+    global last_run
+    try:
+        last_run = await run_migrations(db)
+        if last_run["status"] == "locked":
+            print("⚠️ 迁移正在由其他进程执行")
+    except Exception as e:
+        print(f"❌ 数据迁移失败: {e}")
+
+
+def schedule_migrations(db) -> None:
+    """在后台执行迁移，不阻塞启动"""
+    global _migration_task
+    _migration_task = asyncio.create_task(_migrate_in_background(db))
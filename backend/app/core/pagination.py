@@ -0,0 +1,99 @@
+"""
+游标分页（keyset pagination）
+游标对调用方是不透明的字符串，内部编码排序键 (date, _id)，
+翻页时用范围条件定位，避免 skip 带来的深翻页开销。
+搜索结果按相关度排序，没有稳定的排序键，使用偏移量游标。
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+
+# 默认每页条数
+DEFAULT_PAGE_SIZE = 20
+
+# 每页最大条数
+MAX_PAGE_SIZE = 100
+
+
+def _encode(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="无效的分页游标"
+    )
+
+
+def _decode(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise _invalid_cursor()
+    if not isinstance(data, dict):
+        raise _invalid_cursor()
+    return data
+
+
+def encode_cursor(date: datetime, doc_id: ObjectId) -> str:
+    """将排序键编码为不透明游标"""
+    return _encode({"d": date.isoformat(), "i": str(doc_id)})
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """解码游标，格式错误时返回 400"""
+    data = _decode(cursor)
+    try:
+        return datetime.fromisoformat(data["d"]), ObjectId(data["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise _invalid_cursor()
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """将偏移量编码为不透明游标（用于按相关度排序的搜索结果）"""
+    return _encode({"o": offset})
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    """解码偏移量游标"""
+    offset = _decode(cursor).get("o")
+    if not isinstance(offset, int) or offset < 0:
+        raise _invalid_cursor()
+    return offset
+
+
+def apply_cursor(query: dict, cursor: Optional[str]) -> dict:
+    """在查询条件上追加游标位置（按 date, _id 降序）"""
+    if not cursor:
+        return query
+
+    date, doc_id = decode_cursor(cursor)
+    after = {
+        "$or": [
+            {"date": {"$lt": date}},
+            {"date": date, "_id": {"$lt": doc_id}}
+        ]
+    }
+
+    if not query:
+        return after
+    return {"$and": [query, after]}
+
+
+def next_cursor(docs: list, limit: int) -> Optional[str]:
+    """根据多取的一条判断是否还有下一页，并截断结果"""
+    if len(docs) <= limit:
+        return None
+
+    del docs[limit:]
+    last = docs[-1]
+    return encode_cursor(last["date"], last["_id"])
@@ -0,0 +1,177 @@
+"""
+MongoDB 连接池配置与监控
+连接池参数来自 Settings；PoolStats 通过 pymongo 的 ConnectionPoolListener
+统计借出连接数、借出等待时间、连接创建/关闭等事件，供内部统计接口使用。
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, Tuple
+
+from pymongo import monitoring
+
+from .config import settings
+
+# 借出等待时间直方图的桶上限（毫秒）
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def mongo_client_options() -> dict:
+    """构建 AsyncIOMotorClient 的连接池和驱动参数，未配置的项保持驱动默认值"""
+    options = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+    }
+    if settings.mongo_max_idle_time_ms is not None:
+        options["maxIdleTimeMS"] = settings.mongo_max_idle_time_ms
+    if settings.mongo_wait_queue_timeout_ms is not None:
+        options["waitQueueTimeoutMS"] = settings.mongo_wait_queue_timeout_ms
+    if settings.mongo_compressors:
+        # zstd 需要 zstandard，snappy 需要 python-snappy；不可用的算法会被驱动忽略
+        options["compressors"] = settings.mongo_compressors
+    return options
+
+
+class _AddressStats:
+    """单个服务器地址的连接池统计"""
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.checkouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.failures = Counter()
+        self.created = 0
+        self.closed = Counter()
+        self.cleared = 0
+
+    def snapshot(self) -> dict:
+        histogram = {f"<={bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+        histogram[f">{WAIT_BUCKETS_MS[-1]}ms"] = self.wait_buckets[-1]
+        return {
+            "open_connections": self.open,
+            "checked_out": self.checked_out,
+            "max_checked_out": self.max_checked_out,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "checkouts": self.checkouts,
+            "checkout_failures": dict(self.failures),
+            "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max_ms, 3),
+            "wait_histogram": histogram,
+            "connections_created": self.created,
+            "connections_closed": dict(self.closed),
+            "pool_cleared": self.cleared,
+        }
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """连接池事件监听器
+
+    Motor 在线程池中调用 pymongo，事件回调来自多个线程：
+    统计数据由锁保护，借出开始时间按线程记录（每个线程同一时刻只会借出一个连接）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._addresses: Dict[Tuple[str, int], _AddressStats] = {}
+
+    def _stats(self, address) -> _AddressStats:
+        stats = self._addresses.get(address)
+        if stats is None:
+            stats = self._addresses[address] = _AddressStats()
+        return stats
+
+    def _end_wait(self, stats: _AddressStats) -> float:
+        stats.waiting = max(0, stats.waiting - 1)
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+
+    # 连接池事件
+    def pool_created(self, event):
+        with self._lock:
+            self._stats(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._stats(event.address).cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    # 连接事件
+    def connection_created(self, event):
+        with self._lock:
+            stats = self._stats(event.address)
+            stats.created += 1
+            stats.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            stats = self._stats(event.address)
+            stats.open = max(0, stats.open - 1)
+            stats.closed[event.reason] += 1
+
+    # 借出 / 归还事件
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            stats = self._stats(event.address)
+            stats.waiting += 1
+            stats.max_waiting = max(stats.max_waiting, stats.waiting)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            stats = self._stats(event.address)
+            self._end_wait(stats)
+            stats.failures[event.reason] += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            stats = self._stats(event.address)
+            wait_ms = self._end_wait(stats)
+            stats.checked_out += 1
+            stats.max_checked_out = max(stats.max_checked_out, stats.checked_out)
+            stats.checkouts += 1
+            stats.wait_total_ms += wait_ms
+            stats.wait_max_ms = max(stats.wait_max_ms, wait_ms)
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    stats.wait_buckets[i] += 1
+                    break
+            else:
+                stats.wait_buckets[-1] += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            stats = self._stats(event.address)
+            stats.checked_out = max(0, stats.checked_out - 1)
+
+    def snapshot(self) -> dict:
+        """按服务器地址汇总的统计信息"""
+        with self._lock:
+            servers = {f"{host}:{port}": stats.snapshot() for (host, port), stats in self._addresses.items()}
+        return {
+            "max_pool_size": settings.mongo_max_pool_size,
+            "min_pool_size": settings.mongo_min_pool_size,
+            "servers": servers,
+        }
+
+
+# 全局连接池监听器
+pool_stats = PoolStats()
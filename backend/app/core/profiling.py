@@ -0,0 +1,200 @@
+"""
+按需性能剖析
+管理员请求携带 X-Profile 请求头（或 _profile 查询参数）时，该请求在 pyinstrument 下执行：
+- 调用树以 pyinstrument 会话文件保存在 PROFILE_DIR 中，可通过内部接口下载为 HTML / 文本 / speedscope JSON
+- 通过 Server-Timing 响应头返回总耗时、等待耗时（await）、MongoDB 命令耗时和 CPU 耗时
+
+pyinstrument 的 async 模式只把发起剖析的任务计入调用树，但采样钩子（setstatprofile）作用于整个线程，
+剖析期间同一 worker 事件循环上的所有请求都要承担钩子的开销。因此每个 worker 同时只允许一个剖析，
+其他携带标记的请求返回 409；未携带标记的请求只多一次请求头检查。
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+from pymongo import monitoring
+
+from .config import settings
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import ConsoleRenderer, HTMLRenderer, SpeedscopeRenderer
+    from pyinstrument.session import Session
+except ImportError:  # pyinstrument 为可选依赖，未安装时剖析不可用
+    Profiler = None
+
+# 触发剖析的请求头和查询参数；取值为 html 时直接返回剖析报告而不是原响应
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "_profile"
+
+# 下载格式 -> Content-Type（speedscope 格式可导入 https://www.speedscope.app 查看火焰图）
+PROFILE_FORMATS = {
+    "html": "text/html; charset=utf-8",
+    "text": "text/plain; charset=utf-8",
+    "speedscope": "application/json",
+}
+
+_PROFILE_ID = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+
+class RequestProfile:
+    """一次剖析请求中累计的 MongoDB 命令耗时（命令在 Motor 的执行线程中完成，list.append 是原子的）"""
+
+    def __init__(self):
+        self.id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        self.mongo_durations: List[float] = []
+
+    @property
+    def mongo_ms(self) -> float:
+        return sum(self.mongo_durations) * 1000
+
+
+# 当前请求的剖析记录；未剖析的请求为 None
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+class ProfileCommandListener(monitoring.CommandListener):
+    """把 MongoDB 命令耗时计入正在剖析的请求（Motor 执行命令时复制了请求的上下文）"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        profile = current_profile.get()
+        if profile is not None:
+            profile.mongo_durations.append(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+# 全局监听器，创建 MongoDB 客户端时注册
+profile_commands = ProfileCommandListener()
+
+
+def profiling_available() -> bool:
+    return Profiler is not None and settings.profiling_enabled
+
+
+def requested_mode(scope) -> Optional[str]:
+    """请求中的剖析标记：None 表示不剖析，"html" 表示直接返回报告，其他值表示保存报告"""
+    for key, value in scope["headers"]:
+        if key == PROFILE_HEADER:
+            return value.decode("latin-1").strip().lower() or "1"
+    query = scope["query_string"]
+    if PROFILE_QUERY.encode() in query:
+        values = parse_qs(query.decode("latin-1")).get(PROFILE_QUERY)
+        if values:
+            return values[0].strip().lower() or "1"
+    return None
+
+
+# 本 worker 是否有正在进行的剖析（事件循环单线程，不需要加锁）
+_active = False
+
+
+def start_profiler() -> Optional["Profiler"]:
+    """开始剖析；本 worker 已有请求在剖析时返回 None"""
+    global _active
+    if _active:
+        return None
+    profiler = Profiler(interval=settings.profile_interval, async_mode="enabled")
+    profiler.start()
+    _active = True
+    return profiler
+
+
+def stop_profiler(profiler: "Profiler") -> "Session":
+    global _active
+    try:
+        return profiler.stop()
+    finally:
+        _active = False
+
+
+def summarize(profile: RequestProfile, session: "Session", endpoint: str, status: int) -> dict:
+    """耗时拆分：await 为请求协程挂起的时间（其中包括 MongoDB 命令），cpu 为其余在事件循环中执行的时间"""
+    duration_ms = session.duration * 1000
+    root = session.root_frame()
+    await_ms = root.await_time() * 1000 if root is not None else 0.0
+    return {
+        "id": profile.id,
+        "endpoint": endpoint,
+        "status": status,
+        "created_at": session.start_time,
+        "duration_ms": round(duration_ms, 2),
+        "await_ms": round(await_ms, 2),
+        "cpu_ms": round(max(0.0, duration_ms - await_ms), 2),
+        "mongo_ms": round(profile.mongo_ms, 2),
+        "mongo_commands": len(profile.mongo_durations),
+        "samples": session.sample_count,
+    }
+
+
+def server_timing(summary: dict) -> str:
+    """Server-Timing 响应头，浏览器开发者工具中可直接查看"""
+    return ", ".join(
+        f"{name};dur={summary[field]}"
+        for name, field in (("total", "duration_ms"), ("await", "await_ms"), ("mongo", "mongo_ms"), ("cpu", "cpu_ms"))
+    )
+
+
+def render(session: "Session", format: str) -> str:
+    if format == "html":
+        return HTMLRenderer().render(session)
+    if format == "speedscope":
+        return SpeedscopeRenderer().render(session)
+    return ConsoleRenderer(unicode=True, show_all=False).render(session)
+
+
+def _path(profile_id: str, suffix: str) -> str:
+    return os.path.join(settings.profile_dir, f"{profile_id}{suffix}")
+
+
+def save_profile(session: "Session", summary: dict) -> None:
+    """保存会话和摘要，只保留最近 PROFILE_KEEP 份（多个 worker 共享同一目录）"""
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    session.save(_path(summary["id"], ".pyisession"))
+    with open(_path(summary["id"], ".json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False)
+
+    for profile_id in list_profile_ids()[settings.profile_keep:]:
+        for suffix in (".pyisession", ".json"):
+            try:
+                os.remove(_path(profile_id, suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profile_ids() -> List[str]:
+    """按时间倒序排列的剖析记录 ID"""
+    if not os.path.isdir(settings.profile_dir):
+        return []
+    ids = [name[:-5] for name in os.listdir(settings.profile_dir) if name.endswith(".json")]
+    return sorted((i for i in ids if _PROFILE_ID.match(i)), reverse=True)
+
+
+def list_profiles() -> List[dict]:
+    summaries = []
+    for profile_id in list_profile_ids():
+        try:
+            with open(_path(profile_id, ".json"), encoding="utf-8") as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # 正在被其他 worker 清理
+    return summaries
+
+
+def load_profile(profile_id: str) -> Optional["Session"]:
+    if not _PROFILE_ID.match(profile_id) or Profiler is None:
+        return None
+    try:
+        return Session.load(_path(profile_id, ".pyisession"))
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,82 @@
+"""
+稀疏字段集（sparse fieldsets）
+将 ?fields=title,date 形式的查询参数转换为 MongoDB projection，
+列表接口默认只返回卡片展示需要的摘要字段
+"""
+
+from typing import Iterable, List, Optional, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+# 博客列表默认返回的摘要字段（不含 Markdown 正文）
+BLOG_SUMMARY_FIELDS = (
+    "title", "excerpt", "cover", "date", "tags",
+    "category", "author", "read_time", "word_count", "published"
+)
+
+# 显式请求完整文档
+ALL_FIELDS = "*"
+
+
+def model_fields(model: Type[BaseModel]) -> List[str]:
+    """获取模型可投影的字段名（_id 总是返回，不在此列）"""
+    return [name for name in model.model_fields if name != "id"]
+
+
+def parse_fields(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    default: Optional[Iterable[str]] = None
+) -> Optional[List[str]]:
+    """解析 fields 参数，返回字段列表；None 表示返回完整文档"""
+    if fields is None or fields.strip() == "":
+        return list(default) if default is not None else None
+
+    if fields.strip() == ALL_FIELDS:
+        return None
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    allowed = set(allowed)
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"未知字段: {', '.join(unknown)}"
+        )
+
+    # 去重并保持顺序
+    return list(dict.fromkeys(requested))
+
+
+def build_projection(
+    fields: Optional[List[str]],
+    required: Iterable[str] = (),
+    hidden: Iterable[str] = ()
+) -> Optional[dict]:
+    """构建 MongoDB projection
+
+    required 为服务端逻辑必须读取的字段；hidden 为只供内部使用、
+    返回完整文档时也要排除的字段
+    """
+    if fields is None:
+        hidden = tuple(hidden)
+        return {field: 0 for field in hidden} if hidden else None
+
+    projection = {field: 1 for field in fields}
+    for field in required:
+        projection[field] = 1
+    return projection
+
+
+def document_projection(
+    fields: Optional[List[str]],
+    allowed: Iterable[str],
+    required: Iterable[str] = ()
+) -> dict:
+    """快速序列化路径使用的 projection
+
+    读接口直接返回文档、不再经过 response_model 过滤，因此返回完整文档时
+    也按模型字段白名单读取，内部字段（如 search_terms、render_version）不会泄露
+    """
+    return build_projection(list(allowed) if fields is None else fields, required)
@@ -0,0 +1,115 @@
+"""
+Markdown 预渲染
+文章写入时把 Markdown 渲染为经过清洗的 HTML（代码块由 Pygments 高亮），
+同时生成目录、字数和阅读时长，读取时直接返回预先计算的结果。
+旧文章由迁移 render_blogs_v<RENDER_VERSION> 回填。
+"""
+
+import math
+import re
+
+import markdown
+import nh3
+from markdown.extensions.codehilite import CodeHiliteExtension
+from markdown.extensions.toc import TocExtension, slugify_unicode
+from pymongo import UpdateOne
+from starlette.concurrency import run_in_threadpool
+
+from ..search.tokenizer import CJK_RANGES
+
+# 渲染结果的版本号；修改渲染规则后递增，启动时会重新渲染旧版本的文章
+RENDER_VERSION = 1
+
+# 阅读速度：中文按字、英文按词计算
+CJK_CHARS_PER_MINUTE = 400
+LATIN_WORDS_PER_MINUTE = 200
+
+# 允许保留的 HTML 标签和属性（Pygments 高亮依赖 class，目录锚点依赖 id）
+ALLOWED_TAGS = nh3.ALLOWED_TAGS | {"pre", "code", "span", "div"}
+ALLOWED_ATTRIBUTES = {
+    "*": {"class", "id", "title"},
+    "a": {"href"},
+    "img": {"src", "alt", "width", "height"},
+    "th": {"align"},
+    "td": {"align"},
+}
+ALLOWED_URL_SCHEMES = {"http", "https", "mailto"}
+
+_CJK_RE = re.compile(f"[{CJK_RANGES}]")
+_LATIN_WORD_RE = re.compile(r"[A-Za-z0-9\u00c0-\u024f]+(?:['\u2019-][A-Za-z0-9\u00c0-\u024f]+)*")
+
+# 回填时每批写入的文档数
+_BACKFILL_BATCH = 100
+
+
+def _markdown() -> markdown.Markdown:
+    # Markdown 实例有内部状态且不是线程安全的，每次渲染单独创建
+    return markdown.Markdown(extensions=[
+        "fenced_code",
+        "tables",
+        "sane_lists",
+        TocExtension(slugify=slugify_unicode, permalink=False),
+        CodeHiliteExtension(css_class="highlight", guess_lang=False),
+    ])
+
+
+def count_words(text: str) -> int:
+    """统计字数：每个中日韩文字算一个字，拉丁文字按单词计"""
+    return len(_CJK_RE.findall(text)) + len(_LATIN_WORD_RE.findall(text))
+
+
+def estimate_read_time(text: str) -> str:
+    """估算阅读时长，例如 "8 分钟" """
+    cjk = len(_CJK_RE.findall(text))
+    latin = len(_LATIN_WORD_RE.findall(text))
+    minutes = math.ceil(cjk / CJK_CHARS_PER_MINUTE + latin / LATIN_WORDS_PER_MINUTE)
+    return f"{max(1, minutes)} 分钟"
+
+
+def render_blog(content: str) -> dict:
+    """渲染文章正文，返回需要和源文一起存储的字段"""
+    md = _markdown()
+    html = md.convert(content or "")
+    html = nh3.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        url_schemes=ALLOWED_URL_SCHEMES,
+        link_rel="noopener noreferrer",
+    )
+
+    return {
+        "content_html": html,
+        "toc": md.toc_tokens,
+        "word_count": count_words(content or ""),
+        "read_time": estimate_read_time(content or ""),
+        "render_version": RENDER_VERSION,
+    }
+
+
+async def render_blog_async(content: str) -> dict:
+    """在线程池中渲染，长文章不会阻塞事件循环"""
+    return await run_in_threadpool(render_blog, content)
+
+
+async def backfill_rendered_blogs(db) -> int:
+    """渲染尚未预渲染或渲染版本过旧的文章，返回处理的数量（由迁移 render_blogs_v* 调用）"""
+    query = {"$or": [
+        {"render_version": {"$exists": False}},
+        {"render_version": {"$lt": RENDER_VERSION}},
+    ]}
+
+    count = 0
+    batch = []
+    async for doc in db.blogs.find(query, {"content": 1}):
+        rendered = await render_blog_async(doc.get("content", ""))
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": rendered}))
+        if len(batch) >= _BACKFILL_BATCH:
+            await db.blogs.bulk_write(batch, ordered=False)
+            count += len(batch)
+            batch = []
+    if batch:
+        await db.blogs.bulk_write(batch, ordered=False)
+        count += len(batch)
+
+    return count
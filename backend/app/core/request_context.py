@@ -0,0 +1,57 @@
+"""
+请求上下文
+在请求开始时解析路由模板并写入 ContextVar。Motor 在线程池中执行 pymongo 时会复制上下文，
+因此命令监听器（指标、慢查询日志）也能知道命令是由哪个接口发出的。
+"""
+
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from starlette.routing import Match
+
+# 没有匹配到任何路由的请求统一使用该标签，避免扫描类请求造成标签数量膨胀
+UNMATCHED_ROUTE = "unmatched"
+
+# 当前请求的 (方法, 路由模板)；后台任务中为 None
+current_route: ContextVar[Optional[Tuple[str, str]]] = ContextVar("current_route", default=None)
+
+
+class RouteResolver:
+    """在路由匹配之前解析路由模板（处理中请求数等指标需要在请求开始时确定标签）
+
+    匹配结果按 (method, path) 缓存，热门路径只需一次字典查找
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._cache: Dict[Tuple[str, str], str] = {}
+
+    def resolve(self, scope) -> str:
+        key = (scope["method"], scope["path"])
+        template = self._cache.get(key)
+        if template is not None:
+            return template
+
+        template = UNMATCHED_ROUTE
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                template = route.path
+                break
+            if match == Match.PARTIAL and template == UNMATCHED_ROUTE:
+                # 路径匹配但方法不匹配（405），与 Starlette 一样继续寻找完全匹配
+                template = route.path
+
+        if len(self._cache) >= self.max_entries:
+            self._cache.clear()
+        self._cache[key] = template
+        return template
+
+
+route_resolver = RouteResolver()
+
+
+def endpoint_label() -> str:
+    """当前请求的 "方法 路由模板"，不在请求中时返回 "-" """
+    route = current_route.get()
+    return f"{route[0]} {route[1]}" if route else "-"
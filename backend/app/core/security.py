@@ -1,8 +1,11 @@
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from .config import settings
+from .tokens import revocations, token_cache, token_digest
 
 # 密码加密上下文 - 使用 bcrypt_sha256 来处理长密码
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__truncate_error=True)
@@ -26,15 +29,26 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     
-    to_encode.update({"exp": expire})
+    # iat_ms 用于判断令牌是否签发于修改密码之前（iat 只精确到秒）；
+    # jti 保证同一秒内签发的令牌互不相同，可以单独吊销，调用方可以预先指定
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "iat_ms": int(time.time() * 1000)})
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
 
 def verify_token(token: str) -> Optional[dict]:
-    """验证令牌"""
-    try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        return payload
-    except JWTError:
+    """验证令牌：签名验证结果缓存到令牌过期，吊销检查每次都在内存中进行"""
+    digest = token_digest(token)
+    payload = token_cache.get(digest)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        except JWTError:
+            return None
+        token_cache.put(digest, payload)
+
+    if revocations.is_revoked(digest, payload):
         return None
+    # 返回副本，调用方修改声明不会影响缓存
+    return dict(payload)
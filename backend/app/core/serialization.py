@@ -0,0 +1,50 @@
+"""
+快速 JSON 序列化
+读接口直接把 MongoDB 文档编码为 JSON，不再逐条经过 response_model 校验；
+ObjectId 和 datetime 在编码器内部处理，不需要逐条转换或复制文档。
+
+只用于“可信文档”：即由本服务按模型写入、并且已按模型字段白名单投影的文档
+（见 projection.document_projection）。
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from bson import ObjectId
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时退回标准库 json
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """编码器无法直接处理的类型"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        # orjson 原生支持 datetime，只有标准库路径会走到这里
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """编码为 UTF-8 JSON 字节串"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """使用 orjson 编码的 JSON 响应，同时作为应用的默认响应类"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,127 @@
+"""
+生产模式启动器
+使用 gunicorn 管理多个 uvicorn worker：master 预加载应用后 fork，
+worker 处理一定数量的请求后自动重启，收到 SIGTERM 时等待处理中的请求完成再退出。
+所有参数来自 Settings（环境变量 / .env）。
+
+gunicorn 不支持 Windows，此时退回 uvicorn 自带的多进程模式（不支持预加载和 worker 回收）。
+"""
+
+import os
+import shutil
+
+import uvicorn
+
+from .config import settings
+
+APP_PATH = "app.main:app"
+
+
+def worker_count() -> int:
+    """worker 进程数；未配置时每个可用 CPU 核心一个（异步 worker 不需要 2n+1）"""
+    if settings.workers > 0:
+        return settings.workers
+    if hasattr(os, "sched_getaffinity"):
+        # 容器中按实际可用的核心计算
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def uvicorn_options() -> dict:
+    """worker 内 uvicorn 的参数"""
+    return {
+        "loop": settings.server_loop,
+        "http": settings.server_http,
+        "timeout_graceful_shutdown": settings.graceful_timeout,
+    }
+
+
+def gunicorn_options() -> dict:
+    return {
+        "bind": f"{settings.host}:{settings.port}",
+        "workers": worker_count(),
+        "worker_class": "app.core.server.ProductionWorker",
+        "preload_app": settings.preload_app,
+        "max_requests": settings.max_requests,
+        "max_requests_jitter": settings.max_requests_jitter if settings.max_requests else 0,
+        "graceful_timeout": settings.graceful_timeout,
+        "keepalive": settings.keepalive,
+        "accesslog": "-",
+        "errorlog": "-",
+    }
+
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+except ImportError:  # Windows 或未安装 gunicorn
+    BaseApplication = None
+else:
+    class ProductionWorker(UvicornWorker):
+        """按 Settings 选择事件循环和 HTTP 解析器的 uvicorn worker"""
+        CONFIG_KWARGS = uvicorn_options()
+
+    class ProductionServer(BaseApplication):
+        """以代码方式配置的 gunicorn 应用"""
+
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # preload_app 时在 master 中执行一次，否则在每个 worker 中执行
+            from ..main import app
+            return app
+
+
+def _child_exit(server, worker) -> None:
+    """worker 退出时清理其 Prometheus 多进程指标文件中的即时值"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def _reset_metrics_dir(path: str) -> None:
+    """启动前清空多进程指标目录，避免累计上一次运行的计数"""
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def run_production() -> None:
+    """以生产模式启动服务"""
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        _reset_metrics_dir(metrics_dir)
+
+    if BaseApplication is None:
+        workers = worker_count()
+        print(f"⚠️ 未找到 gunicorn，使用 uvicorn 多进程模式启动 {workers} 个 worker")
+        uvicorn.run(
+            APP_PATH,
+            host=settings.host,
+            port=settings.port,
+            workers=workers,
+            log_level="info",
+            **uvicorn_options()
+        )
+        return
+
+    options = gunicorn_options()
+    if metrics_dir:
+        options["child_exit"] = _child_exit
+    print(f"🚀 生产模式启动：{options['workers']} 个 worker，监听 {options['bind']}")
+    ProductionServer(options).run()
+
+
+def run_development() -> None:
+    """开发模式：单进程，代码修改后自动重载"""
+    uvicorn.run(
+        APP_PATH,
+        host=settings.host,
+        port=settings.port,
+        reload=True,
+        log_level="info"
+    )
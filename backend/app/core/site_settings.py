@@ -0,0 +1,54 @@
+"""
+站点设置快照
+前台每个页面都需要站点名称、联系方式等设置，设置数量很少且很少修改，
+因此每个 worker 在内存中保存一份完整快照，并记录加载时 settings 列表的内容版本号（每次写入都会递增）。
+读取时比较版本号（由 content_versions 在本地缓存 CONTENT_VERSION_TTL 秒），
+本 worker 的写入通过 mark_changed() 立即生效，其他 worker 的写入最多在该间隔后生效。
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from . import database
+from .cache import list_tag
+from .versioning import content_versions
+
+# 设置集合名（同时是内容版本号的集合名）
+SETTINGS_COLLECTION = "settings"
+
+
+class SettingsSnapshot:
+    """按内容版本号刷新的设置快照"""
+
+    def __init__(self):
+        # 设置键 -> 值（只读，调用方不能修改）
+        self._values: Dict[str, Any] = {}
+        self._version: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self.loads = 0
+
+    async def get(self) -> Dict[str, Any]:
+        """返回所有设置，版本号变化时重新加载"""
+        version, _ = await content_versions.get([list_tag(SETTINGS_COLLECTION)])
+        if version == self._version:
+            return self._values
+
+        async with self._lock:
+            # 等待锁期间其他请求可能已经完成加载
+            if version != self._version:
+                await self._load(version)
+        return self._values
+
+    async def _load(self, version: str) -> None:
+        # 先取版本号再读文档，读到的内容不会比记录的版本旧；期间的写入会递增版本号并触发下一次加载
+        cursor = database.get_database()[SETTINGS_COLLECTION].find({}, {"_id": 0, "key": 1, "value": 1})
+        self._values = {doc["key"]: doc["value"] async for doc in cursor}
+        self._version = version
+        self.loads += 1
+
+    def stats(self) -> dict:
+        return {"keys": len(self._values), "version": self._version, "loads": self.loads}
+
+
+# 全局快照
+settings_snapshot = SettingsSnapshot()
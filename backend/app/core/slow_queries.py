@@ -0,0 +1,215 @@
+"""
+慢查询日志
+通过 pymongo CommandListener 找出耗时超过 SLOW_QUERY_MS 的命令，记录归一化的查询形状、
+发出命令的接口和耗时，写入固定大小集合 slow_queries。
+每种查询形状第一次变慢时，在后台执行 explain 并把执行计划随记录一起保存。
+
+监听器回调运行在 Motor 的执行线程中，只做阈值判断；归一化、explain 和写入都交给事件循环。
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from bson import json_util
+from pymongo import monitoring
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+from .config import settings
+from .request_context import endpoint_label
+
+# 慢查询记录集合（固定大小集合，旧记录自动淘汰）
+SLOW_QUERY_COLLECTION = "slow_queries"
+
+# 参与查询形状的命令字段
+SHAPE_FIELDS = ("filter", "sort", "projection", "pipeline", "query", "key", "hint", "updates", "deletes", "q", "u")
+
+# 可以 explain 的命令
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+# 不监控的命令：慢查询日志自身的写入和 explain
+IGNORED_COMMANDS = {"explain"}
+
+# explain 时去掉的会话和传输相关字段（以 $ 开头的字段也会去掉）
+TRANSPORT_FIELDS = ("lsid", "txnNumber", "readConcern", "writeConcern")
+
+
+def _shape_value(value):
+    """保留字段名和操作符结构，把具体取值替换为占位符"""
+    if isinstance(value, dict):
+        return {key: _shape_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        # $and / $or / pipeline 等由子文档组成的数组保留结构，$in 等取值数组合并为一个占位符
+        if value and all(isinstance(item, dict) for item in value):
+            return [_shape_value(item) for item in value]
+        return ["?"]
+    return "?"
+
+
+def query_shape(command_name: str, command: dict) -> dict:
+    """命令的归一化形状，例如 {"find": "blogs", "filter": {"category": "?"}, "sort": {"date": "?"}}"""
+    shape = {command_name: command.get(command_name)}
+    for field in SHAPE_FIELDS:
+        if field in command:
+            value = command[field]
+            # 排序方向和投影开关属于形状的一部分，不替换
+            shape[field] = value if field in ("sort", "projection", "hint") else _shape_value(value)
+    return shape
+
+
+def shape_id(shape: dict) -> str:
+    return hashlib.blake2b(json_util.dumps(shape, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def explain_command(command: dict) -> dict:
+    """去掉会话、读偏好等传输相关字段，得到可以放入 explain 的命令"""
+    return {
+        key: value for key, value in command.items()
+        if not key.startswith("$") and key not in TRANSPORT_FIELDS
+    }
+
+
+def summarize_plan(explain: dict) -> list:
+    """把 winningPlan 展开为阶段列表，例如 ["FETCH", "IXSCAN blogs_published_date"]"""
+    planner = explain.get("queryPlanner", {})
+    plan = planner.get("winningPlan", {})
+    # 聚合命令的计划在第一个 $cursor 阶段中
+    if not plan and explain.get("stages"):
+        first = explain["stages"][0].get("$cursor", {})
+        plan = first.get("queryPlanner", {}).get("winningPlan", {})
+    plan = plan.get("queryPlan", plan)  # 基于 SBE 的计划多包一层
+
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage = f"{stage} {plan['indexName']}"
+        stages.append(stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return stages
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """慢命令监听器"""
+
+    def __init__(self):
+        self._db = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # (连接, 请求 ID) -> (命令名, 命令文档, 接口)
+        self._started: Dict[Tuple[object, int], Tuple[str, dict, str]] = {}
+        # 本进程已经 explain 过的形状
+        self._explained: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(self, db) -> None:
+        """绑定数据库和事件循环，在后台创建固定大小集合"""
+        self._db = db
+        self._loop = asyncio.get_running_loop()
+        self._spawn(self._ensure_collection())
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None and settings.slow_query_ms > 0
+
+    # 监听器回调（Motor 执行线程）
+    def started(self, event):
+        if not self.enabled or event.command_name in IGNORED_COMMANDS:
+            return
+        if event.command.get(event.command_name) == SLOW_QUERY_COLLECTION:
+            return
+        self._started[(event.connection_id, event.request_id)] = (
+            event.command_name, event.command, endpoint_label()
+        )
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event) -> None:
+        started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < settings.slow_query_ms:
+            return
+        command_name, command, endpoint = started
+        try:
+            self._loop.call_soon_threadsafe(
+                self._spawn, self._record(command_name, command, endpoint, event.database_name, duration_ms)
+            )
+        except RuntimeError:
+            pass  # 事件循环已关闭（进程退出中）
+
+    # 事件循环中执行
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _ensure_collection(self) -> None:
+        try:
+            await self._db.create_collection(
+                SLOW_QUERY_COLLECTION, capped=True, size=settings.slow_query_log_bytes
+            )
+        except CollectionInvalid:
+            pass  # 已存在
+        except PyMongoError as e:
+            print(f"⚠️ 慢查询日志集合创建失败: {e}")
+
+    async def _record(self, command_name: str, command: dict, endpoint: str, database: str, duration_ms: float) -> None:
+        collection = command.get(command_name) if command_name != "getMore" else command.get("collection")
+        shape = query_shape(command_name, command)
+        sid = shape_id(shape)
+        print(f"⚠️ 慢查询 {duration_ms:.1f}ms {endpoint} {collection}.{command_name} {json_util.dumps(shape, ensure_ascii=False)}")
+
+        # 形状中有 $in 等以 $ 开头的字段名，以 JSON 字符串保存
+        record = {
+            "shape_id": sid,
+            "shape": json_util.dumps(shape, ensure_ascii=False),
+            "collection": collection,
+            "command": command_name,
+            "endpoint": endpoint,
+            "duration_ms": round(duration_ms, 2),
+            "created_at": datetime.utcnow(),
+        }
+
+        try:
+            if sid not in self._explained and command_name in EXPLAINABLE_COMMANDS and settings.slow_query_explain:
+                self._explained.add(sid)
+                # 其他 worker 可能已经记录过该形状的执行计划
+                if await self._db[SLOW_QUERY_COLLECTION].find_one({"shape_id": sid, "plan": {"$exists": True}}, {"_id": 1}) is None:
+                    explain = await self._db.client[database].command(
+                        "explain", explain_command(command), verbosity="queryPlanner"
+                    )
+                    record["plan"] = summarize_plan(explain)
+                    planner = {key: explain[key] for key in ("queryPlanner", "stages") if key in explain}
+                    record["explain"] = json_util.dumps(planner, ensure_ascii=False)
+            await self._db[SLOW_QUERY_COLLECTION].insert_one(record)
+        except Exception as e:
+            print(f"⚠️ 慢查询记录失败: {e}")
+
+
+# 全局慢查询监听器，创建 MongoDB 客户端时注册
+slow_query_log = SlowQueryLog()
+
+
+async def recent_slow_queries(db, limit: int = 50, shape: Optional[str] = None, endpoint: Optional[str] = None) -> list:
+    """按写入顺序倒序读取慢查询记录（形状和执行计划以 JSON 字符串保存，返回前解码）"""
+    query = {}
+    if shape:
+        query["shape_id"] = shape
+    if endpoint:
+        query["endpoint"] = endpoint
+    cursor = db[SLOW_QUERY_COLLECTION].find(query).sort("$natural", -1).limit(limit)
+    records = []
+    async for record in cursor:
+        record["_id"] = str(record["_id"])
+        record["shape"] = json.loads(record["shape"])
+        if "explain" in record:
+            record["explain"] = json.loads(record["explain"])
+        records.append(record)
+    return records
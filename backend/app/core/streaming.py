@@ -0,0 +1,76 @@
+"""
+流式 JSON 响应
+按批迭代 Motor 游标，边读边写出 JSON 数组或 NDJSON，
+内存占用与结果集大小无关，首字节时间只取决于第一批数据。
+"""
+
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, status
+from starlette.responses import StreamingResponse
+
+from .serialization import dumps
+
+# 每批从数据库读取、编码并写出的文档数
+STREAM_BATCH_SIZE = 100
+
+# 支持的输出格式
+STREAM_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def stream_format(format: Optional[str]) -> str:
+    """校验 format 参数，默认 JSON 数组
+
+    格式只由查询参数决定（而不是 Accept 头），响应缓存按 URL 区分不同格式
+    """
+    if not format:
+        return "json"
+    if format not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的格式: {format}"
+        )
+    return format
+
+
+async def _batches(cursor, batch_size: int) -> AsyncIterator[list]:
+    batch = []
+    try:
+        async for doc in cursor.batch_size(batch_size):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        # 客户端提前断开时及时释放服务端游标
+        await cursor.close()
+
+
+async def iter_json_array(cursor, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """逐批写出 JSON 数组：[ 文档, 文档, ... ]"""
+    first = True
+    async for batch in _batches(cursor, batch_size):
+        chunk = b",".join(dumps(doc) for doc in batch)
+        yield (b"[" if first else b",") + chunk
+        first = False
+    yield b"[]" if first else b"]"
+
+
+async def iter_ndjson(cursor, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """逐批写出 NDJSON：每行一个文档"""
+    async for batch in _batches(cursor, batch_size):
+        yield b"".join(dumps(doc) + b"\n" for doc in batch)
+
+
+def stream_cursor(cursor, format: str = "json", filename: Optional[str] = None) -> StreamingResponse:
+    """把游标包装为流式响应；filename 不为空时作为附件下载"""
+    body = iter_ndjson(cursor) if format == "ndjson" else iter_json_array(cursor)
+    headers = {}
+    if filename:
+        headers["content-disposition"] = f'attachment; filename="{filename}.{format}"'
+    return StreamingResponse(body, media_type=STREAM_FORMATS[format], headers=headers)
@@ -0,0 +1,194 @@
+"""
+令牌校验缓存与吊销
+- 校验通过的 JWT 声明按令牌摘要缓存到令牌的 exp 为止，管理后台连续请求同一个令牌时不再重复验证签名
+- 吊销记录保存在 token_revocations 集合中（TTL 索引在令牌过期后自动删除），
+  各 worker 每 TOKEN_REVOCATION_SYNC_SECONDS 秒全量同步到内存，请求中的吊销检查只是字典查找
+
+吊销分两种：退出登录吊销单个令牌；修改密码吊销该用户在此之前签发的所有令牌（按毫秒精度的签发时间 iat_ms 比较，
+同一秒内先后签发的令牌也能区分），修改密码时返回的新令牌按 jti 豁免。
+发起吊销的 worker 立即生效，其他 worker 在下一次同步后生效。
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+
+# 吊销记录集合
+REVOCATIONS_COLLECTION = "token_revocations"
+
+
+def token_digest(token: str) -> str:
+    """缓存和吊销记录中只保存令牌的摘要"""
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+def issued_at_ms(claims: dict) -> int:
+    """令牌的签发时间（毫秒）；旧版本签发的令牌只有秒级的 iat，没有 iat 的视为最早"""
+    if "iat_ms" in claims:
+        return int(claims["iat_ms"])
+    return int(claims.get("iat", 0)) * 1000
+
+
+def _collection():
+    # 延迟导入：database 在导入时依赖本模块
+    from .database import get_database
+    return get_database()[REVOCATIONS_COLLECTION]
+
+
+class TokenCache:
+    """有界的已验证令牌声明缓存（LRU），条目在令牌过期时失效"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # 摘要 -> (声明, 过期时间戳)
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: str) -> Optional[dict]:
+        entry = self._entries.get(digest)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[digest]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, digest: str, claims: dict) -> None:
+        # 没有 exp 的令牌不缓存
+        if self.max_entries <= 0 or "exp" not in claims:
+            return
+        self._entries[digest] = (claims, float(claims["exp"]))
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, digest: str) -> None:
+        self._entries.pop(digest, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class RevocationList:
+    """内存中的吊销记录，定期从数据库同步"""
+
+    def __init__(self):
+        # 被吊销的令牌摘要 -> 过期时间戳
+        self._tokens: Dict[str, float] = {}
+        # 用户 ID -> (该毫秒时间戳之前签发的令牌无效, 豁免的 jti)
+        self._users: Dict[str, Tuple[int, Optional[str]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.synced_at: Optional[datetime] = None
+
+    def is_revoked(self, digest: str, claims: dict) -> bool:
+        if digest in self._tokens:
+            return True
+        entry = self._users.get(claims.get("id"))
+        if entry is None:
+            return False
+        not_before_ms, keep_jti = entry
+        if keep_jti is not None and claims.get("jti") == keep_jti:
+            return False
+        # 与吊销同一毫秒签发的令牌也无法确定先后，一并视为无效
+        return issued_at_ms(claims) <= not_before_ms
+
+    async def revoke_token(self, token: str, claims: dict) -> None:
+        """吊销单个令牌（退出登录）"""
+        digest = token_digest(token)
+        expires = float(claims.get("exp", time.time()))
+        await _collection().update_one(
+            {"_id": f"token:{digest}"},
+            {"$set": {
+                "digest": digest,
+                "user_id": claims.get("id"),
+                "revoked_at": datetime.utcnow(),
+                "expires_at": datetime.utcfromtimestamp(expires),
+            }},
+            upsert=True
+        )
+        self._tokens[digest] = expires
+        token_cache.discard(digest)
+
+    async def revoke_user(self, user_id: str, keep_jti: Optional[str] = None) -> int:
+        """吊销用户在此之前签发的所有令牌（修改密码），keep_jti 指定的令牌除外，返回生效的毫秒时间戳"""
+        not_before_ms = int(time.time() * 1000)
+        now = datetime.utcnow()
+        await _collection().update_one(
+            {"_id": f"user:{user_id}"},
+            {"$set": {
+                "user_id": user_id,
+                "not_before_ms": not_before_ms,
+                "keep_jti": keep_jti,
+                "revoked_at": now,
+                # 此后最长有效期内签发的令牌都已过期，记录可以删除
+                "expires_at": now + timedelta(minutes=settings.access_token_expire_minutes),
+            }},
+            upsert=True
+        )
+        self._merge_user(user_id, not_before_ms, keep_jti)
+        return not_before_ms
+
+    def _merge_user(self, user_id: str, not_before_ms: int, keep_jti: Optional[str]) -> None:
+        # 以较晚的一次吊销为准，豁免的 jti 随之替换
+        current = self._users.get(user_id)
+        if current is None or not_before_ms >= current[0]:
+            self._users[user_id] = (not_before_ms, keep_jti)
+
+    async def sync(self) -> None:
+        """全量读取未过期的吊销记录（记录数受令牌有效期限制，通常很少）
+
+        吊销不会被撤销，因此与内存中的记录合并而不是替换，同步期间本 worker 新增的吊销不会丢失
+        """
+        now = time.time()
+        self._tokens = {digest: expires for digest, expires in self._tokens.items() if expires > now}
+        async for doc in _collection().find({"expires_at": {"$gt": datetime.utcnow()}}):
+            if "digest" in doc:
+                self._tokens[doc["digest"]] = doc["expires_at"].replace(tzinfo=timezone.utc).timestamp()
+            else:
+                # 旧记录只有秒级的 not_before
+                not_before_ms = doc.get("not_before_ms", doc.get("not_before", 0) * 1000)
+                self._merge_user(doc["user_id"], not_before_ms, doc.get("keep_jti"))
+        self.synced_at = datetime.utcnow()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"⚠️ 令牌吊销记录同步失败: {e}")
+            await asyncio.sleep(settings.token_revocation_sync_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "tokens": len(self._tokens),
+            "users": len(self._users),
+            "synced_at": self.synced_at,
+        }
+
+
+# 全局缓存和吊销记录
+token_cache = TokenCache(settings.token_cache_max_entries)
+revocations = RevocationList()
@@ -0,0 +1,129 @@
+"""
+内容版本号
+content_versions 中每个标签（见 cache.changed_tags）有一个单调递增的版本号，写接口通过 mark_changed() 递增：
+"<集合>:list" 在每次写入时递增，"<集合>:<文档ID>" 在该文档被修改时递增，"<集合>:*" 在整个集合被修改时递增。
+接口依赖的标签（cache.request_tags）的版本号用于生成 ETag / Last-Modified，也作为响应缓存键的一部分，
+这样其他 worker 的写入也能在版本号刷新后立即生效，而不必等待缓存过期；修改一篇文章不会让其他文章的详情失效。
+各 worker 在本地缓存版本号 CONTENT_VERSION_TTL 秒，避免每个请求都查询数据库。
+
+列表和集合标签的版本号文档在第一次读取时创建（版本号 0，最后修改时间为创建时间），
+因此即使从未写入过，响应也带有 Last-Modified；从未修改过的文档沿用集合标签的最后修改时间。
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .cache import changed_tags, invalidate
+from .config import settings
+from . import database
+
+# 版本号集合名
+VERSIONS_COLLECTION = "content_versions"
+
+# 本地缓存的标签数上限（详情标签随文档数增长）
+MAX_CACHED_TAGS = 10000
+
+
+def is_collection_level(tag: str) -> bool:
+    """列表和整个集合的标签，读取时不存在则创建"""
+    return tag.endswith((":list", ":*"))
+
+
+class ContentVersions:
+    """带本地缓存的标签版本号"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        # 标签 -> (版本号, 最后修改时间, 本地读取时间)
+        self._cache: Dict[str, Tuple[int, Optional[datetime], float]] = {}
+        # 正在进行的读取，避免缓存过期瞬间的并发请求重复查询
+        self._pending: Dict[Tuple[str, ...], asyncio.Task] = {}
+
+    async def get(self, tags: Sequence[str]) -> Tuple[str, Optional[datetime]]:
+        """获取一组标签的组合版本号（如 "3.1"）和其中最新的最后修改时间（UTC）"""
+        now = time.monotonic()
+        cached = [self._cache.get(tag) for tag in tags]
+        if all(entry is not None and now - entry[2] < self.ttl_seconds for entry in cached):
+            return self._combine(cached)
+
+        # 读取在独立的任务中进行，发起读取的请求被取消（如客户端断开）时其他等待者仍能拿到结果
+        key = tuple(tags)
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load_combined(tags))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    async def _load_combined(self, tags: Sequence[str]) -> Tuple[str, Optional[datetime]]:
+        return self._combine(await self._load(tags))
+
+    def _finish(self, key: Tuple[str, ...], task: asyncio.Task) -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        # 所有等待者都已取消时，避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, tags: Sequence[str]) -> List[Tuple[int, Optional[datetime], float]]:
+        collection = database.get_database()[VERSIONS_COLLECTION]
+        docs = {doc["_id"]: doc async for doc in collection.find({"_id": {"$in": list(tags)}})}
+        for tag in tags:
+            if tag not in docs and is_collection_level(tag):
+                docs[tag] = await self._seed(collection, tag)
+
+        if len(self._cache) >= MAX_CACHED_TAGS:
+            self._cache.clear()
+        loaded_at = time.monotonic()
+        entries = []
+        for tag in tags:
+            doc = docs.get(tag)
+            entry = (doc["version"], doc.get("updated_at"), loaded_at) if doc else (0, None, loaded_at)
+            self._cache[tag] = entry
+            entries.append(entry)
+        return entries
+
+    @staticmethod
+    async def _seed(collection, tag: str) -> dict:
+        try:
+            return await collection.find_one_and_update(
+                {"_id": tag},
+                {"$setOnInsert": {"version": 0, "updated_at": datetime.utcnow()}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # 其他 worker 同时创建
+            return await collection.find_one({"_id": tag})
+
+    @staticmethod
+    def _combine(entries) -> Tuple[str, Optional[datetime]]:
+        version = ".".join(str(entry[0]) for entry in entries)
+        modified = [entry[1] for entry in entries if entry[1] is not None]
+        return version, max(modified) if modified else None
+
+    async def bump(self, tag: str) -> int:
+        """递增标签的版本号"""
+        doc = await database.get_database()[VERSIONS_COLLECTION].find_one_and_update(
+            {"_id": tag},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._cache[tag] = (doc["version"], doc["updated_at"], time.monotonic())
+        return doc["version"]
+
+
+# 全局版本号
+content_versions = ContentVersions(settings.content_version_ttl)
+
+
+async def mark_changed(collection: str, doc_id: Optional[str] = None) -> None:
+    """文档写入后调用：递增受影响标签的版本号，并清除本 worker 中受影响的缓存"""
+    await asyncio.gather(*(content_versions.bump(tag) for tag in changed_tags(collection, doc_id)))
+    invalidate(collection, doc_id)
@@ -0,0 +1,27 @@
+"""
+写入辅助函数
+写接口需要返回写入后的文档。update_one 之后再 find_one 需要两次往返，
+两次之间其他请求的写入还可能让返回的文档与本次写入不一致；
+find_one_and_update 在一次往返中原子地完成更新并返回更新后的文档。
+"""
+
+from typing import Optional
+
+from pymongo import ReturnDocument
+
+
+async def update_and_fetch(
+    collection,
+    filter: dict,
+    update: dict,
+    projection: Optional[dict] = None,
+    upsert: bool = False
+) -> Optional[dict]:
+    """更新一个文档并返回更新后的文档；没有匹配的文档（且不 upsert）时返回 None"""
+    return await collection.find_one_and_update(
+        filter,
+        update,
+        projection=projection,
+        upsert=upsert,
+        return_document=ReturnDocument.AFTER
+    )
@@ -1,12 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from datetime import datetime
 import os
 
 from .core.config import settings
 from .core.database import connect_to_mongo, close_mongo_connection
-from .routers import auth, blog, service, event, settings as settings_router, about
+from .core.health import loop_monitor
+from .core.metrics import render_metrics
+from .core.serialization import FastJSONResponse
+from .middleware.cache import ResponseCacheMiddleware
+from .middleware.compression import CompressionMiddleware
+from .middleware.conditional import ConditionalRequestMiddleware
+from .middleware.context import RequestContextMiddleware
+from .middleware.metrics import MetricsMiddleware
+from .middleware.profiling import ProfilingMiddleware
+from .middleware.ratelimit import RateLimitMiddleware
+from .routers import auth, blog, service, event, settings as settings_router, about, internal, health
 
 
 # 创建 FastAPI 应用
@@ -15,9 +24,27 @@ app = FastAPI(
     title="SNC Blog API",
     description="Backend API for SNC Blog",
     version="2.0.0",
-    redirect_slashes=False
+    redirect_slashes=False,
+    # 所有 JSON 响应使用 orjson 编码
+    default_response_class=FastJSONResponse
 )
 
+# 响应缓存（需位于 CORS 内层，避免缓存随请求来源变化的 CORS 响应头）
+app.add_middleware(ResponseCacheMiddleware)
+
+# 条件请求（ETag / 304），位于响应缓存外层
+app.add_middleware(ConditionalRequestMiddleware)
+
+# 响应压缩（Brotli / gzip），响应缓存中已压缩的结果原样透传
+app.add_middleware(CompressionMiddleware)
+
+# 限流（位于响应缓存外层，命中缓存的请求同样计数；位于 CORS 内层，429 响应带有 CORS 响应头）
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware)
+
+# 按需剖析（管理员请求携带 X-Profile 时生效），位于 CORS 内层，剖析报告带有 CORS 响应头
+app.add_middleware(ProfilingMiddleware)
+
 # CORS 配置
 app.add_middleware(
     CORSMiddleware,
@@ -27,11 +54,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 请求指标（延迟包含其余中间件的耗时）
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# 请求上下文（最外层）：解析路由模板，供指标和 MongoDB 命令监听器使用
+app.add_middleware(RequestContextMiddleware)
+
 
 # 启动事件
 @app.on_event("startup")
 async def startup_event():
     """应用启动时执行"""
+    loop_monitor.start()
     await connect_to_mongo()
     
     # 创建uploads目录（如果不存在）
@@ -46,6 +81,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭时执行"""
+    loop_monitor.stop()
     await close_mongo_connection()
 
 
@@ -61,16 +97,17 @@ app.include_router(service.router, prefix="/api/services", tags=["服务"])
 app.include_router(event.router, prefix="/api/events", tags=["活动"])
 app.include_router(settings_router.router, prefix="/api/settings", tags=["设置"])
 app.include_router(about.router, prefix="/api/about", tags=["关于我们"])
+app.include_router(internal.router, prefix="/api/internal", tags=["内部"])
+app.include_router(health.router, prefix="/api/health", tags=["健康检查"])
 
 
-# 健康检查
-@app.get("/api/health", tags=["健康检查"])
-async def health_check():
-    """健康检查接口"""
-    return {
-        "status": "ok",
-        "timestamp": datetime.now().isoformat()
-    }
+# Prometheus 指标
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """文本格式的 Prometheus 指标"""
+        body, content_type = render_metrics()
+        return Response(body, headers={"content-type": content_type})
 
 
 # 根路由
@@ -0,0 +1,115 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.cache import response_cache, cache_key, request_tags
+from ..core.compression import compress, encoded_headers, is_compressible, request_encoding
+from ..core.config import settings
+
+# 可以缓存的公开接口前缀
+CACHEABLE_PREFIXES = ("/api/blogs", "/api/services", "/api/events", "/api/settings", "/api/about")
+
+
+def is_authorized(scope: Scope) -> bool:
+    """携带 Authorization 的请求（管理后台、导出）不经过共享缓存"""
+    return any(key == b"authorization" for key, _ in scope["headers"])
+
+
+class ResponseCacheMiddleware:
+    """缓存公开 GET 接口的 200 响应（纯 ASGI 实现，命中时不经过路由和数据库）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not settings.cache_enabled
+            or not scope["path"].startswith(CACHEABLE_PREFIXES)
+            or is_authorized(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope["path"], scope["query_string"])
+        # 外层 ConditionalRequestMiddleware 写入的该接口所依赖标签的版本号，其他 worker 写入后旧缓存不再命中
+        version = scope.get("state", {}).get("content_version")
+        if version is not None:
+            key = f"{key}#{version}"
+        encoding = request_encoding(scope)
+        entry = response_cache.get(key)
+        if entry is not None:
+            headers, body = entry.headers, entry.body
+            if encoding is not None and is_compressible(headers, len(body)):
+                body = entry.variants.get(encoding)
+                if body is None:
+                    body = compress(entry.body, encoding, cached=True)
+                    entry.variants[encoding] = body
+                headers = encoded_headers(headers, encoding, len(body))
+
+            await send({
+                "type": "http.response.start",
+                "status": entry.status,
+                "headers": headers + [(b"x-cache", b"HIT")],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        # 200 响应的响应头暂存到第一块响应体到达，单块响应可以在这里压缩并保存压缩结果
+        start_message = None
+        captured_headers = []
+        chunks = []
+        size = 0
+        cacheable = True
+        tags = None
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal start_message, captured_headers, size, cacheable, tags
+
+            if message["type"] == "http.response.start":
+                cacheable = message["status"] == 200
+                if cacheable:
+                    start_message = message
+                    captured_headers = list(message.get("headers", []))
+                    _, tags = request_tags(scope)
+                else:
+                    await send({**message, "headers": list(message.get("headers", [])) + [(b"x-cache", b"MISS")]})
+                return
+
+            if message["type"] != "http.response.body" or not cacheable:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                start, start_message = start_message, None
+
+                if not more_body and len(body) <= settings.cache_max_entry_bytes:
+                    response_cache.set(key, start["status"], captured_headers, body, tags)
+                    headers = captured_headers
+                    if encoding is not None and is_compressible(headers, len(body)):
+                        compressed = compress(body, encoding, cached=True)
+                        response_cache.add_variant(key, encoding, compressed)
+                        headers = encoded_headers(headers, encoding, len(compressed))
+                        body = compressed
+                    await send({**start, "headers": headers + [(b"x-cache", b"MISS")]})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                await send({**start, "headers": captured_headers + [(b"x-cache", b"MISS")]})
+
+            # 分块响应：边转发边保留副本
+            size += len(body)
+            if size > settings.cache_max_entry_bytes:
+                # 过大的响应（如流式导出）不缓存，也不再保留副本
+                cacheable = False
+                chunks.clear()
+            else:
+                chunks.append(body)
+                if not more_body:
+                    response_cache.set(key, 200, captured_headers, b"".join(chunks), tags)
+
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
@@ -0,0 +1,88 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.compression import (
+    StreamCompressor, compress, encoded_headers, get_header, is_compressible, request_encoding
+)
+
+
+def _with_vary(headers: list) -> list:
+    """未压缩但可能被压缩的响应也要声明 Vary，避免共享缓存把它返回给其他客户端"""
+    vary = get_header(headers, b"vary")
+    if vary is None:
+        return headers + [(b"vary", b"Accept-Encoding")]
+    if b"accept-encoding" in vary.lower():
+        return headers
+    return [(k, v) for k, v in headers if k != b"vary"] + [(b"vary", vary + b", Accept-Encoding")]
+
+
+class CompressionMiddleware:
+    """Brotli / gzip 响应压缩
+
+    已带 Content-Encoding 的响应（如响应缓存返回的预压缩结果）原样透传；
+    单块响应一次性压缩，分块（流式）响应逐块压缩。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # HEAD 响应没有响应体，保持原样
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = request_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if message["status"] in (204, 304) or not is_compressible(headers):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # 等到第一块响应体再决定是否压缩
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                headers = list(start_message.get("headers", []))
+
+                if not more_body:
+                    # 单块响应：小于阈值时不压缩
+                    if not is_compressible(headers, len(body)):
+                        passthrough = True
+                        await send({**start_message, "headers": _with_vary(headers)})
+                        await send(message)
+                        return
+                    body = compress(body, encoding)
+                    await send({**start_message, "headers": encoded_headers(headers, encoding, len(body))})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                # 分块响应：长度未知，去掉 Content-Length 后流式压缩
+                compressor = StreamCompressor(encoding)
+                await send({**start_message, "headers": encoded_headers(headers, encoding, None)})
+                start_message = None
+
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,125 @@
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.cache import cache_key, request_tags
+from ..core.compression import ETAG_SUFFIXES, etag_with_encoding, get_header, strip_etag_encoding
+from ..core.config import settings
+from ..core.versioning import content_versions
+from .cache import CACHEABLE_PREFIXES, is_authorized
+
+
+def make_etag(collection: str, version: str, path: str, query_string: bytes) -> str:
+    """强 ETag：接口所依赖标签的版本号 + 请求变体摘要，不需要对响应体求哈希"""
+    variant = hashlib.blake2b(cache_key(path, query_string).encode(), digest_size=8).hexdigest()
+    return f'"{collection}-{version}-{variant}"'
+
+
+def matching_etag(if_none_match: str, etag: str) -> Optional[str]:
+    """返回 If-None-Match 中与当前 ETag 匹配的项（忽略压缩编码后缀），没有则返回 None"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return etag
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if strip_etag_encoding(candidate) == etag:
+            return candidate
+    return None
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _not_modified_since(if_modified_since: str, last_modified) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP 日期只精确到秒
+    return last_modified.replace(microsecond=0) <= since
+
+
+class ConditionalRequestMiddleware:
+    """为公开 GET 接口添加 ETag / Last-Modified / Cache-Control，并在命中时直接返回 304
+
+    ETag 由接口所依赖标签的版本号计算（列表依赖 "<集合>:list"，详情依赖 "<集合>:*" 和 "<集合>:<文档ID>"），
+    校验在路由之前完成，304 响应不会访问业务数据
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or not scope["path"].startswith(CACHEABLE_PREFIXES)
+            or is_authorized(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        collection, tags = request_tags(scope)
+        if collection is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            version, updated_at = await content_versions.get(tags)
+        except Exception:
+            # 版本号不可用时退化为普通请求
+            await self.app(scope, receive, send)
+            return
+
+        # 供响应缓存使用：版本号变化后旧的缓存项自然失效
+        scope.setdefault("state", {})["content_version"] = version
+
+        etag = make_etag(collection, version, scope["path"], scope["query_string"])
+        last_modified = updated_at.replace(tzinfo=timezone.utc) if updated_at else None
+
+        validators = [
+            (b"cache-control", f"public, max-age={settings.http_cache_max_age}, must-revalidate".encode()),
+        ]
+        if last_modified is not None:
+            validators.append((b"last-modified", format_datetime(last_modified, usegmt=True).encode()))
+
+        if_none_match = _header(scope, b"if-none-match")
+        if_modified_since = _header(scope, b"if-modified-since")
+        matched = None
+        if if_none_match is not None:
+            matched = matching_etag(if_none_match, etag)
+            not_modified = matched is not None
+        elif if_modified_since is not None and last_modified is not None:
+            not_modified = _not_modified_since(if_modified_since, last_modified)
+        else:
+            not_modified = False
+
+        if not_modified:
+            # 304 回显客户端持有的那个表示的 ETag（可能带压缩编码后缀）
+            headers = validators + [(b"etag", (matched or etag).encode())]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [(k, v) for k, v in message.get("headers", []) if k not in (b"etag", b"last-modified")]
+                # 响应缓存返回的预压缩结果需要带编码后缀的 ETag
+                encoding = (get_header(headers, b"content-encoding") or b"").decode()
+                etag_value = etag.encode()
+                if encoding in ETAG_SUFFIXES:
+                    etag_value = etag_with_encoding(etag_value, encoding)
+                message = {**message, "headers": headers + validators + [(b"etag", etag_value)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
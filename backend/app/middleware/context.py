@@ -0,0 +1,21 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..core.request_context import current_route, route_resolver
+
+
+class RequestContextMiddleware:
+    """解析路由模板并写入请求上下文（位于最外层，供指标和命令监听器使用）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_route.set((scope["method"], route_resolver.resolve(scope)))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
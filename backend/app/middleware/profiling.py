@@ -0,0 +1,79 @@
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import HTMLResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.profiling import (
+    RequestProfile, current_profile, profiling_available, render, requested_mode,
+    save_profile, server_timing, start_profiler, stop_profiler, summarize
+)
+from ..core.request_context import endpoint_label
+from ..core.serialization import FastJSONResponse
+from .auth import get_current_user, security
+
+
+class ProfilingMiddleware:
+    """管理员请求携带剖析标记时，在 pyinstrument 下执行该请求
+
+    响应在剖析结束前缓冲，以便在响应头中返回 Server-Timing 和 X-Profile-Id；
+    标记为 html 时以剖析报告代替原响应。位于 CORS 内层，剖析报告同样带有 CORS 响应头
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        mode = requested_mode(scope) if scope["type"] == "http" and profiling_available() else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        # 与管理接口相同的认证方式
+        try:
+            await get_current_user(await security(Request(scope)))
+        except HTTPException as e:
+            response = FastJSONResponse({"detail": e.detail}, status_code=e.status_code)
+            await response(scope, receive, send)
+            return
+
+        profiler = start_profiler()
+        if profiler is None:
+            response = FastJSONResponse({"detail": "其他请求正在剖析，请稍后重试"}, status_code=409)
+            await response(scope, receive, send)
+            return
+
+        messages = []
+
+        async def buffer(message: Message) -> None:
+            messages.append(message)
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, buffer)
+        finally:
+            session = stop_profiler(profiler)
+            current_profile.reset(token)
+
+        # 应用没有发送任何响应时，由服务器返回 500
+        status = messages[0]["status"] if messages else 500
+        summary = summarize(profile, session, endpoint_label(), status)
+        await run_in_threadpool(save_profile, session, summary)
+        headers = [
+            (b"server-timing", server_timing(summary).encode()),
+            (b"x-profile-id", profile.id.encode()),
+        ]
+
+        if mode == "html":
+            report = await run_in_threadpool(render, session, "html")
+            response = HTMLResponse(report, headers={key.decode(): value.decode() for key, value in headers})
+            await response(scope, receive, send)
+            return
+
+        if not messages:
+            return
+        start = messages[0]
+        start["headers"] = list(start.get("headers", [])) + headers
+        for message in messages:
+            await send(message)
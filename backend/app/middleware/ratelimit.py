@@ -0,0 +1,33 @@
+import math
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..core.metrics import HTTP_RATE_LIMITED
+from ..core.serialization import FastJSONResponse
+from ..ratelimit import rate_limiter
+
+
+class RateLimitMiddleware:
+    """按接口策略限流，超出时返回 429 和 Retry-After（位于 CORS 内层，浏览器可以读取 429 响应）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        checked = await rate_limiter.check(scope)
+        if checked is not None and not checked[1].allowed:
+            policy, result = checked
+            HTTP_RATE_LIMITED.labels(policy.name).inc()
+            response = FastJSONResponse(
+                {"detail": "请求过于频繁，请稍后重试"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(result.retry_after)))}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,176 @@
+"""
+请求限流
+按接口选择限流策略（令牌桶），桶按客户端划分：已登录的请求按用户，其余按客户端 IP。
+令牌桶状态保存在 RATE_LIMIT_BACKEND 选择的存储中：
+- memory：进程内（单进程部署或开发模式）
+- shared：共享内存，同一台服务器上的所有 worker 共享（需要 PRELOAD_APP=true）
+- redis：Redis 或兼容 Redis 协议的服务，多台服务器共享
+
+客户端 IP 取自 ASGI scope；直接连接的地址属于 TRUSTED_PROXIES（IP 或网段，逗号分隔）时，
+从 X-Forwarded-For 的右端向左跳过可信代理，第一个不可信的地址即客户端 IP。
+不在可信列表中的连接携带的 X-Forwarded-For 一律忽略，无法伪造。
+"""
+
+import ipaddress
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+from urllib.parse import parse_qsl
+
+from ..core.config import settings
+from ..core.request_context import current_route, route_resolver
+from ..core.security import verify_token
+from .base import RateLimitResult, RateLimitStore
+from .memory import MemoryStore
+from .redis_store import RedisStore, redis
+from .shared import SharedMemoryStore
+
+# 限流字符串中的时间单位
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# 不限流的接口（健康检查和指标抓取）
+EXEMPT_PREFIXES = ("/api/health", "/metrics")
+
+# 登录和其他需要计算 bcrypt 的接口
+LOGIN_ROUTES = {
+    ("POST", "/api/auth/login"),
+    ("POST", "/api/auth/setup"),
+    ("POST", "/api/auth/change-password"),
+}
+
+# 支持 search 查询参数的接口
+SEARCH_ROUTES = {("GET", "/api/blogs"), ("GET", "/api/blogs/")}
+
+
+def parse_limit(limit: str) -> Tuple[float, float]:
+    """把 "10/minute" 形式的限流解析为 (每秒补充的令牌数, 桶容量)"""
+    count, _, period = limit.partition("/")
+    if period not in PERIODS or int(count) <= 0:
+        raise ValueError(f"无效的限流配置: {limit}")
+    return int(count) / PERIODS[period], float(count)
+
+
+@dataclass
+class RateLimitPolicy:
+    """一类接口的限流策略"""
+    name: str
+    limit: str
+    by_user: bool  # 已登录的请求按用户计数；否则始终按 IP 计数
+
+    def __post_init__(self):
+        self.rate, self.burst = parse_limit(self.limit)
+
+
+POLICIES = {
+    # 防止暴力破解密码，始终按 IP 计数
+    "login": RateLimitPolicy("login", settings.rate_limit_login, by_user=False),
+    # 全文搜索需要分词、打分和生成高亮摘要，开销远大于命中缓存的读接口
+    "search": RateLimitPolicy("search", settings.rate_limit_search, by_user=False),
+    "write": RateLimitPolicy("write", settings.rate_limit_write, by_user=True),
+    # 公开读接口大多命中响应缓存，限制最宽松
+    "read": RateLimitPolicy("read", settings.rate_limit_read, by_user=True),
+}
+
+
+def select_policy(method: str, template: str, query_string: bytes) -> Optional[RateLimitPolicy]:
+    """按接口选择限流策略，不限流时返回 None"""
+    if method == "OPTIONS" or template.startswith(EXEMPT_PREFIXES):
+        return None
+    if (method, template) in LOGIN_ROUTES:
+        return POLICIES["login"]
+    if (method, template) in SEARCH_ROUTES and b"search=" in query_string:
+        if any(key == "search" and value for key, value in parse_qsl(query_string.decode("latin-1"))):
+            return POLICIES["search"]
+    if method in ("GET", "HEAD"):
+        return POLICIES["read"]
+    return POLICIES["write"]
+
+
+def parse_networks(value: str) -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    """解析逗号分隔的 IP / 网段列表"""
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip()]
+
+
+TRUSTED_PROXIES = parse_networks(settings.trusted_proxies)
+
+
+def is_trusted(host: str, networks=None) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in (TRUSTED_PROXIES if networks is None else networks))
+
+
+def client_ip(scope, networks=None) -> str:
+    """客户端 IP：直接连接的地址是可信代理时，取 X-Forwarded-For 中最右侧的不可信地址"""
+    client = scope.get("client")
+    host = client[0] if client else "unknown"
+    if not is_trusted(host, networks):
+        return host
+
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-for":
+            for forwarded in reversed(value.decode("latin-1").split(",")):
+                forwarded = forwarded.strip()
+                if forwarded and not is_trusted(forwarded, networks):
+                    return forwarded
+            break
+    return host
+
+
+def client_identity(scope, by_user: bool) -> str:
+    """令牌有效时按用户计数（随意伪造的令牌无法绕过按 IP 的限制），否则按客户端 IP"""
+    if by_user:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                claims = verify_token(token) if scheme.lower() == "bearer" and token else None
+                if claims is not None:
+                    return f"user:{claims.get('id')}"
+                break
+    return f"ip:{client_ip(scope)}"
+
+
+class RateLimiter:
+    """按策略和客户端检查令牌桶"""
+
+    def __init__(self, store: RateLimitStore):
+        self.store = store
+        self.rejected: Counter = Counter()
+
+    async def check(self, scope) -> Optional[Tuple[RateLimitPolicy, RateLimitResult]]:
+        route = current_route.get() or (scope["method"], route_resolver.resolve(scope))
+        policy = select_policy(route[0], route[1], scope.get("query_string", b""))
+        if policy is None:
+            return None
+        key = f"{policy.name}:{client_identity(scope, policy.by_user)}"
+        result = await self.store.take(key, policy.rate, policy.burst)
+        if not result.allowed:
+            self.rejected[policy.name] += 1
+        return policy, result
+
+    def stats(self) -> dict:
+        return {
+            **self.store.stats(),
+            "policies": {name: policy.limit for name, policy in POLICIES.items()},
+            "rejected": dict(self.rejected),
+        }
+
+
+def create_store(name: str) -> RateLimitStore:
+    """根据名称创建限流存储"""
+    if name == "memory":
+        return MemoryStore(settings.rate_limit_max_keys)
+    if name == "shared":
+        return SharedMemoryStore(settings.rate_limit_max_keys)
+    if name == "redis":
+        if redis is None:
+            print("⚠️ 未安装 redis，限流改用进程内存储")
+            return MemoryStore(settings.rate_limit_max_keys)
+        return RedisStore.from_url(settings.redis_url)
+    raise ValueError(f"未知的限流存储: {name}")
+
+
+# 全局限流器（在 master 预加载应用时创建，shared 存储的共享内存由 worker 继承）
+rate_limiter = RateLimiter(create_store(settings.rate_limit_backend))
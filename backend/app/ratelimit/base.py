@@ -0,0 +1,37 @@
+"""
+限流存储接口
+令牌桶：容量为 burst，每秒补充 rate 个令牌，每个请求消耗一个令牌，桶空时拒绝。
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass
+class RateLimitResult:
+    """一次令牌桶检查的结果"""
+    allowed: bool
+    remaining: float  # 检查后桶中剩余的令牌数
+    retry_after: float  # 被拒绝时距离下一个令牌补充的秒数
+
+
+def refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> Tuple[float, RateLimitResult]:
+    """按经过的时间补充令牌并尝试取出一个，返回 (新的令牌数, 结果)"""
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1:
+        tokens -= 1
+        return tokens, RateLimitResult(True, tokens, 0.0)
+    return tokens, RateLimitResult(False, tokens, (1 - tokens) / rate)
+
+
+class RateLimitStore:
+    """令牌桶状态的存储"""
+
+    name = "base"
+
+    async def take(self, key: str, rate: float, burst: float) -> RateLimitResult:
+        """从 key 对应的桶中取出一个令牌"""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
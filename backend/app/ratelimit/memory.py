@@ -0,0 +1,34 @@
+"""
+进程内限流存储（单进程部署或开发模式），多 worker 部署时各 worker 分别计数
+"""
+
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from .base import RateLimitResult, RateLimitStore, refill
+
+
+class MemoryStore(RateLimitStore):
+    """进程内的令牌桶，超过 max_keys 时淘汰最久未使用的桶"""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> (令牌数, 更新时间)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float) -> RateLimitResult:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens, result = refill(tokens, updated, now, rate, burst)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            # 被淘汰的桶下次从满桶开始，淘汰的总是最久没有请求的客户端
+            self._buckets.popitem(last=False)
+        return result
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "keys": len(self._buckets)}
@@ -0,0 +1,78 @@
+"""
+Redis 限流存储（多 worker、多台服务器共享）
+令牌桶的补充和扣减在一个 Lua 脚本中原子完成，时间取 Redis 服务器时钟，桶在补满后自动过期。
+兼容 Redis 协议的服务（如 Valkey、KeyDB）都可以使用，本地测试可以传入 fakeredis 客户端。
+
+Redis 不可用时放行请求（限流失效好过整个站点不可用），并打印一次警告。
+"""
+
+from .base import RateLimitResult, RateLimitStore
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # redis 为可选依赖，只有 RATE_LIMIT_BACKEND=redis 时需要
+    redis = None
+
+KEY_PREFIX = "snc:ratelimit:"
+
+# KEYS[1] = 桶；ARGV = rate, burst；返回 {是否放行, 剩余令牌数, 重试秒数}（小数以字符串返回）
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1])
+local updated = tonumber(state[2])
+if tokens == nil then
+    tokens = burst
+    updated = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+class RedisStore(RateLimitStore):
+    """Redis 中的令牌桶"""
+
+    name = "redis"
+
+    def __init__(self, client):
+        self.client = client
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        self.failures = 0
+        self._failing = False
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisStore":
+        # 连接在第一次请求时才建立，预加载后 fork 的 worker 各自连接
+        return cls(redis.from_url(url))
+
+    async def take(self, key: str, rate: float, burst: float) -> RateLimitResult:
+        try:
+            allowed, tokens, retry_after = await self._script(keys=[KEY_PREFIX + key], args=[rate, burst])
+        except Exception as e:
+            self.failures += 1
+            if not self._failing:
+                self._failing = True
+                print(f"⚠️ Redis 限流存储不可用，暂时放行所有请求: {e}")
+            return RateLimitResult(True, burst, 0.0)
+
+        if self._failing:
+            self._failing = False
+            print("✅ Redis 限流存储已恢复")
+        return RateLimitResult(bool(int(allowed)), float(tokens), float(retry_after))
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "failures": self.failures, "available": not self._failing}
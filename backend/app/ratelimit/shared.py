@@ -0,0 +1,105 @@
+"""
+多 worker 共享的限流存储（不依赖外部服务）
+令牌桶保存在匿名共享内存（mmap）的固定槽位中，key 的摘要决定槽位，一个进程间锁保护读写。
+共享内存在 master 预加载应用时创建、fork 后由所有 worker 继承，因此需要 PRELOAD_APP=true；
+不预加载时每个 worker 各自创建一份，效果与 memory 后端相同。
+
+槽位数固定，两个 key 落到同一槽位时后来者覆盖前者（被覆盖的客户端从满桶重新开始），
+槽位数远大于活跃客户端数时影响可以忽略。
+
+进程间锁使用 fcntl 记录锁：持有锁的 worker 被回收或被杀死时由操作系统释放，其他 worker 不会永久阻塞。
+获取锁只做非阻塞尝试，两次尝试之间让出事件循环（退避间隔逐次加倍），
+LOCK_TIMEOUT 内拿不到锁时放行请求（限流短暂失效好过阻塞事件循环）。
+没有 fcntl 的平台（Windows）以同样方式非阻塞地获取 multiprocessing.Lock。
+"""
+
+import asyncio
+import hashlib
+import mmap
+import multiprocessing
+import struct
+import tempfile
+import time
+
+from .base import RateLimitResult, RateLimitStore, refill
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 每个槽位：key 摘要、令牌数、更新时间
+SLOT = struct.Struct("Qdd")
+
+# 等待进程间锁的最长秒数
+LOCK_TIMEOUT = 0.005
+
+# 第一次重试前的等待秒数，之后逐次加倍
+LOCK_RETRY_DELAY = 0.0002
+
+
+class SharedMemoryStore(RateLimitStore):
+    """共享内存中的令牌桶"""
+
+    name = "shared"
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self._buffer = mmap.mmap(-1, slots * SLOT.size)
+        if fcntl is not None:
+            # 记录锁属于进程，fork 继承文件描述符后各 worker 之间仍然互斥
+            self._lock_file = tempfile.TemporaryFile()
+            self._lock = None
+        else:
+            self._lock_file = None
+            self._lock = multiprocessing.Lock()
+        self.lock_timeouts = 0
+
+    def _try_acquire(self) -> bool:
+        if self._lock is not None:
+            return self._lock.acquire(block=False)
+        try:
+            fcntl.lockf(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    async def _acquire(self) -> bool:
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        delay = LOCK_RETRY_DELAY
+        while not self._try_acquire():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # 锁被其他 worker 持有时让出事件循环，不在原地空转
+            await asyncio.sleep(min(delay, remaining))
+            delay *= 2
+        return True
+
+    def _release(self) -> None:
+        if self._lock is not None:
+            self._lock.release()
+        else:
+            fcntl.lockf(self._lock_file, fcntl.LOCK_UN)
+
+    async def take(self, key: str, rate: float, burst: float) -> RateLimitResult:
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+        offset = digest % self.slots * SLOT.size
+        # 临界区只有一次读写，持锁时间在微秒级
+        if not await self._acquire():
+            self.lock_timeouts += 1
+            return RateLimitResult(True, burst, 0.0)
+        # 拿到锁之后再取时间（各进程需要同一个时钟），等锁期间其他 worker 可能已经写入更晚的时间
+        now = time.time()
+        try:
+            stored, tokens, updated = SLOT.unpack_from(self._buffer, offset)
+            if stored != digest:
+                tokens, updated = burst, now
+            tokens, result = refill(tokens, updated, now, rate, burst)
+            SLOT.pack_into(self._buffer, offset, digest, tokens, now)
+        finally:
+            self._release()
+        return result
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "slots": self.slots, "lock_timeouts": self.lock_timeouts}
@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from typing import Dict, Any
 from datetime import datetime
 from ..core.database import get_database
+from ..core.versioning import mark_changed
+from ..core.writes import update_and_fetch
 from ..middleware.auth import get_current_user
 
 router = APIRouter()
@@ -42,20 +44,17 @@ async def update_about(
     
     about_data["updated_at"] = datetime.now()
     
-    # 查找现有数据
-    existing = await db.about.find_one({})
-    
-    if existing:
-        await db.about.update_one(
-            {"_id": existing["_id"]},
-            {"$set": about_data}
-        )
-    else:
-        await db.about.insert_one(about_data)
+    # 更新唯一的文档（不存在时创建），并返回更新后的数据
+    updated = await update_and_fetch(
+        db.about,
+        {},
+        {"$set": about_data},
+        projection={"_id": 0},
+        upsert=True
+    )
     
-    # 返回更新后的数据
-    updated = await db.about.find_one({})
-    updated.pop("_id", None)
+    # about 只有一个文档，所有接口共用一个标签
+    await mark_changed("about")
     
     return updated
 
@@ -84,6 +83,7 @@ async def update_team_members(
         {"$set": {"team_members": team_members, "updated_at": datetime.now()}},
         upsert=True
     )
+    await mark_changed("about")
     
     return team_members
 
@@ -112,6 +112,7 @@ async def update_timeline(
         {"$set": {"timeline": timeline, "updated_at": datetime.now()}},
         upsert=True
     )
+    await mark_changed("about")
     
     return timeline
 
@@ -140,6 +141,7 @@ async def update_values(
         {"$set": {"values": values, "updated_at": datetime.now()}},
         upsert=True
     )
+    await mark_changed("about")
     
     return values
 
@@ -168,5 +170,6 @@ async def update_stats(
         {"$set": {"stats": stats, "updated_at": datetime.now()}},
         upsert=True
     )
+    await mark_changed("about")
     
     return stats
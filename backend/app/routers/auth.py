@@ -1,4 +1,6 @@
+import uuid
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.security import HTTPAuthorizationCredentials
 from bson import ObjectId
 from typing import List
 from pydantic import BaseModel
@@ -6,8 +8,11 @@ from ..schemas import (
     AdminCreate, AdminLogin, TokenResponse, AdminResponse, MessageResponse
 )
 from ..core.database import get_database
-from ..core.security import get_password_hash, verify_password, create_access_token
-from ..middleware.auth import get_current_user
+from ..core.config import settings
+from ..core.hashing import PasswordHasherBusy, hash_password_async, verify_password_async
+from ..core.security import create_access_token
+from ..core.tokens import revocations
+from ..middleware.auth import get_current_user, security
 
 router = APIRouter()
 
@@ -17,6 +22,18 @@ class ChangePasswordRequest(BaseModel):
     new_password: str
 
 
+async def run_hasher(awaitable):
+    """等待 bcrypt 计算，执行器繁忙时返回 503"""
+    try:
+        return await awaitable
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="登录请求过多，请稍后重试",
+            headers={"Retry-After": str(max(1, round(settings.password_hash_queue_timeout)))}
+        )
+
+
 @router.get("/check-setup", response_model=dict)
 async def check_setup():
     """检查是否已有管理员账号"""
@@ -42,7 +59,7 @@ async def setup_admin(admin: AdminCreate):
     admin_dict = {
         "username": admin.username,
         "email": admin.email,
-        "hashed_password": get_password_hash(admin.password),
+        "hashed_password": await run_hasher(hash_password_async(admin.password)),
         "is_first_login": False,
         "created_at": None
     }
@@ -73,7 +90,7 @@ async def login(credentials: AdminLogin):
         )
     
     # 验证密码
-    if not verify_password(credentials.password, admin["hashed_password"]):
+    if not await run_hasher(verify_password_async(credentials.password, admin["hashed_password"])):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误"
@@ -89,12 +106,25 @@ async def login(credentials: AdminLogin):
     )
 
 
-@router.post("/change-password", response_model=MessageResponse)
+@router.post("/logout", response_model=MessageResponse)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_user)
+):
+    """退出登录：吊销当前令牌（需要登录）"""
+    await revocations.revoke_token(credentials.credentials, current_user)
+    return MessageResponse(message="已退出登录")
+
+
+@router.post("/change-password", response_model=TokenResponse)
 async def change_password(
     request: ChangePasswordRequest,
     current_user: dict = Depends(get_current_user)
 ):
-    """修改密码（需要登录）"""
+    """修改密码（需要登录）
+
+    修改后此前签发的所有令牌失效，返回新的令牌
+    """
     db = get_database()
     
     # 获取当前用户
@@ -106,7 +136,7 @@ async def change_password(
         )
     
     # 验证当前密码
-    if not verify_password(request.current_password, admin["hashed_password"]):
+    if not await run_hasher(verify_password_async(request.current_password, admin["hashed_password"])):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="当前密码错误"
@@ -120,9 +150,19 @@ async def change_password(
         )
     
     # 更新密码
+    hashed_password = await run_hasher(hash_password_async(request.new_password))
     await db.admins.update_one(
         {"_id": ObjectId(current_user["id"])},
-        {"$set": {"hashed_password": get_password_hash(request.new_password)}}
+        {"$set": {"hashed_password": hashed_password}}
     )
     
-    return MessageResponse(message="密码修改成功")
+    # 先签发新令牌，再吊销此前签发的所有令牌并豁免新令牌
+    jti = uuid.uuid4().hex
+    token = create_access_token({"id": current_user["id"], "username": admin["username"], "jti": jti})
+    await revocations.revoke_user(current_user["id"], keep_jti=jti)
+    
+    return TokenResponse(
+        message="密码修改成功",
+        token=token,
+        admin=AdminResponse(id=current_user["id"], username=admin["username"], email=admin["email"])
+    )
@@ -1,26 +1,110 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from bson import ObjectId
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 from ..schemas import (
-    BlogCreate, BlogUpdate, BlogResponse, MessageResponse
+    BlogCreate, BlogUpdate, BlogInDB, BlogPartial, BlogPage, MessageResponse
 )
+from ..core.config import settings
 from ..core.database import get_database
+from ..core.versioning import mark_changed
+from ..core.writes import update_and_fetch
+from ..core.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_cursor, next_cursor,
+    encode_offset_cursor, decode_offset_cursor
+)
+from ..core.projection import (
+    BLOG_SUMMARY_FIELDS, model_fields, parse_fields, build_projection, document_projection
+)
+from ..core.rendering import render_blog_async
+from ..core.serialization import FastJSONResponse
+from ..core.streaming import stream_cursor, stream_format
+from ..search import INTERNAL_FIELDS, get_search_engine, make_snippet, query_terms
 from ..middleware.auth import get_current_user
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[BlogResponse])
-@router.get("/", response_model=List[BlogResponse])
+BLOG_FIELDS = model_fields(BlogInDB)
+
+# 生成搜索摘要需要读取的字段
+SNIPPET_FIELDS = ("title", "excerpt", "content")
+
+
+async def search_blogs(
+    db,
+    text: str,
+    published: bool,
+    category: Optional[str],
+    selected: Optional[List[str]],
+    limit: Optional[int],
+    cursor: Optional[str]
+):
+    """全文搜索：由搜索引擎给出按相关度排序的 ID，再按 ID 取回当前页文档"""
+    paginated = limit is not None or cursor is not None
+    page_size = (limit or DEFAULT_PAGE_SIZE) if paginated else settings.search_max_results
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    
+    total, hits = await get_search_engine().search(
+        text,
+        published=published,
+        category=category,
+        offset=offset,
+        limit=page_size
+    )
+    
+    projection = document_projection(selected, BLOG_FIELDS, required=SNIPPET_FIELDS)
+    ids = [ObjectId(hit.id) for hit in hits]
+    docs = await db.blogs.find({"_id": {"$in": ids}}, projection).to_list(None)
+    docs_by_id = {str(doc["_id"]): doc for doc in docs}
+    
+    terms = query_terms(text)
+    blogs = []
+    for hit in hits:
+        blog = docs_by_id.get(hit.id)
+        if blog is None:
+            continue
+        
+        blog["snippet"] = make_snippet(blog, terms)
+        blog["score"] = round(hit.score, 4)
+        # 去掉只为生成摘要而读取的字段
+        if selected is not None:
+            for field in SNIPPET_FIELDS:
+                if field not in selected:
+                    blog.pop(field, None)
+        blogs.append(blog)
+    
+    if not paginated:
+        return FastJSONResponse(blogs)
+    
+    has_more = offset + len(hits) < total
+    return FastJSONResponse({
+        "items": blogs,
+        "next_cursor": encode_offset_cursor(offset + len(hits)) if has_more else None,
+        "total": total
+    })
+
+
+@router.get("", response_model=Union[List[BlogPartial], BlogPage], response_model_exclude_unset=True)
+@router.get("/", response_model=Union[List[BlogPartial], BlogPage], response_model_exclude_unset=True)
 async def get_blogs(
     category: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    published: Optional[str] = Query("true")
+    published: Optional[str] = Query("true"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="逗号分隔的字段列表，* 表示完整文档，默认返回摘要字段"),
+    output_format: Optional[str] = Query(None, alias="format", description="完整列表流式输出的格式：json 或 ndjson")
 ):
-    """获取所有文章（公开接口）"""
+    """获取所有文章（公开接口）
+
+    传入 limit 或 cursor 时进入游标分页模式，返回 {items, next_cursor}；
+    否则保持原有的完整列表返回，其中管理后台的列表（含草稿）或指定 format 时流式输出。
+    文档按模型字段投影后直接编码返回，response_model 只用于生成接口文档。
+    """
     db = get_database()
     query = {}
+    selected = parse_fields(fields, BLOG_FIELDS, default=BLOG_SUMMARY_FIELDS)
     
     # 只显示已发布的文章
     if published == "true":
@@ -30,24 +114,50 @@ async def get_blogs(
         query["category"] = category
     
     if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"excerpt": {"$regex": search, "$options": "i"}},
-            {"content": {"$regex": search, "$options": "i"}},
-            {"tags": {"$regex": search, "$options": "i"}}
-        ]
+        return await search_blogs(
+            db, search, query.get("published", False), query.get("category"),
+            selected, limit, cursor
+        )
+    
+    if limit is None and cursor is None:
+        projection = document_projection(selected, BLOG_FIELDS)
+        blogs_cursor = db.blogs.find(query, projection).sort("date", -1)
+        # 含草稿的完整列表随文章数量增长，逐批流式输出而不是一次读入内存
+        if published != "true" or output_format is not None:
+            return stream_cursor(blogs_cursor, stream_format(output_format))
+        blogs = await blogs_cursor.to_list(None)
+        return FastJSONResponse(blogs)
     
-    blogs = await db.blogs.find(query).sort("date", -1).to_list(None)
+    # 游标分页：按 (date, _id) 定位，多取一条用于判断是否还有下一页
+    page_size = limit or DEFAULT_PAGE_SIZE
+    # 游标需要 date 字段，即使调用方没有请求
+    projection = document_projection(selected, BLOG_FIELDS, required=("date",))
+    blogs = await db.blogs.find(apply_cursor(query, cursor), projection) \
+        .sort([("date", -1), ("_id", -1)]) \
+        .limit(page_size + 1) \
+        .to_list(None)
     
-    # 转换_id为字符串
-    for blog in blogs:
-        blog["_id"] = str(blog["_id"])
+    cursor_out = next_cursor(blogs, page_size)
     
-    return blogs
+    return FastJSONResponse({"items": blogs, "next_cursor": cursor_out})
 
 
-@router.get("/{blog_id}", response_model=BlogResponse)
-async def get_blog(blog_id: str):
+@router.get("/export")
+async def export_blogs(
+    output_format: Optional[str] = Query("ndjson", alias="format", description="导出格式：json 或 ndjson"),
+    current_user: dict = Depends(get_current_user)
+):
+    """导出全部文章（需要管理员权限），流式输出完整文档"""
+    db = get_database()
+    blogs_cursor = db.blogs.find({}, document_projection(None, BLOG_FIELDS)).sort("_id", 1)
+    return stream_cursor(blogs_cursor, stream_format(output_format), filename="blogs")
+
+
+@router.get("/{blog_id}", response_model=BlogPartial, response_model_exclude_unset=True)
+async def get_blog(
+    blog_id: str,
+    fields: Optional[str] = Query(None, description="逗号分隔的字段列表，默认返回完整文档")
+):
     """获取单篇文章（公开接口）"""
     db = get_database()
     
@@ -57,7 +167,8 @@ async def get_blog(blog_id: str):
             detail="无效的文章ID"
         )
     
-    blog = await db.blogs.find_one({"_id": ObjectId(blog_id)})
+    projection = document_projection(parse_fields(fields, BLOG_FIELDS), BLOG_FIELDS)
+    blog = await db.blogs.find_one({"_id": ObjectId(blog_id)}, projection)
     
     if not blog:
         raise HTTPException(
@@ -65,8 +176,7 @@ async def get_blog(blog_id: str):
             detail="文章不存在"
         )
     
-    blog["_id"] = str(blog["_id"])
-    return blog
+    return FastJSONResponse(blog)
 
 
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
@@ -76,12 +186,17 @@ async def create_blog(blog: BlogCreate, current_user: dict = Depends(get_current
     db = get_database()
     
     blog_dict = blog.model_dump()
+    # 预渲染 HTML、目录、字数和阅读时长
+    blog_dict.update(await render_blog_async(blog.content))
     blog_dict["created_at"] = datetime.now()
     blog_dict["updated_at"] = datetime.now()
     
     result = await db.blogs.insert_one(blog_dict)
     
+    await get_search_engine().index(blog_dict)
+    
     blog_dict["_id"] = str(result.inserted_id)
+    await mark_changed("blogs")
     
     return {"message": "文章创建成功", "blog": blog_dict}
 
@@ -103,21 +218,26 @@ async def update_blog(
     
     # 只更新提供的字段
     update_data = {k: v for k, v in blog_update.model_dump().items() if v is not None}
+    if "content" in update_data:
+        update_data.update(await render_blog_async(update_data["content"]))
     update_data["updated_at"] = datetime.now()
     
-    result = await db.blogs.update_one(
+    updated_blog = await update_and_fetch(
+        db.blogs,
         {"_id": ObjectId(blog_id)},
-        {"$set": update_data}
+        {"$set": update_data},
+        projection=build_projection(None, hidden=INTERNAL_FIELDS)
     )
     
-    if result.matched_count == 0:
+    if updated_blog is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="文章不存在"
         )
     
-    updated_blog = await db.blogs.find_one({"_id": ObjectId(blog_id)})
+    await get_search_engine().index(updated_blog)
     updated_blog["_id"] = str(updated_blog["_id"])
+    await mark_changed("blogs", blog_id)
     
     return {"message": "文章更新成功", "blog": updated_blog}
 
@@ -141,4 +261,7 @@ async def delete_blog(blog_id: str, current_user: dict = Depends(get_current_use
             detail="文章不存在"
         )
     
+    await get_search_engine().remove(blog_id)
+    await mark_changed("blogs", blog_id)
+    
     return MessageResponse(message="文章删除成功")
@@ -3,24 +3,39 @@ from bson import ObjectId
 from typing import List, Optional
 from datetime import datetime
 from ..schemas import (
-    EventCreate, EventUpdate, EventResponse, MessageResponse
+    EventCreate, EventUpdate, EventInDB, EventPartial, MessageResponse
 )
 from ..core.database import get_database
+from ..core.versioning import mark_changed
+from ..core.writes import update_and_fetch
+from ..core.projection import model_fields, parse_fields, document_projection
+from ..core.serialization import FastJSONResponse
+from ..core.streaming import stream_cursor, stream_format
 from ..middleware.auth import get_current_user
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[EventResponse])
-@router.get("/", response_model=List[EventResponse])
+EVENT_FIELDS = model_fields(EventInDB)
+
+
+@router.get("", response_model=List[EventPartial], response_model_exclude_unset=True)
+@router.get("/", response_model=List[EventPartial], response_model_exclude_unset=True)
 async def get_events(
     category: Optional[str] = Query(None),
     status_filter: Optional[str] = Query(None, alias="status"),
-    published: Optional[str] = Query("true")
+    published: Optional[str] = Query("true"),
+    fields: Optional[str] = Query(None, description="逗号分隔的字段列表，默认返回完整文档"),
+    output_format: Optional[str] = Query(None, alias="format", description="流式输出的格式：json 或 ndjson")
 ):
-    """获取所有活动（公开接口）"""
+    """获取所有活动（公开接口）
+
+    管理后台的列表（含草稿）或指定 format 时流式输出
+    """
     db = get_database()
     query = {}
+    # 活动文档本身较小，列表页也要展示描述和地点，因此默认不裁剪
+    projection = document_projection(parse_fields(fields, EVENT_FIELDS), EVENT_FIELDS)
     
     if published == "true":
         query["published"] = True
@@ -31,16 +46,30 @@ async def get_events(
     if status_filter:
         query["status"] = status_filter
     
-    events = await db.events.find(query).sort("date", -1).to_list(None)
+    events_cursor = db.events.find(query, projection).sort("date", -1)
+    if published != "true" or output_format is not None:
+        return stream_cursor(events_cursor, stream_format(output_format))
+    events = await events_cursor.to_list(None)
     
-    for event in events:
-        event["_id"] = str(event["_id"])
-    
-    return events
+    return FastJSONResponse(events)
+
+
+@router.get("/export")
+async def export_events(
+    output_format: Optional[str] = Query("ndjson", alias="format", description="导出格式：json 或 ndjson"),
+    current_user: dict = Depends(get_current_user)
+):
+    """导出全部活动（需要管理员权限），流式输出完整文档"""
+    db = get_database()
+    events_cursor = db.events.find({}, document_projection(None, EVENT_FIELDS)).sort("_id", 1)
+    return stream_cursor(events_cursor, stream_format(output_format), filename="events")
 
 
-@router.get("/{event_id}", response_model=EventResponse)
-async def get_event(event_id: str):
+@router.get("/{event_id}", response_model=EventPartial, response_model_exclude_unset=True)
+async def get_event(
+    event_id: str,
+    fields: Optional[str] = Query(None, description="逗号分隔的字段列表，默认返回完整文档")
+):
     """获取单个活动（公开接口）"""
     db = get_database()
     
@@ -50,7 +79,8 @@ async def get_event(event_id: str):
             detail="无效的活动ID"
         )
     
-    event = await db.events.find_one({"_id": ObjectId(event_id)})
+    projection = document_projection(parse_fields(fields, EVENT_FIELDS), EVENT_FIELDS)
+    event = await db.events.find_one({"_id": ObjectId(event_id)}, projection)
     
     if not event:
         raise HTTPException(
@@ -58,8 +88,7 @@ async def get_event(event_id: str):
             detail="活动不存在"
         )
     
-    event["_id"] = str(event["_id"])
-    return event
+    return FastJSONResponse(event)
 
 
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
@@ -74,6 +103,7 @@ async def create_event(event: EventCreate, current_user: dict = Depends(get_curr
     result = await db.events.insert_one(event_dict)
     
     event_dict["_id"] = str(result.inserted_id)
+    await mark_changed("events")
     
     return {"message": "活动创建成功", "event": event_dict}
 
@@ -95,19 +125,20 @@ async def update_event(
     
     update_data = {k: v for k, v in event_update.model_dump().items() if v is not None}
     
-    result = await db.events.update_one(
+    updated_event = await update_and_fetch(
+        db.events,
         {"_id": ObjectId(event_id)},
         {"$set": update_data}
     )
     
-    if result.matched_count == 0:
+    if updated_event is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="活动不存在"
         )
     
-    updated_event = await db.events.find_one({"_id": ObjectId(event_id)})
     updated_event["_id"] = str(updated_event["_id"])
+    await mark_changed("events", event_id)
     
     return {"message": "活动更新成功", "event": updated_event}
 
@@ -131,4 +162,6 @@ async def delete_event(event_id: str, current_user: dict = Depends(get_current_u
             detail="活动不存在"
         )
     
+    await mark_changed("events", event_id)
+    
     return MessageResponse(message="活动删除成功")
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from fastapi import APIRouter
+
+from ..core.health import liveness, readiness
+from ..core.serialization import FastJSONResponse
+
+router = APIRouter()
+
+
+@router.get("")
+async def health_check():
+    """健康检查接口（兼容旧版本，不检查依赖）"""
+    return {
+        "status": "ok",
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/live")
+async def live():
+    """存活探针：进程和事件循环正常即返回 200"""
+    return liveness()
+
+
+@router.get("/ready")
+async def ready():
+    """就绪探针：MongoDB 可用、搜索索引已建立且事件循环延迟正常时返回 200，否则返回 503"""
+    result = await readiness()
+    return FastJSONResponse(result, status_code=200 if result["ready"] else 503)
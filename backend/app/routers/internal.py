@@ -0,0 +1,78 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+
+from ..core import migrations
+from ..core.cache import response_cache
+from ..core.database import get_database
+from ..core.hashing import password_hasher
+from ..core.pool import pool_stats
+from ..core.profiling import PROFILE_FORMATS, list_profiles, load_profile, render
+from ..core.site_settings import settings_snapshot
+from ..core.slow_queries import recent_slow_queries
+from ..core.tokens import revocations, token_cache
+from ..middleware.auth import get_current_user
+from ..ratelimit import rate_limiter
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=dict)
+async def get_stats(current_user: dict = Depends(get_current_user)):
+    """运行时统计：MongoDB 连接池、响应缓存、令牌缓存、密码哈希执行器、限流、设置快照（需要管理员权限，数据仅针对当前 worker 进程）"""
+    return {
+        "mongo_pool": pool_stats.snapshot(),
+        "response_cache": response_cache.stats(),
+        "token_cache": {**token_cache.stats(), "revocations": revocations.stats()},
+        "password_hasher": password_hasher.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "settings_snapshot": settings_snapshot.stats(),
+        "migrations": migrations.last_run,
+    }
+
+
+@router.get("/slow-queries", response_model=list)
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    shape: Optional[str] = Query(None, description="按查询形状 ID 过滤"),
+    endpoint: Optional[str] = Query(None, description="按接口过滤，如 \"GET /api/blogs\""),
+    current_user: dict = Depends(get_current_user)
+):
+    """最近的慢查询记录，包括查询形状、发出命令的接口、耗时和首次出现时的执行计划（需要管理员权限）"""
+    return await recent_slow_queries(get_database(), limit, shape, endpoint)
+
+
+@router.get("/profiles", response_model=list)
+async def get_profiles(current_user: dict = Depends(get_current_user)):
+    """最近的剖析结果摘要：总耗时、await / MongoDB / CPU 耗时拆分（需要管理员权限）"""
+    return await run_in_threadpool(list_profiles)
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("html", description="html / text / speedscope"),
+    current_user: dict = Depends(get_current_user)
+):
+    """下载剖析结果的调用树（需要管理员权限）"""
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的格式，可选: {', '.join(PROFILE_FORMATS)}"
+        )
+
+    session = await run_in_threadpool(load_profile, profile_id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="剖析结果不存在"
+        )
+
+    body = await run_in_threadpool(render, session, format)
+    extension = {"html": "html", "text": "txt", "speedscope": "speedscope.json"}[format]
+    return Response(body, headers={
+        "content-type": PROFILE_FORMATS[format],
+        "content-disposition": f'attachment; filename="profile-{profile_id}.{extension}"',
+    })
@@ -3,23 +3,33 @@ from bson import ObjectId
 from typing import List, Optional
 from datetime import datetime
 from ..schemas import (
-    ServiceCreate, ServiceUpdate, ServiceResponse, MessageResponse
+    ServiceCreate, ServiceUpdate, ServiceInDB, ServicePartial, MessageResponse
 )
 from ..core.database import get_database
+from ..core.versioning import mark_changed
+from ..core.writes import update_and_fetch
+from ..core.projection import model_fields, parse_fields, document_projection
+from ..core.serialization import FastJSONResponse
 from ..middleware.auth import get_current_user
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[ServiceResponse])
-@router.get("/", response_model=List[ServiceResponse])
+SERVICE_FIELDS = model_fields(ServiceInDB)
+
+
+@router.get("", response_model=List[ServicePartial], response_model_exclude_unset=True)
+@router.get("/", response_model=List[ServicePartial], response_model_exclude_unset=True)
 async def get_services(
     category: Optional[str] = Query(None),
-    active: Optional[str] = Query("true")
+    active: Optional[str] = Query("true"),
+    fields: Optional[str] = Query(None, description="逗号分隔的字段列表，默认返回完整文档")
 ):
     """获取所有服务（公开接口）"""
     db = get_database()
     query = {}
+    # 服务卡片会用到全部业务字段，因此默认不裁剪
+    projection = document_projection(parse_fields(fields, SERVICE_FIELDS), SERVICE_FIELDS)
     
     if active == "true":
         query["active"] = True
@@ -27,16 +37,16 @@ async def get_services(
     if category and category != "全部":
         query["category"] = category
     
-    services = await db.services.find(query).sort([("order", 1), ("created_at", -1)]).to_list(None)
-    
-    for service in services:
-        service["_id"] = str(service["_id"])
+    services = await db.services.find(query, projection).sort([("order", 1), ("created_at", -1)]).to_list(None)
     
-    return services
+    return FastJSONResponse(services)
 
 
-@router.get("/{service_id}", response_model=ServiceResponse)
-async def get_service(service_id: str):
+@router.get("/{service_id}", response_model=ServicePartial, response_model_exclude_unset=True)
+async def get_service(
+    service_id: str,
+    fields: Optional[str] = Query(None, description="逗号分隔的字段列表，默认返回完整文档")
+):
     """获取单个服务"""
     db = get_database()
     
@@ -46,7 +56,8 @@ async def get_service(service_id: str):
             detail="无效的服务ID"
         )
     
-    service = await db.services.find_one({"_id": ObjectId(service_id)})
+    projection = document_projection(parse_fields(fields, SERVICE_FIELDS), SERVICE_FIELDS)
+    service = await db.services.find_one({"_id": ObjectId(service_id)}, projection)
     
     if not service:
         raise HTTPException(
@@ -54,8 +65,7 @@ async def get_service(service_id: str):
             detail="服务不存在"
         )
     
-    service["_id"] = str(service["_id"])
-    return service
+    return FastJSONResponse(service)
 
 
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
@@ -70,6 +80,7 @@ async def create_service(service: ServiceCreate, current_user: dict = Depends(ge
     result = await db.services.insert_one(service_dict)
     
     service_dict["_id"] = str(result.inserted_id)
+    await mark_changed("services")
     
     return {"message": "服务创建成功", "service": service_dict}
 
@@ -91,19 +102,20 @@ async def update_service(
     
     update_data = {k: v for k, v in service_update.model_dump().items() if v is not None}
     
-    result = await db.services.update_one(
+    updated_service = await update_and_fetch(
+        db.services,
         {"_id": ObjectId(service_id)},
         {"$set": update_data}
     )
     
-    if result.matched_count == 0:
+    if updated_service is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="服务不存在"
         )
     
-    updated_service = await db.services.find_one({"_id": ObjectId(service_id)})
     updated_service["_id"] = str(updated_service["_id"])
+    await mark_changed("services", service_id)
     
     return {"message": "服务更新成功", "service": updated_service}
 
@@ -127,4 +139,6 @@ async def delete_service(service_id: str, current_user: dict = Depends(get_curre
             detail="服务不存在"
         )
     
+    await mark_changed("services", service_id)
+    
     return MessageResponse(message="服务删除成功")
@@ -2,10 +2,14 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from bson import ObjectId
 from typing import Dict, Any
 from datetime import datetime
+from pymongo import UpdateOne
 from ..schemas import (
-    SettingsCreate, SettingsUpdate, SettingsResponse, MessageResponse
+    SettingsCreate, SettingsUpdate, SettingsResponse, SettingsBatch, MessageResponse
 )
 from ..core.database import get_database
+from ..core.site_settings import settings_snapshot
+from ..core.versioning import mark_changed
+from ..core.writes import update_and_fetch
 from ..middleware.auth import get_current_user
 
 router = APIRouter()
@@ -14,32 +18,32 @@ router = APIRouter()
 @router.get("", response_model=Dict[str, Any])
 @router.get("/", response_model=Dict[str, Any])
 async def get_all_settings():
-    """获取所有设置（公开接口）"""
-    db = get_database()
-    
-    settings = await db.settings.find().to_list(None)
-    
-    settings_dict = {}
-    for setting in settings:
-        settings_dict[setting["key"]] = setting["value"]
-    
-    return settings_dict
+    """获取所有设置（公开接口，读取内存中的快照）"""
+    return await settings_snapshot.get()
 
 
 @router.get("/{key}", response_model=Dict[str, Any])
 async def get_setting(key: str):
-    """获取单个设置（公开接口）"""
-    db = get_database()
+    """获取单个设置（公开接口，读取内存中的快照）"""
+    settings = await settings_snapshot.get()
     
-    setting = await db.settings.find_one({"key": key})
-    
-    if not setting:
+    if key not in settings:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="设置不存在"
         )
     
-    return {"key": setting["key"], "value": setting["value"]}
+    return {"key": key, "value": settings[key]}
+
+
+def upsert_update(setting: SettingsCreate) -> dict:
+    """按键创建或更新设置的更新文档：更新时只在提供了描述时覆盖描述"""
+    update = {"$set": {"key": setting.key, "value": setting.value, "updated_at": datetime.now()}}
+    if setting.description:
+        update["$set"]["description"] = setting.description
+    else:
+        update["$setOnInsert"] = {"description": ""}
+    return update
 
 
 @router.post("", response_model=dict)
@@ -48,35 +52,44 @@ async def create_or_update_setting(
     setting: SettingsCreate,
     current_user: dict = Depends(get_current_user)
 ):
-    """创建或更新设置（需要管理员权限）"""
+    """创建或更新设置（需要管理员权限）
+
+    一次 find_one_and_update（upsert）完成；新建时 _id 由 $setOnInsert 指定，
+    返回的文档使用该 _id 说明是新建的
+    """
+    db = get_database()
+    
+    new_id = ObjectId()
+    update = upsert_update(setting)
+    update.setdefault("$setOnInsert", {})["_id"] = new_id
+    updated_setting = await update_and_fetch(db.settings, {"key": setting.key}, update, upsert=True)
+    await mark_changed("settings", setting.key)
+    
+    created = updated_setting["_id"] == new_id
+    updated_setting["_id"] = str(updated_setting["_id"])
+    return {"message": "设置创建成功" if created else "设置更新成功", "setting": updated_setting}
+
+
+@router.post("/batch", response_model=dict)
+async def batch_update_settings(
+    batch: SettingsBatch,
+    current_user: dict = Depends(get_current_user)
+):
+    """批量创建或更新设置（需要管理员权限），一次 bulk_write 完成，重复的键以最后一项为准"""
     db = get_database()
     
-    existing_setting = await db.settings.find_one({"key": setting.key})
+    settings = {setting.key: setting for setting in batch.settings}
+    result = await db.settings.bulk_write(
+        [UpdateOne({"key": key}, upsert_update(setting), upsert=True) for key, setting in settings.items()],
+        ordered=False
+    )
+    await mark_changed("settings")
     
-    if existing_setting:
-        # 更新现有设置
-        update_data = {"value": setting.value, "updated_at": datetime.now()}
-        if setting.description:
-            update_data["description"] = setting.description
-        
-        await db.settings.update_one(
-            {"key": setting.key},
-            {"$set": update_data}
-        )
-        
-        updated_setting = await db.settings.find_one({"key": setting.key})
-        updated_setting["_id"] = str(updated_setting["_id"])
-        
-        return {"message": "设置更新成功", "setting": updated_setting}
-    else:
-        # 创建新设置
-        setting_dict = setting.model_dump()
-        setting_dict["updated_at"] = datetime.now()
-        
-        result = await db.settings.insert_one(setting_dict)
-        setting_dict["_id"] = str(result.inserted_id)
-        
-        return {"message": "设置创建成功", "setting": setting_dict}
+    return {
+        "message": "设置保存成功",
+        "created": result.upserted_count,
+        "updated": result.matched_count,
+    }
 
 
 @router.delete("/{key}", response_model=MessageResponse)
@@ -92,4 +105,6 @@ async def delete_setting(key: str, current_user: dict = Depends(get_current_user
             detail="设置不存在"
         )
     
+    await mark_changed("settings", key)
+    
     return MessageResponse(message="设置删除成功")
@@ -53,6 +53,10 @@ class BlogUpdate(BaseModel):
 
 class BlogInDB(BlogBase):
     id: str = Field(alias="_id")
+    # 写入时由 Markdown 预渲染得到
+    content_html: str = ""
+    toc: List[dict] = []
+    word_count: int = 0
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
@@ -66,6 +70,31 @@ class BlogResponse(BlogInDB):
     pass
 
 
+class BlogPartial(BlogUpdate):
+    """按 fields 投影后的文章，只包含实际查询到的字段"""
+    id: Optional[str] = Field(None, alias="_id")
+    content_html: Optional[str] = None
+    toc: Optional[List[dict]] = None
+    word_count: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    # 仅搜索结果包含：高亮摘要和相关度
+    snippet: Optional[str] = None
+    score: Optional[float] = None
+
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+
+class BlogPage(BaseModel):
+    """游标分页结果"""
+    items: List[BlogPartial]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
 # Admin Schemas
 class AdminBase(BaseModel):
     username: str
@@ -142,6 +171,17 @@ class ServiceResponse(ServiceInDB):
     pass
 
 
+class ServicePartial(ServiceUpdate):
+    """按 fields 投影后的服务"""
+    id: Optional[str] = Field(None, alias="_id")
+    created_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+
 # Event Schemas
 class EventBase(BaseModel):
     title: str
@@ -187,6 +227,17 @@ class EventResponse(EventInDB):
     pass
 
 
+class EventPartial(EventUpdate):
+    """按 fields 投影后的活动"""
+    id: Optional[str] = Field(None, alias="_id")
+    created_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+
 # Settings Schemas
 class SettingsBase(BaseModel):
     key: str
@@ -203,6 +254,10 @@ class SettingsUpdate(BaseModel):
     description: Optional[str] = None
 
 
+class SettingsBatch(BaseModel):
+    settings: List[SettingsCreate] = Field(..., min_length=1)
+
+
 class SettingsInDB(SettingsBase):
     id: str = Field(alias="_id")
     updated_at: datetime = Field(default_factory=datetime.now)
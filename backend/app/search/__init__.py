@@ -0,0 +1,52 @@
+"""
+博客全文搜索
+支持中日韩文字的二元组分词、BM25/textScore 相关度排序和高亮摘要。
+后端由 SEARCH_BACKEND 配置选择：memory（进程内倒排索引）或 mongo（MongoDB 文本索引）。
+"""
+
+import asyncio
+from typing import Optional
+
+from ..core.config import settings
+from .base import SearchBackend, SearchHit
+from .highlight import make_snippet
+from .memory import MemoryBackend
+from .mongo import INTERNAL_FIELDS, MongoTextBackend
+from .tokenizer import query_terms, tokenize
+
+# 当前使用的搜索后端
+_engine: Optional[SearchBackend] = None
+
+# 后台建立索引的任务（保留引用，避免被垃圾回收）
+_build_task: Optional[asyncio.Task] = None
+
+
+def create_backend(name: str) -> SearchBackend:
+    """根据名称创建搜索后端"""
+    if name == "memory":
+        return MemoryBackend(refresh_seconds=settings.search_refresh_seconds)
+    if name == "mongo":
+        return MongoTextBackend()
+    raise ValueError(f"未知的搜索后端: {name}")
+
+
+async def _build(engine: SearchBackend, db) -> None:
+    try:
+        await engine.build(db)
+        print(f"✅ 搜索索引已建立（{engine.name}）")
+    except Exception as e:
+        print(f"❌ 搜索索引建立失败: {e}")
+        # 不让搜索请求无限等待
+        engine.ready.set()
+
+
+async def init_search(db) -> None:
+    """初始化搜索后端，在后台建立索引，不阻塞启动"""
+    global _engine, _build_task
+    _engine = create_backend(settings.search_backend)
+    _build_task = asyncio.create_task(_build(_engine, db))
+
+
+def get_search_engine() -> Optional[SearchBackend]:
+    """获取当前搜索后端"""
+    return _engine
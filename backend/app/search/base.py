@@ -0,0 +1,63 @@
+"""
+搜索后端接口
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# 字段权重：标题和标签命中比正文命中更相关
+FIELD_WEIGHTS = {
+    "title": 3,
+    "tags": 3,
+    "excerpt": 2,
+    "content": 1,
+}
+
+
+@dataclass
+class SearchHit:
+    """一条搜索命中"""
+    id: str
+    score: float
+
+
+def field_text(doc: dict, field: str) -> str:
+    """取出用于索引的字段文本（标签列表拼接为字符串）"""
+    value = doc.get(field) or ""
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+class SearchBackend:
+    """搜索后端基类，由 create_blog / update_blog / delete_blog 增量维护"""
+
+    name = "base"
+
+    def __init__(self):
+        # 索引建立完成前，搜索请求在此等待
+        self.ready = asyncio.Event()
+
+    async def build(self, db) -> None:
+        """启动时全量建立索引"""
+        raise NotImplementedError
+
+    async def index(self, doc: dict) -> None:
+        """新增或更新一篇文章的索引"""
+        raise NotImplementedError
+
+    async def remove(self, doc_id: str) -> None:
+        """从索引中删除一篇文章"""
+        raise NotImplementedError
+
+    async def search(
+        self,
+        text: str,
+        published: Optional[bool] = None,
+        category: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[int, List[SearchHit]]:
+        """搜索，返回 (命中总数, 当前页命中列表)，按相关度降序"""
+        raise NotImplementedError
@@ -0,0 +1,81 @@
+"""
+搜索结果摘要高亮
+在正文中找到第一个命中位置，截取附近的文本并用 <mark> 标记命中词元
+"""
+
+import html
+import re
+from typing import Iterable, Optional
+
+from .tokenizer import is_cjk
+
+# 去掉常见的 Markdown 标记，只保留可读文本
+_MARKDOWN_RE = re.compile(r"```.*?```|`|\!\[[^\]]*\]\([^)]*\)|\]\([^)]*\)|[#*>_~\[\]|]", re.S)
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def plain_text(markdown: str) -> str:
+    """将 Markdown 粗略转换为纯文本"""
+    return _SPACE_RE.sub(" ", _MARKDOWN_RE.sub(" ", markdown or "")).strip()
+
+
+def _term_regex(term: str) -> str:
+    # 拉丁词元按整词匹配，避免在单词中间高亮
+    if is_cjk(term):
+        return re.escape(term)
+    return rf"(?<![0-9a-z]){re.escape(term)}(?![0-9a-z])"
+
+
+def _terms_pattern(terms: Iterable[str]) -> Optional[re.Pattern]:
+    terms = sorted(set(terms), key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile("|".join(_term_regex(t) for t in terms), re.IGNORECASE)
+
+
+def highlight(text: str, terms: Iterable[str], width: int = 120) -> Optional[str]:
+    """返回包含命中词元的 HTML 片段，没有命中时返回 None"""
+    pattern = _terms_pattern(terms)
+    if pattern is None or not text:
+        return None
+
+    first = pattern.search(text)
+    if first is None:
+        return None
+
+    start = max(0, first.start() - width // 4)
+    end = min(len(text), start + width)
+    window = text[start:end]
+
+    # 合并相邻的命中区间（二元组切分会产生首尾相接的命中）
+    spans = []
+    for match in pattern.finditer(window):
+        if spans and match.start() <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], match.end())
+        else:
+            spans.append([match.start(), match.end()])
+
+    parts = []
+    cursor = 0
+    for span_start, span_end in spans:
+        parts.append(html.escape(window[cursor:span_start]))
+        parts.append(f"<mark>{html.escape(window[span_start:span_end])}</mark>")
+        cursor = span_end
+    parts.append(html.escape(window[cursor:]))
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    return prefix + "".join(parts) + suffix
+
+
+def make_snippet(doc: dict, terms: Iterable[str], width: int = 120) -> str:
+    """依次在正文、摘要、标题中寻找命中，生成高亮片段"""
+    terms = list(terms)
+    for field in ("content", "excerpt", "title"):
+        snippet = highlight(plain_text(doc.get(field, "")), terms, width)
+        if snippet:
+            return snippet
+
+    # 仅标签命中时退回到摘要开头
+    return html.escape(plain_text(doc.get("excerpt", ""))[:width])
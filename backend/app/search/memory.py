@@ -0,0 +1,228 @@
+"""
+进程内倒排索引
+使用 BM25 计算相关度，适合文章数在数万篇以内的部署。
+每个 worker 各自维护一份索引，定期比对集合指纹以同步其他 worker 的写入。
+"""
+
+import asyncio
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .base import FIELD_WEIGHTS, SearchBackend, SearchHit, field_text
+from .tokenizer import is_cjk, query_terms, tokenize
+
+# BM25 参数
+_K1 = 1.2
+_B = 0.75
+
+# 建立索引时需要读取的字段
+INDEX_PROJECTION = {
+    **{field: 1 for field in FIELD_WEIGHTS},
+    "published": 1,
+    "category": 1,
+    "date": 1,
+    "updated_at": 1,
+}
+
+
+@dataclass
+class _Doc:
+    terms: Tuple[str, ...]
+    length: float
+    published: bool
+    category: str
+    date: float
+
+
+class MemoryBackend(SearchBackend):
+    """进程内倒排索引"""
+
+    name = "memory"
+
+    def __init__(self, refresh_seconds: int = 30):
+        super().__init__()
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._docs: Dict[str, _Doc] = {}
+        self._total_length = 0.0
+        self._db = None
+        self._refresh_seconds = refresh_seconds
+        self._last_check = 0.0
+        self._fingerprint: Tuple[int, Optional[datetime]] = (0, None)
+        self._refresh_task: Optional[asyncio.Task] = None
+        # 重建期间收到的写入：(文章 ID, 文档或 None 表示删除)，建立完成后重放到新结构
+        self._journal: Optional[List[Tuple[str, Optional[dict]]]] = None
+
+    async def build(self, db) -> None:
+        self._db = db
+        fingerprint = await self._current_fingerprint()
+
+        # 在新结构中建立索引后整体替换，避免建立过程中搜索到半成品
+        postings: Dict[str, Dict[str, float]] = {}
+        docs: Dict[str, _Doc] = {}
+        total_length = 0.0
+        self._journal = []
+        try:
+            async for doc in db.blogs.find({}, INDEX_PROJECTION):
+                total_length += self._add(doc, postings, docs)
+
+            # 游标读取期间 index/remove 只写入了旧结构，重放到新结构后再替换，避免这些写入丢失
+            for doc_id, doc in self._journal:
+                total_length -= self._discard(doc_id, postings, docs)
+                if doc is not None:
+                    total_length += self._add(doc, postings, docs)
+        finally:
+            self._journal = None
+
+        self._postings, self._docs, self._total_length = postings, docs, total_length
+        self._fingerprint = fingerprint
+        self._last_check = time.monotonic()
+        self.ready.set()
+
+    async def index(self, doc: dict) -> None:
+        doc_id = str(doc["_id"])
+        self._total_length -= self._discard(doc_id, self._postings, self._docs)
+        self._total_length += self._add(doc, self._postings, self._docs)
+        if self._journal is not None:
+            self._journal.append((doc_id, doc))
+
+    async def remove(self, doc_id: str) -> None:
+        self._total_length -= self._discard(doc_id, self._postings, self._docs)
+        if self._journal is not None:
+            self._journal.append((doc_id, None))
+
+    async def search(
+        self,
+        text: str,
+        published: Optional[bool] = None,
+        category: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[int, List[SearchHit]]:
+        await self.ready.wait()
+        self._schedule_refresh()
+
+        terms = query_terms(text)
+        if not terms or not self._docs:
+            return 0, []
+
+        # 所有词元都必须命中（AND 语义），从最稀有的词元开始求交集
+        term_postings = [self._term_postings(term) for term in terms]
+        term_postings.sort(key=len)
+        if not term_postings[0]:
+            return 0, []
+
+        candidates = set(term_postings[0])
+        for postings in term_postings[1:]:
+            candidates.intersection_update(postings)
+            if not candidates:
+                return 0, []
+
+        total_docs = len(self._docs)
+        avg_length = self._total_length / total_docs or 1.0
+        scored = []
+        for doc_id in candidates:
+            doc = self._docs[doc_id]
+            if published and not doc.published:
+                continue
+            if category and doc.category != category:
+                continue
+
+            score = 0.0
+            for postings in term_postings:
+                tf = postings[doc_id]
+                idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                norm = tf + _K1 * (1 - _B + _B * doc.length / avg_length)
+                score += idf * tf * (_K1 + 1) / norm
+            scored.append((score, doc.date, doc_id))
+
+        scored.sort(reverse=True)
+        page = scored[offset:offset + limit]
+        return len(scored), [SearchHit(id=doc_id, score=score) for score, _, doc_id in page]
+
+    def _term_postings(self, term: str) -> Dict[str, float]:
+        """取词元的倒排列表；单个汉字没有对应的二元组，合并所有包含它的二元组"""
+        if not (len(term) == 1 and is_cjk(term)):
+            return self._postings.get(term, {})
+
+        merged: Dict[str, float] = dict(self._postings.get(term, {}))
+        for vocab, postings in self._postings.items():
+            if len(vocab) == 2 and term in vocab:
+                for doc_id, tf in postings.items():
+                    merged[doc_id] = merged.get(doc_id, 0.0) + tf
+        return merged
+
+    @staticmethod
+    def _add(doc: dict, postings: Dict[str, Dict[str, float]], docs: Dict[str, _Doc]) -> float:
+        """将文档写入给定的索引结构，返回文档长度"""
+        doc_id = str(doc["_id"])
+        weighted: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(field_text(doc, field)):
+                weighted[token] += weight
+
+        for term, tf in weighted.items():
+            postings.setdefault(term, {})[doc_id] = float(tf)
+
+        date = doc.get("date")
+        length = float(sum(weighted.values()))
+        docs[doc_id] = _Doc(
+            terms=tuple(weighted),
+            length=length,
+            published=bool(doc.get("published", True)),
+            category=doc.get("category", ""),
+            date=date.timestamp() if isinstance(date, datetime) else 0.0
+        )
+        return length
+
+    @staticmethod
+    def _discard(doc_id: str, postings: Dict[str, Dict[str, float]], docs: Dict[str, _Doc]) -> float:
+        """从给定的索引结构中删除文档，返回被删除文档的长度"""
+        doc = docs.pop(doc_id, None)
+        if doc is None:
+            return 0.0
+
+        for term in doc.terms:
+            term_postings = postings.get(term)
+            if term_postings is None:
+                continue
+            term_postings.pop(doc_id, None)
+            if not term_postings:
+                del postings[term]
+        return doc.length
+
+    async def _current_fingerprint(self) -> Tuple[int, Optional[datetime]]:
+        """集合指纹：文档数 + 最近更新时间"""
+        count = await self._db.blogs.estimated_document_count()
+        latest = await self._db.blogs.find_one({}, {"updated_at": 1}, sort=[("updated_at", -1)])
+        return count, latest.get("updated_at") if latest else None
+
+    def _schedule_refresh(self) -> None:
+        if self._db is None or time.monotonic() - self._last_check < self._refresh_seconds:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._last_check = time.monotonic()
+        self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        """同步其他 worker 的写入：增量拉取新修改的文章，文档数对不上时全量重建"""
+        try:
+            fingerprint = await self._current_fingerprint()
+            if fingerprint == self._fingerprint:
+                return
+
+            since = self._fingerprint[1]
+            query = {"updated_at": {"$gt": since}} if since else {}
+            async for doc in self._db.blogs.find(query, INDEX_PROJECTION):
+                await self.index(doc)
+
+            if len(self._docs) != fingerprint[0]:
+                await self.build(self._db)
+            else:
+                self._fingerprint = fingerprint
+        except Exception as e:
+            print(f"❌ 搜索索引同步失败: {e}")
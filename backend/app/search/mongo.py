@@ -0,0 +1,104 @@
+"""
+MongoDB 文本索引后端
+MongoDB 的文本索引按空格和标点分词，无法切分中文，
+因此写入时把各字段预先切分为空格分隔的词元存入 search_terms，再对其建立文本索引。
+适合文章数量较大、不希望每个 worker 都在内存中保留索引的部署。
+"""
+
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from .base import FIELD_WEIGHTS, SearchBackend, SearchHit, field_text
+from .tokenizer import query_terms, tokenize
+
+TEXT_INDEX_NAME = "blogs_search_text"
+
+# 写入文章文档中、只供搜索使用的字段，接口返回时需要排除
+INTERNAL_FIELDS = ("search_terms",)
+
+# 文本索引的字段和权重
+TEXT_INDEX_KEYS = [(f"search_terms.{field}", "text") for field in FIELD_WEIGHTS]
+TEXT_INDEX_WEIGHTS = {f"search_terms.{field}": weight for field, weight in FIELD_WEIGHTS.items()}
+
+# 回填时每批写入的文档数
+_BACKFILL_BATCH = 500
+
+
+def search_terms(doc: dict) -> dict:
+    """计算文章各字段的分词结果"""
+    return {field: " ".join(tokenize(field_text(doc, field))) for field in FIELD_WEIGHTS}
+
+
+class MongoTextBackend(SearchBackend):
+    """基于 MongoDB 文本索引的搜索后端"""
+
+    name = "mongo"
+
+    def __init__(self):
+        super().__init__()
+        self._db = None
+
+    async def build(self, db) -> None:
+        self._db = db
+        await db.blogs.create_index(
+            TEXT_INDEX_KEYS,
+            name=TEXT_INDEX_NAME,
+            weights=TEXT_INDEX_WEIGHTS,
+            # 关闭词干提取和停用词，词元已经由我们自己切分
+            default_language="none"
+        )
+
+        # 回填还没有 search_terms 的旧文章
+        projection = {field: 1 for field in FIELD_WEIGHTS}
+        batch = []
+        async for doc in db.blogs.find({"search_terms": {"$exists": False}}, projection):
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"search_terms": search_terms(doc)}}))
+            if len(batch) >= _BACKFILL_BATCH:
+                await db.blogs.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            await db.blogs.bulk_write(batch, ordered=False)
+
+        self.ready.set()
+
+    async def index(self, doc: dict) -> None:
+        doc_id = doc["_id"]
+        if isinstance(doc_id, str):
+            doc_id = ObjectId(doc_id)
+        await self._db.blogs.update_one({"_id": doc_id}, {"$set": {"search_terms": search_terms(doc)}})
+
+    async def remove(self, doc_id: str) -> None:
+        # 文本索引随文档一起删除
+        return None
+
+    async def search(
+        self,
+        text: str,
+        published: Optional[bool] = None,
+        category: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[int, List[SearchHit]]:
+        await self.ready.wait()
+
+        terms = query_terms(text)
+        if not terms:
+            return 0, []
+
+        # 词元之间为 OR 关系，命中词元越多 textScore 越高
+        query = {"$text": {"$search": " ".join(terms)}}
+        if published:
+            query["published"] = True
+        if category:
+            query["category"] = category
+
+        total = await self._db.blogs.count_documents(query)
+        cursor = self._db.blogs.find(query, {"_id": 1, "score": {"$meta": "textScore"}}) \
+            .sort([("score", {"$meta": "textScore"})]) \
+            .skip(offset) \
+            .limit(limit)
+
+        hits = [SearchHit(id=str(doc["_id"]), score=doc["score"]) async for doc in cursor]
+        return total, hits
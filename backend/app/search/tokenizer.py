@@ -0,0 +1,40 @@
+"""
+分词器
+拉丁字母和数字按单词切分，中日韩文字没有空格分隔，按二元组（bigram）切分
+"""
+
+import re
+from typing import List
+
+# 中日韩文字（扩展 A、统一表意文字、兼容表意文字、假名、谚文）
+CJK_RANGES = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af"
+
+_CJK_RE = re.compile(f"[{CJK_RANGES}]")
+
+_TOKEN_RE = re.compile(f"[{CJK_RANGES}]+|[0-9a-z\u00c0-\u024f]+")
+
+
+def is_cjk(token: str) -> bool:
+    """判断词元是否为中日韩文字"""
+    return _CJK_RE.match(token) is not None
+
+
+def tokenize(text: str) -> List[str]:
+    """将文本切分为词元列表（保留重复，用于统计词频）"""
+    tokens = []
+    if not text:
+        return tokens
+
+    for match in _TOKEN_RE.finditer(text.lower()):
+        run = match.group()
+        if not is_cjk(run) or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+
+    return tokens
+
+
+def query_terms(text: str) -> List[str]:
+    """将查询语句切分为去重后的词元"""
+    return list(dict.fromkeys(tokenize(text)))
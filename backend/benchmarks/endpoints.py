@@ -0,0 +1,388 @@
+"""
+接口基准测试
+在进程内通过 httpx 的 ASGI 传输直接驱动 app（不经过网络和服务器进程），
+逐个压测 blog / event / service / settings / about / auth 路由的各个接口，
+输出每个接口的吞吐量和 p50 / p95 / p99 延迟，并把结果写成 JSON，便于在不同提交之间对比。
+
+数据库可以是本地 MongoDB（--backend mongo，默认使用独立的 snc-blog-bench 数据库，运行前清空并填充示例数据），
+也可以是内存中的 mongomock-motor（--backend memory，需要 pip install mongomock-motor，只用于对比应用层开销）。
+
+运行方式（在 backend 目录下）：
+    python benchmarks/endpoints.py [--backend mongo] [--requests 200] [--concurrency 8]
+    python benchmarks/endpoints.py --compare benchmarks/results/<上一次的结果>.json
+    python benchmarks/endpoints.py --only blogs        # 只运行名称包含 blogs 的接口
+
+响应缓存默认开启（与线上一致）；设置 CACHE_ENABLED=false 可测量未命中缓存时的表现。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Optional, Union
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("JWT_SECRET", "benchmark")
+# 压测从同一个客户端发出大量请求，不启用限流
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+from pymongo import ReturnDocument  # noqa: E402
+
+from app.core import database  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.init_data import seed_default_settings, seed_demo_data  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.main import app  # noqa: E402
+from app.search import get_search_engine, init_search  # noqa: E402
+
+from dataset import ensure_scratch_database  # noqa: E402
+
+BENCH_DB_URI = "mongodb://localhost:27017/snc-blog-bench"
+ADMIN_USERNAME = "bench-admin"
+ADMIN_PASSWORD = "bench-password"
+
+
+@dataclass
+class Case:
+    """一个被压测的接口；path / body 可以是以请求序号为参数的函数（如每次删除不同的文档）"""
+    name: str
+    method: str
+    path: Union[str, Callable[[int], str]]
+    body: Union[None, dict, list, Callable[[int], Union[dict, list]]] = None
+    auth: bool = False
+    # 每个请求使用不同的令牌（如修改密码会吊销此前签发的令牌），以请求序号为参数
+    token: Optional[Callable[[int], str]] = None
+    # 检查第一次响应的 JSON，不满足时退出（如搜索必须有结果，否则测的是空结果路径）
+    expect: Optional[Callable[[Any], bool]] = None
+    # 准备该接口所需的数据，参数为 (db, 请求总数)，返回值按资源名（如 blogs）保存在 Fixture.extra 中
+    prepare: Optional[Callable] = None
+
+
+@dataclass
+class Fixture:
+    """压测前从数据库中取出的文档 ID"""
+    blog_id: str = ""
+    event_id: str = ""
+    service_id: str = ""
+    setting_key: str = ""
+    extra: dict = field(default_factory=dict)
+
+
+async def _insert_disposable(collection, document: dict, count: int) -> List[str]:
+    """插入供删除接口使用的文档"""
+    result = await collection.insert_many([{**document, "created_at": datetime.now()} for _ in range(count)])
+    return [str(inserted_id) for inserted_id in result.inserted_ids]
+
+
+async def _insert_admins(db, count: int) -> List[str]:
+    """插入供修改密码接口使用的管理员，每个请求修改各自的密码，互不吊销令牌"""
+    hashed_password = get_password_hash(ADMIN_PASSWORD)
+    result = await db.admins.insert_many([
+        {"username": f"{ADMIN_USERNAME}-{i}", "email": f"bench{i}@example.com",
+         "hashed_password": hashed_password, "is_first_login": False}
+        for i in range(count)
+    ])
+    return [str(inserted_id) for inserted_id in result.inserted_ids]
+
+
+def _blog(i: int) -> dict:
+    return {
+        "title": f"基准测试文章 {i}",
+        "excerpt": "基准测试",
+        "content": "## 标题\n\n基准测试正文，包含 **Markdown** 和代码：\n\n```python\nprint('hello')\n```\n" * 5,
+        "author": "bench",
+        "category": "技术",
+        "tags": ["bench"],
+    }
+
+
+def _event(i: int) -> dict:
+    return {
+        "title": f"基准测试活动 {i}",
+        "description": "基准测试",
+        "date": (datetime.now() + timedelta(days=i % 30)).isoformat(),
+        "category": "讲座",
+    }
+
+
+def _service(i: int) -> dict:
+    return {"name": f"基准测试服务 {i}", "description": "基准测试", "url": "https://example.com", "category": "工具"}
+
+
+def build_cases(fx: Fixture) -> List[Case]:
+    def disposable(name: str) -> Callable[[int], str]:
+        return lambda i: f"/api/{name}/{fx.extra[name][i]}"
+
+    return [
+        # blog.py
+        Case("blogs.list", "GET", "/api/blogs"),
+        Case("blogs.list_category", "GET", "/api/blogs?category=技术"),
+        # 查询词需出现在示例文章中（中英混合，覆盖两种分词路径）
+        Case("blogs.list_search", "GET", "/api/blogs?search=Linux 性能优化", expect=bool),
+        Case("blogs.page", "GET", "/api/blogs?limit=10"),
+        Case("blogs.list_admin", "GET", "/api/blogs?published=all", auth=True),
+        Case("blogs.export", "GET", "/api/blogs/export", auth=True),
+        Case("blogs.detail", "GET", lambda i: f"/api/blogs/{fx.blog_id}"),
+        Case("blogs.create", "POST", "/api/blogs", body=_blog, auth=True),
+        Case("blogs.update", "PUT", lambda i: f"/api/blogs/{fx.blog_id}", body=lambda i: {"excerpt": f"更新 {i}"}, auth=True),
+        Case("blogs.delete", "DELETE", disposable("blogs"), auth=True,
+             prepare=lambda db, n: _insert_disposable(db.blogs, {**_blog(0), "published": False}, n)),
+        # event.py
+        Case("events.list", "GET", "/api/events"),
+        Case("events.list_admin", "GET", "/api/events?published=all", auth=True),
+        Case("events.export", "GET", "/api/events/export", auth=True),
+        Case("events.detail", "GET", lambda i: f"/api/events/{fx.event_id}"),
+        Case("events.create", "POST", "/api/events", body=_event, auth=True),
+        Case("events.update", "PUT", lambda i: f"/api/events/{fx.event_id}", body=lambda i: {"location": f"教室 {i}"}, auth=True),
+        Case("events.delete", "DELETE", disposable("events"), auth=True,
+             prepare=lambda db, n: _insert_disposable(db.events, {**_event(0), "date": datetime.now(), "published": False}, n)),
+        # service.py
+        Case("services.list", "GET", "/api/services"),
+        Case("services.detail", "GET", lambda i: f"/api/services/{fx.service_id}"),
+        Case("services.create", "POST", "/api/services", body=_service, auth=True),
+        Case("services.update", "PUT", lambda i: f"/api/services/{fx.service_id}", body=lambda i: {"order": i}, auth=True),
+        Case("services.delete", "DELETE", disposable("services"), auth=True,
+             prepare=lambda db, n: _insert_disposable(db.services, {**_service(0), "active": False}, n)),
+        # settings.py
+        Case("settings.list", "GET", "/api/settings"),
+        Case("settings.get", "GET", lambda i: f"/api/settings/{fx.setting_key}"),
+        Case("settings.upsert", "POST", "/api/settings", body=lambda i: {"key": "bench_value", "value": i}, auth=True),
+        Case("settings.delete", "DELETE", lambda i: f"/api/settings/bench_delete_{i}", auth=True,
+             prepare=lambda db, n: db.settings.insert_many([{"key": f"bench_delete_{i}", "value": i} for i in range(n)])),
+        # about.py
+        Case("about.get", "GET", "/api/about"),
+        Case("about.team", "GET", "/api/about/team"),
+        Case("about.timeline", "GET", "/api/about/timeline"),
+        Case("about.values", "GET", "/api/about/values"),
+        Case("about.stats", "GET", "/api/about/stats"),
+        Case("about.update", "PUT", "/api/about", body=lambda i: {"title": "关于我们", "description": f"基准测试 {i}"}, auth=True),
+        # /team、/timeline、/values、/stats 的 PUT 以裸 list 声明请求体，FastAPI 会把它当作上传文件字段，
+        # 以 JSON 调用时返回 422，暂不压测
+        # auth.py（/setup 只能执行一次，不参与压测）
+        Case("auth.check_setup", "GET", "/api/auth/check-setup"),
+        Case("auth.login", "POST", "/api/auth/login", body={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}),
+        # 修改密码会吊销该用户此前签发的所有令牌，因此每个请求使用单独的管理员
+        Case("auth.change_password", "POST", "/api/auth/change-password", auth=True,
+             body={"current_password": ADMIN_PASSWORD, "new_password": ADMIN_PASSWORD},
+             token=lambda i: create_access_token({"id": fx.extra["auth"][i], "username": f"{ADMIN_USERNAME}-{i}"}),
+             prepare=_insert_admins),
+    ]
+
+
+async def connect(args):
+    """连接数据库并准备数据，返回 (db, 管理员令牌)"""
+    if args.backend == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("❌ --backend memory 需要安装 mongomock-motor")
+        database.client = AsyncMongoMockClient()
+        database.db = database.client["snc-blog-bench"]
+        await init_search(database.db)
+    else:
+        settings.mongodb_uri = args.mongodb_uri
+        if not args.keep_data:
+            ensure_scratch_database(args.mongodb_uri, args.force)
+            from motor.motor_asyncio import AsyncIOMotorClient
+            admin_client = AsyncIOMotorClient(args.mongodb_uri)
+            await admin_client.drop_database(admin_client.get_default_database().name)
+            admin_client.close()
+        await database.connect_to_mongo()
+
+    db = database.get_database()
+    engine = get_search_engine()
+    if not args.keep_data:
+        await seed_demo_data(db)
+        await seed_default_settings(db)
+        # 填充数据不经过搜索后端，等启动时的建立完成后按填充后的数据重建索引
+        if engine is not None:
+            await engine.ready.wait()
+            await engine.build(db)
+    result = await db.admins.find_one_and_update(
+        {"username": ADMIN_USERNAME},
+        {"$set": {
+            "username": ADMIN_USERNAME,
+            "email": "bench@example.com",
+            "hashed_password": get_password_hash(ADMIN_PASSWORD),
+            "is_first_login": False,
+        }},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+    # 等待搜索索引建立完成
+    if engine is not None:
+        await engine.ready.wait()
+    return db, create_access_token({"id": str(result["_id"]), "username": ADMIN_USERNAME})
+
+
+async def load_fixture(db) -> Fixture:
+    blog = await db.blogs.find_one({"published": True}, {"_id": 1})
+    event = await db.events.find_one({"published": True}, {"_id": 1})
+    service = await db.services.find_one({"active": True}, {"_id": 1})
+    setting = await db.settings.find_one({}, {"key": 1})
+    if not (blog and event and service and setting):
+        sys.exit("❌ 数据库中缺少文章、活动、服务或设置，无法压测详情接口")
+    return Fixture(str(blog["_id"]), str(event["_id"]), str(service["_id"]), setting["key"])
+
+
+def _resolve(value, i: int):
+    return value(i) if callable(value) else value
+
+
+async def run_case(client: httpx.AsyncClient, case: Case, token: str, requests: int, warmup: int, concurrency: int) -> dict:
+    headers = {"Authorization": f"Bearer {token}"} if case.auth else {}
+    latencies: List[float] = []
+    errors = 0
+    total = warmup + requests
+    counter = iter(range(total))
+
+    if case.expect is not None:
+        response = await client.request(case.method, _resolve(case.path, 0), json=_resolve(case.body, 0), headers=headers)
+        if response.status_code >= 400 or not case.expect(response.json()):
+            sys.exit(f"❌ {case.name} 的响应不符合预期（{response.status_code}）: {response.text[:200]}")
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            request_headers = {"Authorization": f"Bearer {case.token(i)}"} if case.token is not None else headers
+            start = time.perf_counter()
+            response = await client.request(case.method, _resolve(case.path, i), json=_resolve(case.body, i), headers=request_headers)
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                errors += 1
+            elif i >= warmup:
+                latencies.append(elapsed)
+            # 内存后端的请求从不挂起，主动让出事件循环，否则一个 worker 会连续发完所有请求
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    count = len(latencies)
+
+    def percentile(p: float) -> float:
+        return round(latencies[min(count - 1, int(count * p))] * 1000, 3) if count else 0.0
+
+    return {
+        "method": case.method,
+        "path": case.path if isinstance(case.path, str) else case.path(0),
+        "requests": count,
+        "errors": errors,
+        # 预热请求也计入总耗时，按全部请求数计算吞吐量
+        "rps": round(total / duration, 1) if duration else 0.0,
+        "mean_ms": round(sum(latencies) / count * 1000, 3) if count else 0.0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline_path: str) -> None:
+    """与之前的结果对比 p50 / p99 和吞吐量的变化"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n📊 与 {baseline['meta']['commit']}（{baseline_path}）对比")
+    print(f"{'接口':<26}{'p50':>10}{'p99':>10}{'req/s':>10}")
+
+    def change(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "-"
+
+    for name, result in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<26}{'(新增)':>10}")
+            continue
+        print(f"{name:<26}{change(result['p50_ms'], old['p50_ms']):>10}"
+              f"{change(result['p99_ms'], old['p99_ms']):>10}{change(result['rps'], old['rps']):>10}")
+
+
+async def main_async(args) -> None:
+    db, token = await connect(args)
+    fixture = await load_fixture(db)
+    cases = [case for case in build_cases(fixture) if not args.only or args.only in case.name]
+
+    total = args.warmup + args.requests
+    for case in cases:
+        if case.prepare is not None:
+            fixture.extra[case.name.split(".")[0]] = await case.prepare(db, total)
+
+    print(f"📊 接口基准：后端 {args.backend}，每个接口 {args.requests} 次请求（预热 {args.warmup} 次），并发 {args.concurrency}\n")
+    print(f"{'接口':<26}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'错误':>6}")
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for case in cases:
+            result = await run_case(client, case, token, args.requests, args.warmup, args.concurrency)
+            results[case.name] = result
+            print(f"{case.name:<26}{result['rps']:>10.0f}{result['p50_ms']:>10.2f}"
+                  f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>6}")
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"endpoints-{commit}-{args.backend}-{datetime.now():%Y%m%d%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "commit": commit,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "backend": args.backend,
+                "requests": args.requests,
+                "warmup": args.warmup,
+                "concurrency": args.concurrency,
+                "cache_enabled": settings.cache_enabled,
+                "python": platform.python_version(),
+                "cpu_count": os.cpu_count(),
+            },
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 结果已写入 {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.backend == "mongo":
+        await database.close_mongo_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="进程内接口基准测试")
+    parser.add_argument("--backend", choices=("mongo", "memory"), default="mongo")
+    parser.add_argument("--mongodb-uri", default=BENCH_DB_URI, help="压测使用的数据库（会被清空）")
+    parser.add_argument("--keep-data", action="store_true", help="不清空数据库，使用已有数据压测")
+    parser.add_argument("--force", action="store_true", help="允许清空库名不像临时库的数据库")
+    parser.add_argument("--requests", type=int, default=200, help="每个接口计入统计的请求数")
+    parser.add_argument("--warmup", type=int, default=20, help="每个接口的预热请求数")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", help="只运行名称包含该字符串的接口")
+    parser.add_argument("--output", help="结果 JSON 路径，默认写入 benchmarks/results/")
+    parser.add_argument("--compare", help="与之前的结果 JSON 对比")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+登录负载下的公开接口延迟
+bcrypt 计算在独立的有界线程池中进行（见 app/core/hashing.py）。该脚本先测量公开接口在空闲时的延迟，
+再在 --logins 个并发登录循环持续运行的同时重复测量，对比两次的吞吐量和 p50 / p99，
+并统计登录请求的状态码（执行器排队已满或排队超时时返回 503）。
+
+进程内的请求在事件循环被阻塞时不会计入各自的延迟，因此同时记录事件循环延迟
+（每 10 ms 的定时器实际晚到的时间），它对应服务器上所有请求都要额外等待的时间。
+
+--inline 会把密码校验换回直接在事件循环中计算（修改前的行为），用于对比。
+
+运行方式（在 backend 目录下）：
+    python benchmarks/login_load.py [--backend mongo] [--path /api/blogs] [--logins 16]
+    python benchmarks/login_load.py --inline
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from endpoints import ADMIN_PASSWORD, ADMIN_USERNAME, BENCH_DB_URI, Case, connect, run_case  # noqa: E402
+
+import httpx  # noqa: E402
+
+from app.core import database  # noqa: E402
+from app.core.hashing import password_hasher  # noqa: E402
+from app.core.security import verify_password  # noqa: E402
+from app.main import app  # noqa: E402
+from app.routers import auth  # noqa: E402
+
+
+async def verify_password_inline(plain_password: str, hashed_password: str) -> bool:
+    """修改前的行为：在事件循环中直接计算 bcrypt"""
+    return verify_password(plain_password, hashed_password)
+
+
+async def login_loop(client: httpx.AsyncClient, stop: asyncio.Event, statuses: Counter, latencies: list) -> None:
+    body = {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.post("/api/auth/login", json=body)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+        # 内存后端的查询不会让出事件循环，保证测量任务能被调度
+        await asyncio.sleep(0)
+
+
+async def loop_lag(stop: asyncio.Event, lags: list, interval: float = 0.01) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def measure(client: httpx.AsyncClient, case: Case, token: str, args) -> dict:
+    """测量公开接口，同时记录事件循环延迟"""
+    stop = asyncio.Event()
+    lags: list = []
+    probe = asyncio.create_task(loop_lag(stop, lags))
+    result = await run_case(client, case, token, args.requests, args.warmup, args.concurrency)
+    stop.set()
+    await probe
+    lags.sort()
+    result["loop_lag_p99_ms"] = round(lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000, 3) if lags else 0.0
+    result["loop_lag_max_ms"] = round(lags[-1] * 1000, 3) if lags else 0.0
+    return result
+
+
+def print_result(label: str, result: dict) -> None:
+    print(f"{label:<12}{result['rps']:>10.0f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+          f"{result['loop_lag_p99_ms']:>12.2f}{result['loop_lag_max_ms']:>12.2f}{result['errors']:>6}")
+
+
+async def main_async(args) -> None:
+    _, token = await connect(args)
+    if args.inline:
+        auth.verify_password_async = verify_password_inline
+
+    case = Case("public", "GET", args.path)
+    mode = "事件循环内计算" if args.inline else f"执行器（{password_hasher.workers} 个线程）"
+    print(f"📊 登录负载测试：后端 {args.backend}，bcrypt {mode}，公开接口 {args.path}，"
+          f"{args.requests} 次请求，并发 {args.concurrency}，登录并发 {args.logins}\n")
+    print(f"{'':<12}{'req/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'循环延迟p99':>12}{'循环延迟max':>12}{'错误':>6}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        idle = await measure(client, case, token, args)
+        print_result("空闲", idle)
+
+        stop = asyncio.Event()
+        statuses: Counter = Counter()
+        login_latencies: list = []
+        logins = [asyncio.create_task(login_loop(client, stop, statuses, login_latencies)) for _ in range(args.logins)]
+        # 等登录请求先占满执行器
+        await asyncio.sleep(0.2)
+        loaded = await measure(client, case, token, args)
+        stop.set()
+        await asyncio.gather(*logins)
+        print_result("登录负载下", loaded)
+
+    login_latencies.sort()
+    p99 = login_latencies[min(len(login_latencies) - 1, int(len(login_latencies) * 0.99))] * 1000 if login_latencies else 0.0
+    codes = ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items()))
+    print(f"\n登录请求 {len(login_latencies)} 次（{codes}），p99 {p99:.0f} ms")
+    print(f"执行器统计: {password_hasher.stats()}")
+
+    if args.backend == "mongo":
+        await database.close_mongo_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="登录负载下的公开接口延迟")
+    parser.add_argument("--backend", choices=("mongo", "memory"), default="mongo")
+    parser.add_argument("--mongodb-uri", default=BENCH_DB_URI, help="压测使用的数据库（会被清空）")
+    parser.add_argument("--keep-data", action="store_true", help="不清空数据库，使用已有数据压测")
+    parser.add_argument("--force", action="store_true", help="允许清空库名不像临时库的数据库")
+    parser.add_argument("--path", default="/api/blogs", help="测量延迟的公开接口")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="公开接口的并发数")
+    parser.add_argument("--logins", type=int, default=16, help="持续登录的并发数")
+    parser.add_argument("--inline", action="store_true", help="在事件循环中直接计算 bcrypt（修改前的行为）")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
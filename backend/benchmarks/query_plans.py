@@ -0,0 +1,245 @@
+"""
+查询计划回归检查
+在种子数据上逐个调用各路由的读接口，通过 CommandListener 记录每个接口实际发出的查询（过滤条件、排序、投影），
+对每种查询形状执行 explain（executionStats），以下情况视为回归：
+- 获胜计划中出现 COLLSCAN（过滤条件为空的整集合读取除外，如 settings 列表、about 单文档）
+- 扫描的文档数远多于返回的文档数（超过 --max-ratio 倍加 --slack 条）
+
+需要排序阶段（SORT，排序未被索引覆盖）的查询只给出提示，不视为失败。
+有回归时以状态码 1 退出。tests/test_query_plans.py 以较小的数据量运行同样的检查（连不上 MongoDB 时跳过）。
+
+需要可访问的 MongoDB，目标库会被清空，库名必须像临时库（见 dataset.ensure_scratch_database）。
+运行方式（在 backend 目录下）：
+    python benchmarks/query_plans.py [--mongodb-uri mongodb://localhost:27017/snc-blog-plans] [--blogs 3000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("JWT_SECRET", "benchmark")
+# 所有检查请求来自同一个客户端，不启用限流
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+from bson import ObjectId, json_util  # noqa: E402
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+from pymongo import monitoring  # noqa: E402
+
+from app.core import database  # noqa: E402
+from app.core.indexes import reconcile_indexes  # noqa: E402
+from app.core.init_data import seed_default_settings, seed_demo_data  # noqa: E402
+from app.core.request_context import endpoint_label  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.core.slow_queries import EXPLAINABLE_COMMANDS, explain_command, query_shape, shape_id, summarize_plan  # noqa: E402
+from app.main import app  # noqa: E402
+from app.search import get_search_engine, init_search  # noqa: E402
+
+from dataset import bulk_load, ensure_scratch_database, generate_blogs, generate_events, generate_services  # noqa: E402
+
+PLANS_DB_URI = "mongodb://localhost:27017/snc-blog-plans"
+
+
+@dataclass
+class CapturedQuery:
+    database: str
+    command_name: str
+    command: dict
+    endpoints: set = field(default_factory=set)
+
+
+class QueryCapture(monitoring.CommandListener):
+    """记录请求中发出的查询，每种形状保留第一条具体命令"""
+
+    def __init__(self):
+        self.queries: Dict[str, CapturedQuery] = {}
+
+    def started(self, event):
+        endpoint = endpoint_label()
+        if endpoint == "-" or event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        sid = shape_id(query_shape(event.command_name, event.command))
+        captured = self.queries.setdefault(
+            sid, CapturedQuery(event.database_name, event.command_name, dict(event.command))
+        )
+        captured.endpoints.add(endpoint)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def read_requests(blog_id: str, event_id: str, service_id: str, setting_key: str) -> List[str]:
+    """各路由读接口的请求，覆盖不同的过滤条件组合"""
+    return [
+        # blog.py
+        "/api/blogs",
+        "/api/blogs?category=前端开发",
+        "/api/blogs?published=all",
+        "/api/blogs?published=all&category=前端开发",
+        "/api/blogs?limit=10",
+        "/api/blogs?limit=10&category=前端开发",
+        "/api/blogs?search=Kubernetes",
+        "/api/blogs/export",
+        f"/api/blogs/{blog_id}",
+        # event.py
+        "/api/events",
+        "/api/events?category=讲座",
+        "/api/events?status=upcoming",
+        "/api/events?status=upcoming&category=讲座",
+        "/api/events?published=all",
+        "/api/events/export",
+        f"/api/events/{event_id}",
+        # service.py
+        "/api/services",
+        "/api/services?category=开发工具",
+        "/api/services?active=all",
+        f"/api/services/{service_id}",
+        # settings.py
+        "/api/settings",
+        f"/api/settings/{setting_key}",
+        # about.py
+        "/api/about",
+        "/api/about/team",
+        # auth.py
+        "/api/auth/check-setup",
+    ]
+
+
+def execution_stats(explain: dict) -> dict:
+    """find 的统计在顶层，聚合命令的统计可能在第一个 $cursor 阶段中"""
+    if "executionStats" in explain:
+        return explain["executionStats"]
+    for stage in explain.get("stages", []):
+        cursor = stage.get("$cursor", {})
+        if "executionStats" in cursor:
+            return cursor["executionStats"]
+    return {}
+
+
+def query_filter(query: CapturedQuery) -> dict:
+    command = query.command
+    if query.command_name == "aggregate":
+        return next((stage["$match"] for stage in command.get("pipeline", []) if "$match" in stage), {})
+    return command.get("filter") or command.get("query") or {}
+
+
+async def check(db, query: CapturedQuery, args) -> dict:
+    explain = await db.client[query.database].command(
+        "explain", explain_command(query.command), verbosity="executionStats"
+    )
+    stages = summarize_plan(explain)
+    stats = execution_stats(explain)
+    examined = stats.get("totalDocsExamined", 0)
+    returned = stats.get("nReturned", 0)
+    kinds = {stage.split()[0] for stage in stages}
+
+    problems = []
+    if "COLLSCAN" in kinds and query_filter(query):
+        problems.append("COLLSCAN")
+    if examined > returned * args.max_ratio + args.slack:
+        problems.append(f"扫描 {examined} 条只返回 {returned} 条")
+
+    return {
+        "endpoints": sorted(query.endpoints),
+        "collection": query.command.get(query.command_name),
+        "shape": json_util.dumps(query_shape(query.command_name, query.command), ensure_ascii=False),
+        "plan": " → ".join(stages),
+        "examined": examined,
+        "returned": returned,
+        "blocking_sort": "SORT" in kinds,
+        "problems": problems,
+    }
+
+
+async def seed(db, args) -> None:
+    """写入规模测试数据（不预渲染）和默认的设置、关于我们页面"""
+    for name in ("blogs", "events", "services", "settings", "about", "admins"):
+        await db[name].drop()
+    options = argparse.Namespace(workers=args.workers, batch_size=1000, seed=42)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        await bulk_load(db.blogs, generate_blogs, args.blogs, options, executor, 4, 5, False)
+        await bulk_load(db.events, generate_events, args.events, options, executor)
+        await bulk_load(db.services, generate_services, args.services, options, executor)
+    await seed_demo_data(db)
+    await seed_default_settings(db)
+
+
+async def main_async(args) -> int:
+    if not args.keep_data:
+        ensure_scratch_database(args.mongodb_uri, args.force)
+    capture = QueryCapture()
+    client = AsyncIOMotorClient(args.mongodb_uri, event_listeners=[capture])
+    db = client.get_default_database()
+    database.client, database.db = client, db
+
+    if not args.keep_data:
+        await seed(db, args)
+    # 先确保声明的索引全部存在（应用启动时在后台创建）
+    await reconcile_indexes(db)
+    await init_search(db)
+    await get_search_engine().ready.wait()
+
+    blog = await db.blogs.find_one({"published": True}, {"_id": 1})
+    event = await db.events.find_one({"published": True}, {"_id": 1})
+    service = await db.services.find_one({"active": True}, {"_id": 1})
+    setting = await db.settings.find_one({}, {"key": 1})
+    paths = read_requests(str(blog["_id"]), str(event["_id"]), str(service["_id"]), setting["key"])
+
+    headers = {"Authorization": "Bearer " + create_access_token({"id": str(ObjectId()), "username": "plans"})}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://plans", headers=headers) as http:
+        for path in paths:
+            response = await http.get(path)
+            if response.status_code != 200:
+                print(f"⚠️ {path} 返回 {response.status_code}")
+            # 继续请求第二页，覆盖带游标的查询
+            if "limit=" in path and response.status_code == 200 and response.json().get("next_cursor"):
+                await http.get(path, params={"cursor": response.json()["next_cursor"]})
+
+    results = [await check(db, query, args) for query in capture.queries.values()]
+    client.close()
+
+    failures = [result for result in results if result["problems"]]
+    for result in sorted(results, key=lambda r: (r["collection"] or "", r["endpoints"])):
+        mark = "❌" if result["problems"] else ("⚠️" if result["blocking_sort"] else "✅")
+        print(f"{mark} {', '.join(result['endpoints'])}  {result['collection']}")
+        print(f"   形状: {result['shape']}")
+        print(f"   计划: {result['plan']}（扫描 {result['examined']} / 返回 {result['returned']}）")
+        for problem in result["problems"]:
+            print(f"   问题: {problem}")
+        if result["blocking_sort"]:
+            print("   提示: 排序未被索引覆盖（内存排序）")
+
+    print(f"\n📊 共 {len(results)} 种查询形状，{len(failures)} 种存在回归")
+    return 1 if failures else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="查询计划回归检查")
+    parser.add_argument("--mongodb-uri", default=PLANS_DB_URI, help="检查使用的数据库（会被清空）")
+    parser.add_argument("--keep-data", action="store_true", help="不重新填充数据，使用已有数据检查")
+    parser.add_argument("--force", action="store_true", help="允许清空库名不像临时库的数据库")
+    parser.add_argument("--blogs", type=int, default=3000)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-ratio", type=float, default=2.0, help="允许的扫描文档数 / 返回文档数")
+    parser.add_argument("--slack", type=int, default=20, help="扫描文档数的额外容差")
+    return parser
+
+
+def main() -> None:
+    sys.exit(asyncio.run(main_async(build_parser().parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+序列化微基准
+对比读接口的旧路径（逐条转换 _id -> response_model 校验 -> 标准 JSON 编码）
+和快速路径（文档直接由 orjson 编码）在各路由上的耗时。
+
+运行方式（在 backend 目录下）：
+    python benchmarks/serialization.py [--items 200] [--rounds 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.core.projection import BLOG_SUMMARY_FIELDS  # noqa: E402
+from app.core.rendering import render_blog  # noqa: E402
+from app.core.serialization import FastJSONResponse, orjson  # noqa: E402
+from app.schemas import BlogPartial, EventPartial, ServicePartial  # noqa: E402
+
+CONTENT = """## 简介
+
+这是一篇用于基准测试的文章，包含 **Markdown** 和代码。
+
+```python
+def hello(name):
+    return f"Hello, {name}"
+```
+
+""" * 8
+
+
+def make_blog(i: int, summary: bool) -> dict:
+    now = datetime.now() - timedelta(hours=i)
+    doc = {
+        "_id": ObjectId(),
+        "title": f"测试文章 {i}",
+        "excerpt": "用于基准测试的文章摘要" * 3,
+        "content": CONTENT,
+        "author": "SNC",
+        "date": now,
+        "read_time": "5 分钟",
+        "category": "技术",
+        "tags": ["Python", "FastAPI", "MongoDB"],
+        "cover": "https://example.com/cover.png",
+        "published": True,
+        "created_at": now,
+        "updated_at": now,
+        **render_blog(CONTENT),
+    }
+    doc.pop("render_version")
+    if summary:
+        doc = {k: v for k, v in doc.items() if k == "_id" or k in BLOG_SUMMARY_FIELDS}
+    return doc
+
+
+def make_event(i: int) -> dict:
+    now = datetime.now()
+    return {
+        "_id": ObjectId(),
+        "title": f"活动 {i}",
+        "description": "活动描述" * 20,
+        "date": now + timedelta(days=i),
+        "location": "线上",
+        "category": "讲座",
+        "organizer": "SNC",
+        "status": "upcoming",
+        "max_participants": 100,
+        "registration_url": "https://example.com/register",
+        "published": True,
+        "created_at": now,
+    }
+
+
+def make_service(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": f"服务 {i}",
+        "description": "服务描述" * 10,
+        "url": "https://example.com",
+        "icon": "🔗",
+        "category": "工具",
+        "order": i,
+        "active": True,
+        "created_at": datetime.now(),
+    }
+
+
+CASES = [
+    ("GET /api/blogs（摘要字段）", List[BlogPartial], lambda i: make_blog(i, summary=True)),
+    ("GET /api/blogs?fields=*", List[BlogPartial], lambda i: make_blog(i, summary=False)),
+    ("GET /api/events", List[EventPartial], make_event),
+    ("GET /api/services", List[ServicePartial], make_service),
+]
+
+
+async def legacy_path(field, docs: list) -> bytes:
+    """旧路径：处理函数逐条转换 _id，FastAPI 按 response_model 校验并编码"""
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+    content = await serialize_response(field=field, response_content=docs, exclude_unset=True)
+    return JSONResponse(content).body
+
+
+async def fast_path(field, docs: list) -> bytes:
+    """快速路径：文档直接编码"""
+    return FastJSONResponse(docs).body
+
+
+async def measure(func, field, docs: list, rounds: int) -> float:
+    """返回单次调用的平均耗时（毫秒）；每轮使用新的浅拷贝，拷贝不计入耗时"""
+    total = 0.0
+    for _ in range(rounds):
+        batch = [dict(doc) for doc in docs]
+        start = time.perf_counter()
+        await func(field, batch)
+        total += time.perf_counter() - start
+    return total / rounds * 1000
+
+
+async def main(items: int, rounds: int) -> None:
+    print(f"📊 序列化基准：每个列表 {items} 条，{rounds} 轮，编码器: {'orjson' if orjson else 'json'}\n")
+    print(f"{'路由':<28}{'旧路径(ms)':>12}{'快速路径(ms)':>14}{'加速比':>8}")
+
+    for name, response_type, factory in CASES:
+        field = create_response_field(name="Response", type_=response_type)
+        docs = [factory(i) for i in range(items)]
+
+        # 两条路径的输出应当一致
+        assert json.loads(await legacy_path(field, [dict(d) for d in docs])) == \
+            json.loads(await fast_path(field, [dict(d) for d in docs]))
+
+        legacy = await measure(legacy_path, field, docs, rounds)
+        fast = await measure(fast_path, field, docs, rounds)
+        print(f"{name:<28}{legacy:>12.2f}{fast:>14.2f}{legacy / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="读接口序列化微基准")
+    parser.add_argument("--items", type=int, default=200, help="每个列表的文档数")
+    parser.add_argument("--rounds", type=int, default=50, help="重复次数")
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.rounds))
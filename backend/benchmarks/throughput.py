@@ -0,0 +1,191 @@
+"""
+吞吐量对比
+分别以单进程（原 Dockerfile 的 uvicorn 启动方式）和生产模式（run.py --production）启动服务，
+用多个压测进程并发请求公开接口，输出每秒请求数和延迟分位数。
+
+需要可访问的 MongoDB（MONGODB_URI），开始前会检查连接；非 200 响应和请求异常计入错误数，
+错误比例超过 --max-error-ratio 时以状态码 1 退出。压测请求都来自本机，服务器不启用限流。
+单核机器上生产模式也只有一个 worker，对比结果只反映事件循环和 HTTP 解析器的差异。
+运行方式（在 backend 目录下）：
+    python benchmarks/throughput.py [--duration 15] [--concurrency 64] [--clients 4]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.config import settings  # noqa: E402
+from app.core.server import worker_count  # noqa: E402
+
+# 压测的公开接口（响应缓存会参与，结果反映的是实际部署的表现）
+PATHS = [
+    "/api/blogs",
+    "/api/blogs?limit=10",
+    "/api/services",
+    "/api/events",
+    "/api/settings",
+]
+
+MODES = {
+    "single": [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", "{port}"],
+    "production": [sys.executable, "run.py", "--production"],
+}
+
+
+def check_mongo(uri: str) -> None:
+    """服务器连不上数据库时接口会等到选择服务器超时，压测结果没有意义，提前退出"""
+    client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        sys.exit(f"❌ 无法连接 MongoDB（{uri}）: {e}")
+    finally:
+        client.close()
+
+
+def start_server(mode: str, port: int) -> subprocess.Popen:
+    command = [part.format(port=port) for part in MODES[mode]]
+    # 所有压测请求来自同一个地址，启用限流时超过读接口限额后几乎全是 429
+    env = {**os.environ, "HOST": "127.0.0.1", "PORT": str(port), "RATE_LIMIT_ENABLED": "false"}
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("服务器启动超时")
+
+
+async def _load(base_url: str, duration: float, concurrency: int) -> tuple:
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker(offset: int):
+            nonlocal errors
+            i = offset
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(PATHS[i % len(PATHS)])
+                except httpx.HTTPError:
+                    errors += 1
+                else:
+                    if response.status_code == 200:
+                        latencies.append(time.perf_counter() - start)
+                    else:
+                        errors += 1
+                i += 1
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors
+
+
+def _client_process(base_url: str, duration: float, concurrency: int, queue) -> None:
+    queue.put(asyncio.run(_load(base_url, duration, concurrency)))
+
+
+def run_load(base_url: str, duration: float, concurrency: int, clients: int) -> dict:
+    """用多个压测进程发起请求，避免压测端自身成为瓶颈"""
+    queue = multiprocessing.Queue()
+    per_client = max(1, concurrency // clients)
+    processes = [
+        multiprocessing.Process(target=_client_process, args=(base_url, duration, per_client, queue))
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    latencies = []
+    errors = 0
+    for _ in processes:
+        client_latencies, client_errors = queue.get()
+        latencies.extend(client_latencies)
+        errors += client_errors
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": count / duration,
+        "p50": latencies[count // 2] * 1000 if count else 0,
+        "p99": latencies[int(count * 0.99)] * 1000 if count else 0,
+    }
+
+
+def benchmark(mode: str, port: int, args) -> dict:
+    server = start_server(mode, port)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(base_url)
+        # 预热：建立搜索索引、填充缓存
+        run_load(base_url, 2, args.concurrency, 1)
+        return run_load(base_url, args.duration, args.concurrency, args.clients)
+    finally:
+        # 与容器停止时相同，发送 SIGTERM 并等待优雅退出
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="单进程与生产模式吞吐量对比")
+    parser.add_argument("--duration", type=float, default=15, help="每种模式压测的秒数")
+    parser.add_argument("--concurrency", type=int, default=64, help="并发请求数")
+    parser.add_argument("--clients", type=int, default=4, help="压测进程数")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--max-error-ratio", type=float, default=0.01, help="允许的错误请求比例，超过时结果无效")
+    args = parser.parse_args()
+
+    check_mongo(settings.mongodb_uri)
+    workers = worker_count()
+    print(f"📊 吞吐量对比：{args.duration:.0f} 秒，并发 {args.concurrency}，CPU 核心 {os.cpu_count()}，"
+          f"生产模式 {workers} 个 worker\n")
+    if workers == 1:
+        print("⚠️ 生产模式只有一个 worker，吞吐量差异只来自事件循环和 HTTP 解析器\n")
+    print(f"{'模式':<14}{'请求数':>10}{'req/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'错误':>6}")
+    results = {}
+    for mode in MODES:
+        result = benchmark(mode, args.port, args)
+        results[mode] = result
+        print(f"{mode:<14}{result['requests']:>10}{result['rps']:>10.0f}{result['p50']:>10.1f}"
+              f"{result['p99']:>10.1f}{result['errors']:>6}")
+
+    if results["single"]["rps"]:
+        print(f"\n生产模式吞吐量为单进程的 {results['production']['rps'] / results['single']['rps']:.1f} 倍")
+
+    invalid = []
+    for mode, result in results.items():
+        total = result["requests"] + result["errors"]
+        ratio = result["errors"] / total if total else 1.0
+        if ratio > args.max_error_ratio:
+            invalid.append(f"{mode} 错误比例 {ratio:.1%}")
+    if invalid:
+        print(f"\n❌ 结果无效（{'，'.join(invalid)}，超过 {args.max_error_ratio:.1%}），请检查服务器日志")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
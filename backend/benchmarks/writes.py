@@ -0,0 +1,179 @@
+"""
+写接口往返次数基准
+对比写接口修改前后的数据库访问方式在同一个 MongoDB 上的延迟：
+- 修改前：update_one + find_one（文章、活动、服务），find_one + update_one / insert_one + find_one（设置、关于我们）
+- 修改后：一次 find_one_and_update（ReturnDocument.AFTER，设置和关于我们使用 upsert）
+
+每次写入的延迟主要由往返次数决定，因此应在与生产环境相近的网络条件下运行
+（数据库在另一台主机或容器上；本机回环地址上的差距会明显偏小）。请求逐个顺序发出，输出 p50 / p99 和 ping 的往返时间。
+没有网络上的 MongoDB 时，可以用 --rtt-ms 在每次数据库往返前等待指定的毫秒数来模拟网络延迟。
+
+运行方式（在 backend 目录下）：
+    python benchmarks/writes.py --mongodb-uri mongodb://db-host:27017/snc-blog-bench [--iterations 500]
+    python benchmarks/writes.py --backend memory --rtt-ms 1
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from endpoints import BENCH_DB_URI, connect  # noqa: E402
+
+from app.core import database  # noqa: E402
+from app.core.projection import build_projection  # noqa: E402
+from app.core.writes import update_and_fetch  # noqa: E402
+from app.search import INTERNAL_FIELDS  # noqa: E402
+
+
+# 需要一次数据库往返的方法
+ROUND_TRIPS = {"find_one", "update_one", "insert_one", "find_one_and_update", "command"}
+
+
+class Delayed:
+    """在每次数据库往返前等待固定时间，模拟网络延迟"""
+
+    def __init__(self, target, delay: float):
+        self._target = target
+        self._delay = delay
+
+    def __getitem__(self, name: str) -> "Delayed":
+        return Delayed(self._target[name], self._delay)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if name not in ROUND_TRIPS:
+            return attr
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(self._delay)
+            return await attr(*args, **kwargs)
+        return call
+
+
+def by_id_cases(db, collection: str, doc_id, field: str, projection=None) -> Dict[str, Callable[[int], Awaitable]]:
+    """按 _id 更新的接口（update_blog / update_event / update_service）"""
+    coll = db[collection]
+
+    async def before(i: int):
+        await coll.update_one({"_id": doc_id}, {"$set": {field: f"bench-{i}", "updated_at": datetime.now()}})
+        return await coll.find_one({"_id": doc_id}, projection)
+
+    async def after(i: int):
+        return await update_and_fetch(
+            coll, {"_id": doc_id}, {"$set": {field: f"bench-{i}", "updated_at": datetime.now()}}, projection=projection
+        )
+
+    return {"before": before, "after": after}
+
+
+def setting_cases(db) -> Dict[str, Callable[[int], Awaitable]]:
+    """create_or_update_setting"""
+    settings = db["settings"]
+
+    async def before(i: int):
+        existing = await settings.find_one({"key": "benchKey"})
+        if existing:
+            await settings.update_one({"key": "benchKey"}, {"$set": {"value": i, "updated_at": datetime.now()}})
+        else:
+            await settings.insert_one({"key": "benchKey", "value": i, "description": "", "updated_at": datetime.now()})
+        return await settings.find_one({"key": "benchKey"})
+
+    async def after(i: int):
+        return await update_and_fetch(
+            settings,
+            {"key": "benchKey"},
+            {"$set": {"key": "benchKey", "value": i, "updated_at": datetime.now()}, "$setOnInsert": {"description": ""}},
+            upsert=True
+        )
+
+    return {"before": before, "after": after}
+
+
+def about_cases(db) -> Dict[str, Callable[[int], Awaitable]]:
+    """update_about"""
+    about = db["about"]
+
+    async def before(i: int):
+        existing = await about.find_one({})
+        if existing:
+            await about.update_one({"_id": existing["_id"]}, {"$set": {"mission.title": f"bench-{i}"}})
+        else:
+            await about.insert_one({"mission": {"title": f"bench-{i}"}})
+        return await about.find_one({})
+
+    async def after(i: int):
+        return await update_and_fetch(
+            about, {}, {"$set": {"mission.title": f"bench-{i}"}}, projection={"_id": 0}, upsert=True
+        )
+
+    return {"before": before, "after": after}
+
+
+async def timed(func: Callable[[int], Awaitable], iterations: int, warmup: int) -> List[float]:
+    latencies = []
+    for i in range(warmup + iterations):
+        start = time.perf_counter()
+        await func(i)
+        if i >= warmup:
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+
+def percentile(latencies: List[float], p: float) -> float:
+    return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+
+async def main_async(args) -> None:
+    raw_db, _ = await connect(args)
+    db = Delayed(raw_db, args.rtt_ms / 1000) if args.rtt_ms else raw_db
+    blog = await db.blogs.find_one({}, {"_id": 1})
+    event = await db.events.find_one({}, {"_id": 1})
+    service = await db.services.find_one({}, {"_id": 1})
+
+    cases = {
+        "update_blog": by_id_cases(db, "blogs", blog["_id"], "title", build_projection(None, hidden=INTERNAL_FIELDS)),
+        "update_event": by_id_cases(db, "events", event["_id"], "title"),
+        "update_service": by_id_cases(db, "services", service["_id"], "name"),
+        "create_or_update_setting": setting_cases(db),
+        "update_about": about_cases(db),
+    }
+
+    ping = await timed(lambda i: db.command("ping"), args.iterations, args.warmup)
+    rtt = f"，模拟往返 {args.rtt_ms} ms" if args.rtt_ms else ""
+    print(f"📊 写入往返基准：后端 {args.backend}{rtt}，每项 {args.iterations} 次顺序写入，ping p50 {percentile(ping, 0.5):.3f} ms\n")
+    print(f"{'接口':<26}{'修改前 p50':>12}{'p99':>10}{'修改后 p50':>12}{'p99':>10}{'p50 变化':>10}")
+
+    for name, variants in cases.items():
+        before = await timed(variants["before"], args.iterations, args.warmup)
+        after = await timed(variants["after"], args.iterations, args.warmup)
+        b50, a50 = percentile(before, 0.5), percentile(after, 0.5)
+        print(f"{name:<26}{b50:>12.3f}{percentile(before, 0.99):>10.3f}"
+              f"{a50:>12.3f}{percentile(after, 0.99):>10.3f}{(a50 - b50) / b50 * 100:>+9.1f}%")
+
+    await raw_db.settings.delete_one({"key": "benchKey"})
+    if args.backend == "mongo":
+        await database.close_mongo_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="写接口往返次数基准")
+    parser.add_argument("--backend", choices=("mongo", "memory"), default="mongo")
+    parser.add_argument("--mongodb-uri", default=BENCH_DB_URI, help="压测使用的数据库（会被清空）")
+    parser.add_argument("--keep-data", action="store_true", help="不清空数据库，使用已有数据压测")
+    parser.add_argument("--force", action="store_true", help="允许清空库名不像临时库的数据库")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=0, help="每次数据库往返前等待的毫秒数（模拟网络延迟）")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
-import uvicorn
-from app.core.config import settings
+import argparse
+
+from app.core.server import run_development, run_production
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=settings.port,
-        reload=True,
-        log_level="info"
+    parser = argparse.ArgumentParser(description="启动 SNC Blog API 服务器")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="生产模式：多 worker、预加载、worker 回收和优雅退出（参数见 Settings）"
     )
+    args = parser.parse_args()
+
+    if args.production:
+        run_production()
+    else:
+        run_development()
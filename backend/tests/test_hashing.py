@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.hashing import PasswordHasher, PasswordHasherBusy
+
+
+def test_cancelled_request_keeps_slot_until_thread_finishes():
+    hasher = PasswordHasher(workers=1, max_queue=4, queue_timeout=0.05)
+
+    async def scenario():
+        first = asyncio.create_task(hasher.run("hash", time.sleep, 0.3))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.sleep(0)
+        assert first.cancelled()
+        # 线程仍在计算，槽位没有归还
+        assert hasher.running == 1
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.run("hash", time.sleep, 0)
+
+        await asyncio.sleep(0.4)
+        assert hasher.running == 0
+        await hasher.run("hash", time.sleep, 0)
+
+    asyncio.run(scenario())
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_timeouts_do_not_leak_slots():
+    hasher = PasswordHasher(workers=1, max_queue=64, queue_timeout=0.001)
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(hasher.run("verify", time.sleep, 0.002) for _ in range(40)), return_exceptions=True
+        )
+        assert any(isinstance(result, PasswordHasherBusy) for result in results)
+        # 所有槽位都已归还：可以立即获取
+        assert hasher._slots._value == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_while_queued_releases_nothing_extra():
+    hasher = PasswordHasher(workers=1, max_queue=4, queue_timeout=1)
+
+    async def scenario():
+        running = asyncio.create_task(hasher.run("hash", time.sleep, 0.1))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(hasher.run("hash", time.sleep, 0))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        assert hasher.waiting == 0
+        assert hasher._slots._value == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,34 @@
+import asyncio
+
+from app.core.health import PingCheck
+
+
+async def leader_cancelled(start, release) -> tuple:
+    """第一个调用者在读取进行中被取消，后来的调用者仍然拿到结果"""
+    leader = asyncio.create_task(start())
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(start())
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+    result = await asyncio.wait_for(follower, 1)
+    return leader, result
+
+
+def test_ping_follower_survives_cancelled_leader(monkeypatch):
+    check = PingCheck(interval=60, timeout=1)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_ping():
+            await release.wait()
+            return {"ok": True, "latency_ms": 1.0}
+
+        monkeypatch.setattr(check, "_ping", slow_ping)
+        leader, result = await leader_cancelled(check.check, release)
+        assert leader.cancelled()
+        return result
+
+    assert asyncio.run(scenario()) == {"ok": True, "latency_ms": 1.0}
+    assert check._pending is None
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from app.core import database
+from app.core.config import settings
+from app.core.init_data import DEFAULT_SETTINGS
+from app.core.migrations import run_migrations
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def memory_db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["snc-blog-test"]
+    monkeypatch.setattr(database, "db", db)
+    return db
+
+
+def test_default_settings_seeded_without_demo_data(memory_db, monkeypatch):
+    monkeypatch.setattr(settings, "seed_demo_data", False)
+
+    async def scenario():
+        # 管理员已修改过的设置保持不变
+        await memory_db.settings.insert_one({"key": "siteName", "value": "自定义名称"})
+        report = await run_migrations(memory_db)
+        stored = {doc["key"]: doc["value"] async for doc in memory_db.settings.find({})}
+        return report, stored, await memory_db.blogs.count_documents({})
+
+    report, stored, blogs = asyncio.run(scenario())
+    applied = {m["id"]: m for m in report["migrations"] if m["status"] == "applied"}
+    assert applied["default_settings"]["result"] == f"补齐 {len(DEFAULT_SETTINGS) - 1} 个默认设置"
+    assert "demo_data" not in applied
+    assert set(stored) == {setting["key"] for setting in DEFAULT_SETTINGS}
+    assert stored["siteName"] == "自定义名称"
+    assert blogs == 0
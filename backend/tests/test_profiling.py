@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.security import create_access_token
+from app.middleware.profiling import ProfilingMiddleware
+
+pytest.importorskip("pyinstrument")
+
+HEADERS = {
+    "Authorization": "Bearer " + create_access_token({"id": "u1", "username": "admin"}),
+    "X-Profile": "1",
+}
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.profiling.settings.profile_dir", str(tmp_path))
+
+
+def client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=ProfilingMiddleware(app)), base_url="http://test")
+
+
+def test_one_profile_per_worker():
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def scenario():
+        async with client(slow_app) as http:
+            first = asyncio.create_task(http.get("/", headers=HEADERS))
+            await asyncio.sleep(0.05)
+            second = await http.get("/", headers=HEADERS)
+            release.set()
+            return await first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.status_code == 200 and "x-profile-id" in first.headers
+    assert second.status_code == 409
+
+    # 前一个剖析结束后可以再次剖析
+    async def again():
+        async with client(slow_app) as http:
+            return await http.get("/", headers=HEADERS)
+
+    assert asyncio.run(again()).status_code == 200
+
+
+def test_app_without_response():
+    async def silent_app(scope, receive, send):
+        pass
+
+    async def scenario():
+        transport_app = ProfilingMiddleware(silent_app)
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/", "raw_path": b"/", "query_string": b"",
+                 "headers": [(key.lower().encode(), value.encode()) for key, value in HEADERS.items()]}
+        await transport_app(scope, receive, send)
+        return sent
+
+    assert asyncio.run(scenario()) == []
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+# 检查会清空该库，库名必须像临时库
+PLANS_TEST_URI = os.environ.get("QUERY_PLANS_MONGODB_URI", "mongodb://localhost:27017/snc-blog-plans-test")
+
+
+def mongo_available(uri: str) -> bool:
+    client = MongoClient(uri, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+    finally:
+        client.close()
+
+
+@pytest.fixture(scope="module")
+def query_plans():
+    if not mongo_available(PLANS_TEST_URI):
+        pytest.skip(f"MongoDB 不可用（{PLANS_TEST_URI}）")
+    sys.path.insert(0, BENCHMARKS_DIR)
+    import query_plans
+    return query_plans
+
+
+def test_read_endpoints_use_indexes(query_plans):
+    args = query_plans.build_parser().parse_args(
+        ["--mongodb-uri", PLANS_TEST_URI, "--blogs", "500", "--events", "200", "--services", "50", "--workers", "1"]
+    )
+    assert asyncio.run(query_plans.main_async(args)) == 0
+
+
+def test_refuses_non_scratch_database():
+    sys.path.insert(0, BENCHMARKS_DIR)
+    from dataset import ensure_scratch_database
+
+    ensure_scratch_database("mongodb://localhost:27017/snc-blog-plans")
+    ensure_scratch_database("mongodb://localhost:27017/snc-blog", force=True)
+    with pytest.raises(SystemExit):
+        ensure_scratch_database("mongodb://localhost:27017/snc-blog")
+    with pytest.raises(SystemExit):
+        ensure_scratch_database("mongodb://db-host:27017/")
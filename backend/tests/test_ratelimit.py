@@ -0,0 +1,102 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.core.request_context import current_route
+from app.ratelimit import POLICIES, RateLimiter, client_ip, parse_networks
+from app.ratelimit.memory import MemoryStore
+from app.ratelimit.shared import SharedMemoryStore, fcntl
+
+NGINX = "172.28.0.10"
+TRUSTED = parse_networks(f"127.0.0.1,{NGINX}")
+
+
+def scope(peer: str, forwarded: str = None) -> dict:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return {"type": "http", "method": "POST", "path": "/api/auth/login", "client": (peer, 40000),
+            "headers": headers, "query_string": b""}
+
+
+def test_client_ip_from_trusted_proxy():
+    assert client_ip(scope(NGINX, "203.0.113.7"), TRUSTED) == "203.0.113.7"
+    # 客户端自己伪造的前缀被忽略，取最右侧的不可信地址
+    assert client_ip(scope(NGINX, "1.1.1.1, 203.0.113.7"), TRUSTED) == "203.0.113.7"
+    # 多级可信代理
+    assert client_ip(scope("127.0.0.1", f"203.0.113.7, {NGINX}"), TRUSTED) == "203.0.113.7"
+
+
+def test_forwarded_header_ignored_from_untrusted_peer():
+    assert client_ip(scope("198.51.100.1", "203.0.113.7"), TRUSTED) == "198.51.100.1"
+
+
+def test_forwarded_clients_get_separate_buckets(monkeypatch):
+    monkeypatch.setattr("app.ratelimit.TRUSTED_PROXIES", TRUSTED)
+    limiter = RateLimiter(MemoryStore(100))
+    burst = int(POLICIES["login"].burst)
+
+    async def attempts(client: str, count: int) -> list:
+        token = current_route.set(("POST", "/api/auth/login"))
+        try:
+            return [(await limiter.check(scope(NGINX, client)))[1].allowed for _ in range(count)]
+        finally:
+            current_route.reset(token)
+
+    # 第一个客户端用完自己的桶，第二个客户端不受影响
+    assert asyncio.run(attempts("203.0.113.7", burst + 1)) == [True] * burst + [False]
+    assert asyncio.run(attempts("203.0.113.8", 1)) == [True]
+
+
+@pytest.mark.skipif(fcntl is None or not hasattr(os, "fork"), reason="需要 fork 和 fcntl")
+def test_shared_store_lock_released_when_holder_dies():
+    store = SharedMemoryStore(64)
+    pid = os.fork()
+    if pid == 0:
+        # 持有锁时被杀死
+        try:
+            asyncio.run(store._acquire())
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    result = asyncio.run(store.take("ip:203.0.113.7", 1, 2))
+    assert result.allowed
+    assert store.lock_timeouts == 0
+
+
+@pytest.mark.skipif(fcntl is None or not hasattr(os, "fork"), reason="需要 fork 和 fcntl")
+def test_shared_store_yields_while_lock_is_held():
+    store = SharedMemoryStore(64)
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # 子进程持有锁直到父进程测完
+        try:
+            asyncio.run(store._acquire())
+            os.write(write, b"1")
+            time.sleep(0.5)
+        finally:
+            os._exit(0)
+    os.close(write)
+    assert os.read(read, 1) == b"1"
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        result = await store.take("ip:203.0.113.7", 1, 2)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+    os.waitpid(pid, 0)
+    # 超时放行，等待期间其他协程仍在运行
+    assert result.allowed
+    assert store.lock_timeouts == 1
+    assert ticks > 1
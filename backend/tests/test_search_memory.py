@@ -0,0 +1,62 @@
+import asyncio
+
+from app.search.memory import MemoryBackend
+
+
+class SlowBlogs:
+    """逐篇返回文章的集合，读取到一半时暂停，模拟重建期间的写入"""
+
+    def __init__(self, docs, pause: asyncio.Event, resume: asyncio.Event):
+        self.docs = docs
+        self.pause = pause
+        self.resume = resume
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def find(self, query, projection):
+        for position, doc in enumerate(list(self.docs)):
+            if position == 1:
+                self.pause.set()
+                await self.resume.wait()
+            yield doc
+
+
+class SlowDatabase:
+    def __init__(self, blogs):
+        self.blogs = blogs
+
+
+def blog(doc_id: str, title: str) -> dict:
+    return {"_id": doc_id, "title": title, "content": title, "published": True}
+
+
+def test_writes_during_build_survive_the_swap():
+    backend = MemoryBackend(refresh_seconds=3600)
+
+    async def scenario():
+        pause, resume = asyncio.Event(), asyncio.Event()
+        docs = [blog("a", "alpha"), blog("b", "bravo"), blog("c", "charlie")]
+        build = asyncio.create_task(backend.build(SlowDatabase(SlowBlogs(docs, pause, resume))))
+        await pause.wait()
+
+        # 游标已经读过 a：新增 d、修改 a、删除 c
+        await backend.index(blog("d", "delta"))
+        await backend.index(blog("a", "echo"))
+        await backend.remove("c")
+        resume.set()
+        await build
+
+        found = {}
+        for word in ("alpha", "bravo", "charlie", "delta", "echo"):
+            total, _ = await backend.search(word)
+            found[word] = total
+        return found
+
+    assert asyncio.run(scenario()) == {"alpha": 0, "bravo": 1, "charlie": 0, "delta": 1, "echo": 1}
+    assert sorted(backend._docs) == ["a", "b", "d"]
+    assert backend._total_length == sum(doc.length for doc in backend._docs.values())
+    assert backend._journal is None
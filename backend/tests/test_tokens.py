@@ -0,0 +1,53 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.core import database
+from app.core.security import create_access_token, verify_token
+from app.core.tokens import RevocationList, revocations, token_cache
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def memory_db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["snc-blog-test"]
+    monkeypatch.setattr(database, "db", db)
+    monkeypatch.setattr(revocations, "_tokens", {})
+    monkeypatch.setattr(revocations, "_users", {})
+    token_cache._entries.clear()
+    return db
+
+
+def test_revoke_without_started_sync(memory_db):
+    # 未调用 start()（如基准测试的内存后端）时吊销也能写入数据库
+    token = create_access_token({"id": "u1", "username": "a"})
+    claims = verify_token(token)
+    asyncio.run(revocations.revoke_token(token, claims))
+    assert verify_token(token) is None
+    assert asyncio.run(memory_db.token_revocations.count_documents({})) == 1
+
+
+def test_token_issued_in_same_second_before_password_change(memory_db):
+    stolen = create_access_token({"id": "u1", "username": "a"})
+    jti = uuid.uuid4().hex
+    kept = create_access_token({"id": "u1", "username": "a", "jti": jti})
+    asyncio.run(revocations.revoke_user("u1", keep_jti=jti))
+
+    assert verify_token(stolen) is None
+    assert verify_token(kept) is not None
+    time.sleep(0.002)
+    assert verify_token(create_access_token({"id": "u1", "username": "a"})) is not None
+
+
+def test_sync_restores_user_revocation(memory_db):
+    jti = uuid.uuid4().hex
+    asyncio.run(revocations.revoke_user("u1", keep_jti=jti))
+
+    # 模拟其他 worker：只通过同步获得吊销记录
+    other = RevocationList()
+    asyncio.run(other.sync())
+    assert other.is_revoked("", {"id": "u1", "iat_ms": 0, "jti": "x"})
+    assert not other.is_revoked("", {"id": "u1", "iat_ms": 0, "jti": jti})
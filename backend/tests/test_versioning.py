@@ -0,0 +1,34 @@
+import asyncio
+
+from app.core.versioning import ContentVersions
+
+
+async def leader_cancelled(start, release) -> tuple:
+    """第一个调用者在读取进行中被取消，后来的调用者仍然拿到结果"""
+    leader = asyncio.create_task(start())
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(start())
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+    result = await asyncio.wait_for(follower, 1)
+    return leader, result
+
+
+def test_content_versions_follower_survives_cancelled_leader(monkeypatch):
+    versions = ContentVersions(ttl_seconds=60)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_load(tags):
+            await release.wait()
+            return [(3, None, 0.0) for _ in tags]
+
+        monkeypatch.setattr(versions, "_load", slow_load)
+        leader, result = await leader_cancelled(lambda: versions.get(["blogs:list"]), release)
+        assert leader.cancelled()
+        return result
+
+    assert asyncio.run(scenario()) == ("3", None)
+    assert versions._pending == {}